@@ -0,0 +1,318 @@
+"""initial schema
+
+Tables as created by Base.metadata.create_all before migrations existed.
+Databases created that way should be stamped instead of upgraded:
+
+    alembic stamp 0001
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 08:35:10.566068
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('loyalty_tier_configs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tier_name', sa.String(), nullable=False),
+    sa.Column('min_orders', sa.Integer(), nullable=False),
+    sa.Column('discount_percentage', sa.Numeric(precision=5, scale=2), nullable=False),
+    sa.Column('points_multiplier', sa.Numeric(precision=3, scale=2), nullable=False),
+    sa.Column('color_code', sa.String(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('tier_name')
+    )
+    op.create_index(op.f('ix_loyalty_tier_configs_id'), 'loyalty_tier_configs', ['id'], unique=False)
+    op.create_table('message_templates',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('notification_type', sa.Enum('ORDER_CONFIRMATION', 'STATUS_UPDATE', 'PICKUP_REMINDER', 'DELIVERY_REMINDER', 'PAYMENT_CONFIRMATION', 'LOYALTY_UPDATE', 'PROMOTIONAL', 'FEEDBACK_REQUEST', 'CUSTOM', name='notificationtype'), nullable=False),
+    sa.Column('template_name', sa.String(), nullable=False),
+    sa.Column('language_code', sa.String(), nullable=False),
+    sa.Column('header_text', sa.Text(), nullable=True),
+    sa.Column('body_text', sa.Text(), nullable=False),
+    sa.Column('footer_text', sa.Text(), nullable=True),
+    sa.Column('parameters', sa.JSON(), nullable=True),
+    sa.Column('has_buttons', sa.Boolean(), nullable=True),
+    sa.Column('button_config', sa.JSON(), nullable=True),
+    sa.Column('has_media', sa.Boolean(), nullable=True),
+    sa.Column('media_type', sa.String(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('is_approved', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_message_templates_id'), 'message_templates', ['id'], unique=False)
+    op.create_index(op.f('ix_message_templates_name'), 'message_templates', ['name'], unique=True)
+    op.create_table('service_types',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('category', sa.Enum('WASH', 'DRY_CLEAN', 'IRON', 'SPECIAL', name='servicecategory'), nullable=False),
+    sa.Column('base_price', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('estimated_duration_hours', sa.Integer(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_service_types_id'), 'service_types', ['id'], unique=False)
+    op.create_index(op.f('ix_service_types_name'), 'service_types', ['name'], unique=False)
+    op.create_table('subscription_plan_configs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('plan_name', sa.String(), nullable=False),
+    sa.Column('discount_percentage', sa.Numeric(precision=5, scale=2), nullable=False),
+    sa.Column('points_bonus_multiplier', sa.Numeric(precision=3, scale=2), nullable=False),
+    sa.Column('monthly_fee', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('plan_name')
+    )
+    op.create_index(op.f('ix_subscription_plan_configs_id'), 'subscription_plan_configs', ['id'], unique=False)
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('phone', sa.String(), nullable=True),
+    sa.Column('hashed_password', sa.String(), nullable=False),
+    sa.Column('role', sa.Enum('ADMIN', 'WORKER', 'CUSTOMER', name='userrole'), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('is_verified', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_login_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    op.create_table('customers',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('address', sa.Text(), nullable=True),
+    sa.Column('loyalty_points', sa.Integer(), nullable=True),
+    sa.Column('loyalty_tier', sa.Enum('BRONZE', 'SILVER', 'GOLD', 'PLATINUM', name='loyaltytier'), nullable=True),
+    sa.Column('subscription_plan', sa.Enum('BASIC', 'PREMIUM', 'FAMILY', 'BUSINESS', name='subscriptionplan'), nullable=True),
+    sa.Column('total_spent', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('total_orders', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id')
+    )
+    op.create_index(op.f('ix_customers_id'), 'customers', ['id'], unique=False)
+    op.create_table('workers',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('employee_id', sa.String(), nullable=False),
+    sa.Column('worker_role', sa.Enum('WORKER', 'SUPERVISOR', name='workerrole'), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('total_orders_processed', sa.Integer(), nullable=True),
+    sa.Column('created_by_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['created_by_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id')
+    )
+    op.create_index(op.f('ix_workers_employee_id'), 'workers', ['employee_id'], unique=True)
+    op.create_index(op.f('ix_workers_id'), 'workers', ['id'], unique=False)
+    op.create_table('notification_preferences',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('customer_id', sa.Integer(), nullable=False),
+    sa.Column('whatsapp_opted_in', sa.Boolean(), nullable=True),
+    sa.Column('whatsapp_phone', sa.String(), nullable=True),
+    sa.Column('order_updates', sa.Boolean(), nullable=True),
+    sa.Column('pickup_reminders', sa.Boolean(), nullable=True),
+    sa.Column('promotional_messages', sa.Boolean(), nullable=True),
+    sa.Column('loyalty_updates', sa.Boolean(), nullable=True),
+    sa.Column('feedback_requests', sa.Boolean(), nullable=True),
+    sa.Column('preferred_language', sa.String(), nullable=True),
+    sa.Column('preferred_time_start', sa.String(), nullable=True),
+    sa.Column('preferred_time_end', sa.String(), nullable=True),
+    sa.Column('timezone', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('opted_out_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('customer_id')
+    )
+    op.create_index(op.f('ix_notification_preferences_id'), 'notification_preferences', ['id'], unique=False)
+    op.create_table('orders',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tracking_id', sa.String(), nullable=False),
+    sa.Column('customer_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'IN_PROGRESS', 'READY', 'COMPLETED', 'CANCELLED', name='orderstatus'), nullable=True),
+    sa.Column('total_amount', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('discount_amount', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('final_amount', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('points_earned', sa.Integer(), nullable=True),
+    sa.Column('points_redeemed', sa.Integer(), nullable=True),
+    sa.Column('captured_by_id', sa.Integer(), nullable=True),
+    sa.Column('assigned_to_id', sa.Integer(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('estimated_completion_time', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('actual_completion_time', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['assigned_to_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['captured_by_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_orders_id'), 'orders', ['id'], unique=False)
+    op.create_index(op.f('ix_orders_tracking_id'), 'orders', ['tracking_id'], unique=True)
+    op.create_table('notifications',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('customer_id', sa.Integer(), nullable=False),
+    sa.Column('template_id', sa.Integer(), nullable=True),
+    sa.Column('order_id', sa.Integer(), nullable=True),
+    sa.Column('notification_type', postgresql.ENUM('ORDER_CONFIRMATION', 'STATUS_UPDATE', 'PICKUP_REMINDER', 'DELIVERY_REMINDER', 'PAYMENT_CONFIRMATION', 'LOYALTY_UPDATE', 'PROMOTIONAL', 'FEEDBACK_REQUEST', 'CUSTOM', name='notificationtype', create_type=False), nullable=False),
+    sa.Column('recipient_phone', sa.String(), nullable=False),
+    sa.Column('message_text', sa.Text(), nullable=False),
+    sa.Column('whatsapp_message_id', sa.String(), nullable=True),
+    sa.Column('template_name', sa.String(), nullable=True),
+    sa.Column('template_language', sa.String(), nullable=True),
+    sa.Column('template_parameters', sa.JSON(), nullable=True),
+    sa.Column('media_url', sa.String(), nullable=True),
+    sa.Column('media_type', sa.String(), nullable=True),
+    sa.Column('status', sa.Enum('PENDING', 'SENT', 'DELIVERED', 'READ', 'FAILED', 'REJECTED', name='messagestatus'), nullable=True),
+    sa.Column('delivery_status', sa.String(), nullable=True),
+    sa.Column('error_message', sa.Text(), nullable=True),
+    sa.Column('retry_count', sa.Integer(), nullable=True),
+    sa.Column('scheduled_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('delivered_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('read_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('metadata', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers.id'], ),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ),
+    sa.ForeignKeyConstraint(['template_id'], ['message_templates.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_notifications_id'), 'notifications', ['id'], unique=False)
+    op.create_index(op.f('ix_notifications_whatsapp_message_id'), 'notifications', ['whatsapp_message_id'], unique=False)
+    op.create_table('order_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('service_type_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('price_per_item', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('total_price', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ),
+    sa.ForeignKeyConstraint(['service_type_id'], ['service_types.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_order_items_id'), 'order_items', ['id'], unique=False)
+    op.create_table('order_status_history',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('status', postgresql.ENUM('PENDING', 'IN_PROGRESS', 'READY', 'COMPLETED', 'CANCELLED', name='orderstatus', create_type=False), nullable=False),
+    sa.Column('updated_by_id', sa.Integer(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ),
+    sa.ForeignKeyConstraint(['updated_by_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_order_status_history_id'), 'order_status_history', ['id'], unique=False)
+    op.create_table('points_transactions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('customer_id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=True),
+    sa.Column('transaction_type', sa.Enum('EARNED', 'REDEEMED', 'EXPIRED', 'BONUS', 'ADJUSTMENT', name='transactiontype'), nullable=False),
+    sa.Column('points', sa.Integer(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=False),
+    sa.Column('processed_by_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers.id'], ),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ),
+    sa.ForeignKeyConstraint(['processed_by_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_points_transactions_id'), 'points_transactions', ['id'], unique=False)
+    op.create_table('webhook_events',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('event_type', sa.String(), nullable=False),
+    sa.Column('whatsapp_message_id', sa.String(), nullable=True),
+    sa.Column('notification_id', sa.Integer(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('timestamp', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('raw_data', sa.JSON(), nullable=False),
+    sa.Column('processed', sa.Boolean(), nullable=True),
+    sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['notification_id'], ['notifications.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_webhook_events_id'), 'webhook_events', ['id'], unique=False)
+    op.create_index(op.f('ix_webhook_events_whatsapp_message_id'), 'webhook_events', ['whatsapp_message_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_webhook_events_whatsapp_message_id'), table_name='webhook_events')
+    op.drop_index(op.f('ix_webhook_events_id'), table_name='webhook_events')
+    op.drop_table('webhook_events')
+    op.drop_index(op.f('ix_points_transactions_id'), table_name='points_transactions')
+    op.drop_table('points_transactions')
+    op.drop_index(op.f('ix_order_status_history_id'), table_name='order_status_history')
+    op.drop_table('order_status_history')
+    op.drop_index(op.f('ix_order_items_id'), table_name='order_items')
+    op.drop_table('order_items')
+    op.drop_index(op.f('ix_notifications_whatsapp_message_id'), table_name='notifications')
+    op.drop_index(op.f('ix_notifications_id'), table_name='notifications')
+    op.drop_table('notifications')
+    op.drop_index(op.f('ix_orders_tracking_id'), table_name='orders')
+    op.drop_index(op.f('ix_orders_id'), table_name='orders')
+    op.drop_table('orders')
+    op.drop_index(op.f('ix_notification_preferences_id'), table_name='notification_preferences')
+    op.drop_table('notification_preferences')
+    op.drop_index(op.f('ix_workers_id'), table_name='workers')
+    op.drop_index(op.f('ix_workers_employee_id'), table_name='workers')
+    op.drop_table('workers')
+    op.drop_index(op.f('ix_customers_id'), table_name='customers')
+    op.drop_table('customers')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_table('users')
+    op.drop_index(op.f('ix_subscription_plan_configs_id'), table_name='subscription_plan_configs')
+    op.drop_table('subscription_plan_configs')
+    op.drop_index(op.f('ix_service_types_name'), table_name='service_types')
+    op.drop_index(op.f('ix_service_types_id'), table_name='service_types')
+    op.drop_table('service_types')
+    op.drop_index(op.f('ix_message_templates_name'), table_name='message_templates')
+    op.drop_index(op.f('ix_message_templates_id'), table_name='message_templates')
+    op.drop_table('message_templates')
+    op.drop_index(op.f('ix_loyalty_tier_configs_id'), table_name='loyalty_tier_configs')
+    op.drop_table('loyalty_tier_configs')
+
+    # PostgreSQL keeps enum types after their tables are dropped
+    bind = op.get_bind()
+    for name in ('loyaltytier', 'messagestatus', 'notificationtype', 'orderstatus', 'servicecategory', 'subscriptionplan', 'transactiontype', 'userrole', 'workerrole'):
+        sa.Enum(name=name).drop(bind, checkfirst=True)
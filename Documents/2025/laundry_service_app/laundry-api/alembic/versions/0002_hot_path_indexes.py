@@ -0,0 +1,48 @@
+"""hot path indexes
+
+Secondary indexes for the per-customer listings, notification stats/retry
+scans and status history lookups. On PostgreSQL they are built
+CONCURRENTLY so existing tables stay writable during the upgrade.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 08:35:37.263793
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_orders_customer_id_id', 'orders', ['customer_id', 'id']),
+    ('ix_orders_status_created_at', 'orders', ['status', 'created_at']),
+    ('ix_orders_assigned_to_id_status', 'orders', ['assigned_to_id', 'status']),
+    ('ix_orders_created_at', 'orders', ['created_at']),
+    ('ix_order_items_order_id', 'order_items', ['order_id']),
+    ('ix_order_status_history_order_id_created_at', 'order_status_history', ['order_id', 'created_at']),
+    ('ix_notifications_status_created_at', 'notifications', ['status', 'created_at']),
+    ('ix_notifications_customer_id_created_at', 'notifications', ['customer_id', 'created_at']),
+    ('ix_notifications_status_retry_count', 'notifications', ['status', 'retry_count']),
+    ('ix_notifications_created_at', 'notifications', ['created_at']),
+    ('ix_points_transactions_customer_id_id', 'points_transactions', ['customer_id', 'id']),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
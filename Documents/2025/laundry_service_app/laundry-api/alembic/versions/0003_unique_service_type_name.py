@@ -0,0 +1,30 @@
+"""unique service type name
+
+Service types are seeded and bulk-upserted by name, which needs a unique
+index as the ON CONFLICT target. Remove duplicate names before upgrading.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 09:02:11.418306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_index('ix_service_types_name', table_name='service_types')
+    op.create_index('ix_service_types_name', 'service_types', ['name'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_service_types_name', table_name='service_types')
+    op.create_index('ix_service_types_name', 'service_types', ['name'], unique=False)
@@ -0,0 +1,35 @@
+"""tracking id nodes
+
+Tracking IDs are built from time, a node id and a sequence. Each running
+process leases its node id from this table so no two processes share one.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 15:40:12.604381
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('tracking_id_nodes',
+    sa.Column('node_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('owner', sa.String(length=128), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('issued_until', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('node_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('tracking_id_nodes')
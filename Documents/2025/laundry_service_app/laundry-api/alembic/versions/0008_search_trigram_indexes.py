@@ -0,0 +1,48 @@
+"""search trigram indexes
+
+pg_trgm GIN indexes behind /search: partial tracking IDs, customer names,
+phone numbers (digits only, so "555-0101" finds "+1 555 0101") and order
+notes. PostgreSQL only and built CONCURRENTLY; other databases use the
+in-process index in app.services.search instead.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 21:04:12.553107
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The phone expression must match app.services.search.PHONE_DIGITS exactly
+INDEXES = [
+    ('ix_orders_tracking_id_trgm', 'orders', 'tracking_id gin_trgm_ops'),
+    ('ix_orders_notes_trgm', 'orders', 'notes gin_trgm_ops'),
+    ('ix_users_name_trgm', 'users', 'name gin_trgm_ops'),
+    ('ix_users_phone_digits_trgm', 'users', "(regexp_replace(phone, '[^0-9]', '', 'g')) gin_trgm_ops"),
+]
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, expression in INDEXES:
+            op.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} USING gin ({expression})')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        for name, _, _ in reversed(INDEXES):
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
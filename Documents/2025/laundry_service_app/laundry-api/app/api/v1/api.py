@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, users, customers, orders, workers, services, loyalty
+from app.api.v1.endpoints import auth, users, customers, orders, workers, services, loyalty, admin, search, notifications
 
 api_router = APIRouter()
 
@@ -13,5 +13,7 @@ api_router.include_router(orders.router, prefix="/orders", tags=["Orders"])
 api_router.include_router(workers.router, prefix="/workers", tags=["Workers"])
 api_router.include_router(services.router, prefix="/services", tags=["Services"])
 api_router.include_router(loyalty.router, prefix="/loyalty", tags=["Loyalty"])
-api_router.include_router(loyalty.router, prefix="/notificaions", tags=["notifications"])
+api_router.include_router(notifications.router, prefix="/notifications", tags=["Notifications"])
+api_router.include_router(admin.router, prefix="/admin", tags=["Admin"])
+api_router.include_router(search.router, prefix="/search", tags=["Search"])
 # api_router.include_router(analytics.router, prefix="/analytics", tags=["Analytics"])
@@ -0,0 +1,16 @@
+# app/api/v1/endpoints/admin.py
+from fastapi import APIRouter, Depends
+
+from app.core.auth import require_admin, Principal
+from app.core.database import replica_router
+from app.core.metrics import metrics
+
+router = APIRouter()
+
+@router.get("/metrics")
+def get_metrics(_: Principal = Depends(require_admin)):
+    """Process-local runtime metrics (connection pools, replicas, caches)"""
+    return {
+        "metrics": metrics.snapshot(),
+        "replicas": replica_router.status(),
+    }
@@ -1,13 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer
-from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
-
-from app.core.database import get_db
-from app.core.auth import auth_handler, authenticate_user, get_current_user
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from app.core.database import get_async_db
+from app.core.auth import auth_handler, authenticate_user, get_current_principal, get_current_user, Principal
+from app.core.rate_limit import client_ip, login_limiter
+from app.core.revocation import family_key, revocation_store
 from app.models import User, UserRole, Customer, Worker
 from app.schemas.user import (
-    UserLogin, UserCreate, TokenResponse, RefreshTokenRequest,
+    UserLogin, UserCreate, TokenResponse, RefreshTokenRequest, LogoutRequest,
     PasswordChange, PasswordReset, UserResponse
 )
 from app.schemas.customer import CustomerCreate
@@ -18,11 +22,15 @@ security = HTTPBearer()
 
 @router.post("/login", response_model=TokenResponse)
 async def login(
+    request: Request,
     user_credentials: UserLogin,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Authenticate user and return JWT tokens"""
-    user = authenticate_user(db, user_credentials.email, user_credentials.password)
+    # Throttled attempts are rejected before the user lookup and bcrypt verify
+    await login_limiter.check(client_ip(request), user_credentials.email)
+
+    user = await authenticate_user(db, user_credentials.email, user_credentials.password)
 
     if not user:
         raise HTTPException(
@@ -46,10 +54,10 @@ async def login(
 
     # Update last login time
     user.last_login_at = datetime.utcnow()
-    db.commit()
+    await db.commit()
 
     # Create tokens
-    access_token = auth_handler.create_access_token(data={"sub": str(user.id)})
+    access_token = auth_handler.create_user_access_token(user)
     refresh_token = auth_handler.create_refresh_token(data={"sub": str(user.id)})
 
     return TokenResponse(
@@ -63,19 +71,20 @@ async def login(
 @router.post("/register", response_model=UserResponse)
 async def register(
     user_data: UserCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Register a new user"""
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = await db.scalar(select(User).where(User.email == user_data.email))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
 
-    # Hash password
-    hashed_password = auth_handler.hash_password(user_data.password)
+    # Hash password, without holding a pooled connection while bcrypt runs
+    await db.commit()
+    hashed_password = await auth_handler.hash_password_async(user_data.password)
 
     # Create user
     db_user = User(
@@ -89,8 +98,8 @@ async def register(
     )
 
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
 
     # Create customer profile if role is customer
     if user_data.role == UserRole.CUSTOMER:
@@ -101,7 +110,7 @@ async def register(
             total_orders=0
         )
         db.add(customer_profile)
-        db.commit()
+        await db.commit()
 
     return UserResponse.from_orm(db_user)
 
@@ -109,19 +118,20 @@ async def register(
 @router.post("/register/customer", response_model=UserResponse)
 async def register_customer(
     customer_data: CustomerCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Register a new customer with profile"""
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == customer_data.email).first()
+    existing_user = await db.scalar(select(User).where(User.email == customer_data.email))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
 
-    # Hash password
-    hashed_password = auth_handler.hash_password(customer_data.password)
+    # Hash password, without holding a pooled connection while bcrypt runs
+    await db.commit()
+    hashed_password = await auth_handler.hash_password_async(customer_data.password)
 
     # Create user
     db_user = User(
@@ -135,8 +145,8 @@ async def register_customer(
     )
 
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
 
     # Create customer profile
     customer_profile = Customer(
@@ -148,7 +158,7 @@ async def register_customer(
         total_orders=0
     )
     db.add(customer_profile)
-    db.commit()
+    await db.commit()
 
     return UserResponse.from_orm(db_user)
 
@@ -156,50 +166,60 @@ async def register_customer(
 @router.post("/refresh", response_model=TokenResponse)
 async def refresh_token(
     refresh_data: RefreshTokenRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Refresh access token using refresh token"""
+    """Rotate a refresh token: the presented token is revoked and a new one issued"""
+    invalid = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token"
+    )
+    payload = auth_handler.decode_token(refresh_data.refresh_token)
+    jti, family = payload.get("jti"), payload.get("fam")
+    # Refresh tokens issued before rotation have no jti and cannot be revoked
+    if payload.get("type") != "refresh" or not jti or not family:
+        raise invalid
     try:
-        payload = auth_handler.decode_token(refresh_data.refresh_token)
-
-        # Check if it's a refresh token
-        if payload.get("type") != "refresh":
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token type"
-            )
-
-        user_id = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token"
-            )
-
-        user = db.query(User).filter(User.id == user_id).first()
-        if not user or not user.is_active:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found or inactive"
-            )
-
-        # Create new tokens
-        access_token = auth_handler.create_access_token(data={"sub": str(user.id)})
-        refresh_token = auth_handler.create_refresh_token(data={"sub": str(user.id)})
-
-        return TokenResponse(
-            access_token=access_token,
-            refresh_token=refresh_token,
-            expires_in=auth_handler.access_token_expire_minutes * 60,
-            user=UserResponse.from_orm(user)
-        )
-
-    except Exception:
+        user_id = int(payload["sub"])
+    except (KeyError, TypeError, ValueError):
+        raise invalid
+
+    # No I/O unless the Bloom filter reports a possible revocation
+    revoked = await revocation_store.revoked(db, [jti, family_key(family)])
+    if family_key(family) in revoked:
+        raise invalid
+    if jti in revoked:
+        # A rotated-out token came back: assume it was stolen and end the session
+        await revocation_store.revoke_family(db, family, user_id)
+        await db.commit()
+        raise invalid
+
+    user = await db.get(User, user_id)
+    if not user or not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid refresh token"
+            detail="User not found or inactive"
         )
 
+    # The unique jti makes this the point of no return: of two concurrent
+    # refreshes with the same token, only one can revoke it
+    expires_at = datetime.fromtimestamp(payload["exp"], tz=timezone.utc)
+    if not await revocation_store.revoke(db, jti, user.id, expires_at):
+        await revocation_store.revoke_family(db, family, user.id)
+        await db.commit()
+        raise invalid
+
+    # Create new tokens
+    access_token = auth_handler.create_user_access_token(user)
+    refresh_token = auth_handler.create_refresh_token(data={"sub": str(user.id), "fam": family})
+    await db.commit()
+
+    return TokenResponse(
+        access_token=access_token,
+        refresh_token=refresh_token,
+        expires_in=auth_handler.access_token_expire_minutes * 60,
+        user=UserResponse.from_orm(user)
+    )
+
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
@@ -213,41 +233,54 @@ async def get_current_user_info(
 async def change_password(
     password_data: PasswordChange,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Change user password"""
-    # Verify current password
-    if not auth_handler.verify_password(password_data.current_password, current_user.hashed_password):
+    # Verify current password; end the read transaction first so the connection
+    # goes back to the pool for the two bcrypt calls
+    await db.commit()
+    if not await auth_handler.verify_password_async(password_data.current_password, current_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Incorrect current password"
         )
 
     # Hash new password
-    new_hashed_password = auth_handler.hash_password(password_data.new_password)
+    new_hashed_password = await auth_handler.hash_password_async(password_data.new_password)
 
     # Update password
     current_user.hashed_password = new_hashed_password
-    db.commit()
+    await db.commit()
 
     return {"message": "Password changed successfully"}
 
 
 @router.post("/logout")
 async def logout(
-    current_user: User = Depends(get_current_user)
+    logout_data: Optional[LogoutRequest] = None,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Logout user (client should discard tokens)"""
+    """Logout user: revokes the session's refresh tokens; the access token expires on its own"""
+    if logout_data and logout_data.refresh_token:
+        try:
+            payload = auth_handler.decode_token(logout_data.refresh_token)
+        except HTTPException:
+            # Expired or forged: it can't be used to refresh anyway
+            payload = {}
+        if payload.get("type") == "refresh" and payload.get("fam") and payload.get("sub") == str(current_user.id):
+            await revocation_store.revoke_family(db, payload["fam"], current_user.id)
+            await db.commit()
     return {"message": "Successfully logged out"}
 
 
 @router.post("/reset-password")
 async def reset_password(
     reset_data: PasswordReset,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Request password reset (would typically send email)"""
-    user = db.query(User).filter(User.email == reset_data.email).first()
+    user = await db.scalar(select(User).where(User.email == reset_data.email))
 
     # Always return success for security (don't reveal if email exists)
     return {"message": "If the email exists, a reset link has been sent"}
@@ -259,7 +292,7 @@ async def register_worker(
     user_data: UserCreate,
     employee_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Register a new worker (admin only)"""
     # Check admin permission
@@ -270,7 +303,7 @@ async def register_worker(
         )
 
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = await db.scalar(select(User).where(User.email == user_data.email))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -278,15 +311,16 @@ async def register_worker(
         )
 
     # Check if employee ID is unique
-    existing_worker = db.query(Worker).filter(Worker.employee_id == employee_id).first()
+    existing_worker = await db.scalar(select(Worker).where(Worker.employee_id == employee_id))
     if existing_worker:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Employee ID already exists"
         )
 
-    # Hash password
-    hashed_password = auth_handler.hash_password(user_data.password)
+    # Hash password, without holding a pooled connection while bcrypt runs
+    await db.commit()
+    hashed_password = await auth_handler.hash_password_async(user_data.password)
 
     # Create user
     db_user = User(
@@ -300,8 +334,8 @@ async def register_worker(
     )
 
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
 
     # Create worker profile
     worker_profile = Worker(
@@ -311,6 +345,6 @@ async def register_worker(
         total_orders_processed=0
     )
     db.add(worker_profile)
-    db.commit()
+    await db.commit()
 
     return UserResponse.from_orm(db_user)
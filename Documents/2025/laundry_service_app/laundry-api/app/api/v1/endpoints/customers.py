@@ -1,29 +1,40 @@
 # app/api/v1/endpoints/customers.py
-from fastapi import APIRouter, Depends, HTTPException, status, Body, Path, Query
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Path, Query, Request, Response
+from sqlalchemy.orm import Session, joinedload
+from typing import List, Optional
 
-from app.core.database import get_db
-from app.core.auth import get_current_user
-from app.models import Customer, Order, User
+from app.core.database import get_db, get_read_db
+from app.core.auth import get_current_principal, Principal
+from app.core.pagination import paginate, add_next_link
+from app.core.query_guard import statement_budget
+from app.models import Customer, Order
 from app.schemas.customer import CustomerCreate, CustomerUpdate, CustomerResponse
 
 router = APIRouter()
 
 @router.get("/", response_model=List[CustomerResponse])
+@statement_budget(1)
 def list_customers(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
     limit: int = Query(50, ge=1, le=200, description="Max customers to return"),
-    offset: int = Query(0, ge=0, description="Pagination offset"),
+    offset: int = Query(0, ge=0, description="Pagination offset (legacy, prefer cursor)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor"),
 ):
-    return db.query(Customer).offset(offset).limit(limit).all()
+    # name/email/phone/is_active come from the user row: join it in the same SELECT
+    query = db.query(Customer).options(joinedload(Customer.user))
+    rows, next_cursor = paginate(query, Customer.id, limit, offset, cursor)
+    add_next_link(request, response, next_cursor)
+    return rows
 
 @router.get("/{customer_id}", response_model=CustomerResponse)
+@statement_budget(1)
 def get_customer(
     customer_id: int = Path(..., ge=1, description="Customer ID"),
     db: Session = Depends(get_db),
 ):
-    obj = db.get(Customer, customer_id)
+    obj = db.get(Customer, customer_id, options=[joinedload(Customer.user)])
     if not obj:
         raise HTTPException(status_code=404, detail="Customer not found")
     return obj
@@ -32,7 +43,7 @@ def get_customer(
 def create_customer(
     payload: CustomerCreate = Body(..., description="Customer data"),
     db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
+    _: Principal = Depends(get_current_principal),
 ):
     obj = Customer(**payload.model_dump())
     db.add(obj); db.commit(); db.refresh(obj)
@@ -43,7 +54,7 @@ def update_customer(
     customer_id: int = Path(..., ge=1),
     payload: CustomerUpdate = Body(..., description="Fields to update"),
     db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
+    _: Principal = Depends(get_current_principal),
 ):
     obj = db.get(Customer, customer_id)
     if not obj:
@@ -57,7 +68,7 @@ def update_customer(
 def delete_customer(
     customer_id: int = Path(..., ge=1),
     db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
+    _: Principal = Depends(get_current_principal),
 ):
     obj = db.get(Customer, customer_id)
     if not obj:
@@ -67,21 +78,22 @@ def delete_customer(
 
 @router.get("/{customer_id}/orders", response_model=List[dict])
 def list_customer_orders(
+    request: Request,
+    response: Response,
     customer_id: int = Path(..., ge=1),
     db: Session = Depends(get_db),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor"),
 ):
     customer = db.get(Customer, customer_id)
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
-    orders = (
-        db.query(Order)
-        .filter(Order.customer_id == customer_id)
-        .offset(offset)
-        .limit(limit)
-        .all()
+    orders, next_cursor = paginate(
+        db.query(Order).filter(Order.customer_id == customer_id),
+        Order.id, limit, offset, cursor,
     )
+    add_next_link(request, response, next_cursor)
     return [
         {"id": o.id, "tracking_id": o.tracking_id,
          "status": getattr(o.status, "value", o.status),
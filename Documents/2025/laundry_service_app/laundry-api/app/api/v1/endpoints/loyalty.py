@@ -1,14 +1,24 @@
 # app/api/v1/endpoints/loyalty.py
-from fastapi import APIRouter, Depends, HTTPException, status, Body, Path, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Path, Query, Request, Response
+from sqlalchemy import case, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from collections import defaultdict
+from typing import List, Optional
 
-from app.core.database import get_db
-from app.core.auth import get_current_user
+from app.core.config import settings
+from app.core.database import get_db, get_read_db, get_async_db
+from app.core.auth import get_current_principal, require_admin, Principal
+from app.core.bulk import batched, bulk_upsert, read_bulk_rows, rejected, summarize
+from app.core.pagination import paginate, add_next_link
 from app.models import (
     PointsTransaction, LoyaltyTierConfig, SubscriptionPlanConfig,
-    TransactionType, Customer, LoyaltyTier, User
+    TransactionType, Customer, LoyaltyTier
 )
+from app.schemas.bulk import BulkResult, BulkRowResult
+from app.services.order_events import PointsChanged
+from app.services.outbox import outbox
+from app.services.pricing import invalidate_pricing_config
 from app.schemas.loyalty import (
     PointsTxnCreate, PointsTxnOut,
     LoyaltyTierConfigCreate, LoyaltyTierConfigUpdate, LoyaltyTierConfigOut,
@@ -17,12 +27,21 @@ from app.schemas.loyalty import (
 
 router = APIRouter()
 
+def _points_delta(transaction_type: TransactionType, points: int) -> int:
+    if transaction_type in (TransactionType.EARNED, TransactionType.BONUS):
+        return points
+    if transaction_type in (TransactionType.REDEEMED, TransactionType.EXPIRED, TransactionType.ADJUSTMENT):
+        return -points
+    return 0
+
+def _points_changed(txn_id: int, row: PointsTxnCreate) -> PointsChanged:
+    return PointsChanged(
+        customer_id=row.customer_id, transaction_id=txn_id, transaction_type=row.transaction_type,
+        points=row.points, order_id=row.order_id,
+    )
+
 def _apply_points(customer: Customer, txn: PointsTransaction) -> None:
-    pts = int(customer.loyalty_points or 0)
-    if txn.transaction_type in (TransactionType.EARNED, TransactionType.BONUS):
-        pts += txn.points
-    elif txn.transaction_type in (TransactionType.REDEEMED, TransactionType.EXPIRED, TransactionType.ADJUSTMENT):
-        pts -= txn.points
+    pts = int(customer.loyalty_points or 0) + _points_delta(txn.transaction_type, txn.points)
     customer.loyalty_points = max(0, pts)
 
 def _update_tier(db: Session, customer: Customer) -> None:
@@ -46,18 +65,23 @@ def _update_tier(db: Session, customer: Customer) -> None:
 # Points transactions
 @router.get("/points", response_model=List[PointsTxnOut])
 def list_points_txns(
-    db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    _: Principal = Depends(get_current_principal),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor"),
 ):
-    return db.query(PointsTransaction).offset(offset).limit(limit).all()
+    rows, next_cursor = paginate(db.query(PointsTransaction), PointsTransaction.id, limit, offset, cursor)
+    add_next_link(request, response, next_cursor)
+    return rows
 
 @router.post("/points", response_model=PointsTxnOut, status_code=status.HTTP_201_CREATED)
 def create_points_txn(
     payload: PointsTxnCreate = Body(..., description="Points transaction"),
     db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
+    _: Principal = Depends(get_current_principal),
 ):
     customer = db.get(Customer, payload.customer_id)
     if not customer:
@@ -65,14 +89,64 @@ def create_points_txn(
     txn = PointsTransaction(**payload.model_dump())
     db.add(txn); db.flush()
     _apply_points(customer, txn); _update_tier(db, customer)
+    outbox.add(db, [_points_changed(txn.id, payload)])
     db.commit(); db.refresh(txn)
     return txn
 
+@router.post("/points/bulk", response_model=BulkResult)
+async def bulk_create_points_txns(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    _: Principal = Depends(require_admin),
+):
+    """Post many points transactions (JSON array or NDJSON) in one transaction.
+
+    Each batch is one multi-row INSERT ... RETURNING plus one set-based UPDATE
+    of the affected balances. Balances are clamped at zero once per batch
+    rather than after every row.
+    """
+    rows, results = await read_bulk_rows(request, PointsTxnCreate, settings.bulk_max_rows)
+
+    known = set()
+    for chunk in batched(list({row.customer_id for _, row in rows}), settings.bulk_batch_size):
+        known.update(await db.scalars(select(Customer.id).where(Customer.id.in_(chunk))))
+    valid = []
+    for index, row in rows:
+        if row.customer_id in known:
+            valid.append((index, row))
+        else:
+            results.append(rejected(index, "Customer not found"))
+
+    for chunk in batched(valid, settings.bulk_batch_size):
+        ids = await db.scalars(
+            insert(PointsTransaction).returning(PointsTransaction.id, sort_by_parameter_order=True),
+            [row.model_dump() for _, row in chunk],
+        )
+        ids = list(ids)
+        results.extend(
+            BulkRowResult(index=index, status="created", id=txn_id) for (index, _), txn_id in zip(chunk, ids)
+        )
+        await outbox.add_async(db, [_points_changed(txn_id, row) for (_, row), txn_id in zip(chunk, ids)])
+
+        deltas = defaultdict(int)
+        for _, row in chunk:
+            deltas[row.customer_id] += _points_delta(row.transaction_type, row.points)
+        balance = func.coalesce(Customer.loyalty_points, 0) + case(deltas, value=Customer.id, else_=0)
+        await db.execute(
+            update(Customer)
+            .where(Customer.id.in_(deltas))
+            .values(loyalty_points=case((balance < 0, 0), else_=balance))
+            .execution_options(synchronize_session=False)
+        )
+
+    await db.commit()
+    return summarize(results)
+
 # Tier config
 @router.get("/tiers", response_model=List[LoyaltyTierConfigOut])
 def list_tiers(
     db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
+    _: Principal = Depends(get_current_principal),
 ):
     return db.query(LoyaltyTierConfig).all()
 
@@ -80,18 +154,32 @@ def list_tiers(
 def create_tier(
     payload: LoyaltyTierConfigCreate = Body(..., description="Tier config"),
     db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
+    _: Principal = Depends(get_current_principal),
 ):
     obj = LoyaltyTierConfig(**payload.model_dump())
     db.add(obj); db.commit(); db.refresh(obj)
+    invalidate_pricing_config()
     return obj
 
+@router.post("/tiers/bulk", response_model=BulkResult)
+async def bulk_upsert_tiers(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    _: Principal = Depends(require_admin),
+):
+    """Create or update tier configs by tier_name (JSON array or NDJSON)"""
+    rows, results = await read_bulk_rows(request, LoyaltyTierConfigCreate, settings.bulk_max_rows)
+    results += await bulk_upsert(db, LoyaltyTierConfig, "tier_name", rows, settings.bulk_batch_size)
+    await db.commit()
+    invalidate_pricing_config()
+    return summarize(results)
+
 @router.put("/tiers/{tier_id}", response_model=LoyaltyTierConfigOut)
 def update_tier(
     tier_id: int = Path(..., ge=1),
     payload: LoyaltyTierConfigUpdate = Body(...),
     db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
+    _: Principal = Depends(get_current_principal),
 ):
     obj = db.get(LoyaltyTierConfig, tier_id)
     if not obj:
@@ -99,25 +187,27 @@ def update_tier(
     for k, v in payload.model_dump(exclude_unset=True).items():
         setattr(obj, k, v)
     db.commit(); db.refresh(obj)
+    invalidate_pricing_config()
     return obj
 
 @router.delete("/tiers/{tier_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_tier(
     tier_id: int = Path(..., ge=1),
     db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
+    _: Principal = Depends(get_current_principal),
 ):
     obj = db.get(LoyaltyTierConfig, tier_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Tier config not found")
     db.delete(obj); db.commit()
+    invalidate_pricing_config()
     return None
 
 # Subscription plans
 @router.get("/plans", response_model=List[SubscriptionPlanConfigOut])
 def list_plans(
     db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
+    _: Principal = Depends(get_current_principal),
 ):
     return db.query(SubscriptionPlanConfig).all()
 
@@ -125,18 +215,32 @@ def list_plans(
 def create_plan(
     payload: SubscriptionPlanConfigCreate = Body(..., description="Plan config"),
     db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
+    _: Principal = Depends(get_current_principal),
 ):
     obj = SubscriptionPlanConfig(**payload.model_dump())
     db.add(obj); db.commit(); db.refresh(obj)
+    invalidate_pricing_config()
     return obj
 
+@router.post("/plans/bulk", response_model=BulkResult)
+async def bulk_upsert_plans(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    _: Principal = Depends(require_admin),
+):
+    """Create or update subscription plans by plan_name (JSON array or NDJSON)"""
+    rows, results = await read_bulk_rows(request, SubscriptionPlanConfigCreate, settings.bulk_max_rows)
+    results += await bulk_upsert(db, SubscriptionPlanConfig, "plan_name", rows, settings.bulk_batch_size)
+    await db.commit()
+    invalidate_pricing_config()
+    return summarize(results)
+
 @router.put("/plans/{plan_id}", response_model=SubscriptionPlanConfigOut)
 def update_plan(
     plan_id: int = Path(..., ge=1),
     payload: SubscriptionPlanConfigUpdate = Body(...),
     db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
+    _: Principal = Depends(get_current_principal),
 ):
     obj = db.get(SubscriptionPlanConfig, plan_id)
     if not obj:
@@ -144,16 +248,18 @@ def update_plan(
     for k, v in payload.model_dump(exclude_unset=True).items():
         setattr(obj, k, v)
     db.commit(); db.refresh(obj)
+    invalidate_pricing_config()
     return obj
 
 @router.delete("/plans/{plan_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_plan(
     plan_id: int = Path(..., ge=1),
     db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
+    _: Principal = Depends(get_current_principal),
 ):
     obj = db.get(SubscriptionPlanConfig, plan_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Plan config not found")
     db.delete(obj); db.commit()
+    invalidate_pricing_config()
     return None
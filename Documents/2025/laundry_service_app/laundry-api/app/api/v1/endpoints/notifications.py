@@ -1,46 +1,52 @@
 # app/api/v1/endpoints/notifications.py
-from fastapi import APIRouter, Depends, HTTPException, status, Body, Path, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Path, Query, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
-from app.core.database import get_db
-from app.core.auth import get_current_user
-from app.models import MessageTemplate, Notification, NotificationPreference, WebhookEvent, User
+from app.core.database import get_db, get_read_db
+from app.core.auth import get_current_principal, Principal
+from app.core.pagination import paginate, add_next_link
+from app.models import MessageTemplate, Notification, NotificationPreference, WebhookEvent
 from app.schemas.notification import (
-    MessageTemplateCreate, MessageTemplateUpdate, MessageTemplateOut,
-    NotificationCreate, NotificationOut,
-    NotificationPreferenceCreate, NotificationPreferenceUpdate, NotificationPreferenceOut,
+    MessageTemplateCreate, MessageTemplateUpdate, MessageTemplateResponse,
+    NotificationCreate, NotificationResponse,
+    NotificationPreferenceCreate, NotificationPreferenceUpdate, NotificationPreferenceResponse,
     WebhookEventIn, WebhookEventOut
 )
 
 router = APIRouter()
 
 # Templates
-@router.get("/templates", response_model=List[MessageTemplateOut])
+@router.get("/templates", response_model=List[MessageTemplateResponse])
 def list_templates(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
+    _: Principal = Depends(get_current_principal),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor"),
 ):
-    return db.query(MessageTemplate).offset(offset).limit(limit).all()
+    rows, next_cursor = paginate(db.query(MessageTemplate), MessageTemplate.id, limit, offset, cursor)
+    add_next_link(request, response, next_cursor)
+    return rows
 
-@router.post("/templates", response_model=MessageTemplateOut, status_code=status.HTTP_201_CREATED)
+@router.post("/templates", response_model=MessageTemplateResponse, status_code=status.HTTP_201_CREATED)
 def create_template(
     payload: MessageTemplateCreate = Body(..., description="Template details"),
     db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
+    _: Principal = Depends(get_current_principal),
 ):
     obj = MessageTemplate(**payload.model_dump())
     db.add(obj); db.commit(); db.refresh(obj)
     return obj
 
-@router.put("/templates/{template_id}", response_model=MessageTemplateOut)
+@router.put("/templates/{template_id}", response_model=MessageTemplateResponse)
 def update_template(
     template_id: int = Path(..., ge=1),
     payload: MessageTemplateUpdate = Body(...),
     db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
+    _: Principal = Depends(get_current_principal),
 ):
     obj = db.get(MessageTemplate, template_id)
     if not obj:
@@ -54,7 +60,7 @@ def update_template(
 def delete_template(
     template_id: int = Path(..., ge=1),
     db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
+    _: Principal = Depends(get_current_principal),
 ):
     obj = db.get(MessageTemplate, template_id)
     if not obj:
@@ -63,51 +69,63 @@ def delete_template(
     return None
 
 # Notifications
-@router.get("/", response_model=List[NotificationOut])
+@router.get("/", response_model=List[NotificationResponse])
 def list_notifications(
-    db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    _: Principal = Depends(get_current_principal),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor"),
 ):
-    return db.query(Notification).offset(offset).limit(limit).all()
+    rows, next_cursor = paginate(db.query(Notification), Notification.id, limit, offset, cursor)
+    add_next_link(request, response, next_cursor)
+    return rows
 
-@router.post("/", response_model=NotificationOut, status_code=status.HTTP_201_CREATED)
+@router.post("/", response_model=NotificationResponse, status_code=status.HTTP_201_CREATED)
 def create_notification(
     payload: NotificationCreate = Body(..., description="Outbound message"),
     db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
+    _: Principal = Depends(get_current_principal),
 ):
-    obj = Notification(**payload.model_dump())
+    data = payload.model_dump()
+    data["message_metadata"] = data.pop("metadata")
+    obj = Notification(**data)
     db.add(obj); db.commit(); db.refresh(obj)
     return obj
 
 # Preferences
-@router.get("/preferences", response_model=List[NotificationPreferenceOut])
+@router.get("/preferences", response_model=List[NotificationPreferenceResponse])
 def list_preferences(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
+    _: Principal = Depends(get_current_principal),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor"),
 ):
-    return db.query(NotificationPreference).offset(offset).limit(limit).all()
+    rows, next_cursor = paginate(db.query(NotificationPreference), NotificationPreference.id, limit, offset, cursor)
+    add_next_link(request, response, next_cursor)
+    return rows
 
-@router.post("/preferences", response_model=NotificationPreferenceOut, status_code=status.HTTP_201_CREATED)
+@router.post("/preferences", response_model=NotificationPreferenceResponse, status_code=status.HTTP_201_CREATED)
 def create_preference(
     payload: NotificationPreferenceCreate = Body(..., description="Notification prefs"),
     db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
+    _: Principal = Depends(get_current_principal),
 ):
     obj = NotificationPreference(**payload.model_dump())
     db.add(obj); db.commit(); db.refresh(obj)
     return obj
 
-@router.put("/preferences/{pref_id}", response_model=NotificationPreferenceOut)
+@router.put("/preferences/{pref_id}", response_model=NotificationPreferenceResponse)
 def update_preference(
     pref_id: int = Path(..., ge=1),
     payload: NotificationPreferenceUpdate = Body(...),
     db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
+    _: Principal = Depends(get_current_principal),
 ):
     obj = db.get(NotificationPreference, pref_id)
     if not obj:
@@ -121,7 +139,7 @@ def update_preference(
 def delete_preference(
     pref_id: int = Path(..., ge=1),
     db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
+    _: Principal = Depends(get_current_principal),
 ):
     obj = db.get(NotificationPreference, pref_id)
     if not obj:
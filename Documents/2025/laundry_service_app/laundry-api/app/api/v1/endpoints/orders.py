@@ -1,66 +1,148 @@
-# app/api/v1/endpoints/workers.py
-from fastapi import APIRouter, Depends, HTTPException, status, Body, Path, Query
-from sqlalchemy.orm import Session
-from typing import List
+# app/api/v1/endpoints/orders.py
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Path, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Optional
 
-from app.core.database import get_db
-from app.core.auth import get_current_user
-from app.models import Worker, User
-from app.schemas.worker import WorkerCreate, WorkerUpdate, WorkerOut
+from app.core.database import get_db, get_read_db, get_async_db
+from app.core.auth import get_current_principal, require_worker_or_admin, Principal
+from app.core.pagination import paginate, add_next_link
+from app.core.query_guard import statement_budget
+from app.schemas.bulk import BulkResult
+from app.models import Customer, Order, OrderItem, OrderStatus, UserRole
+from app.schemas.order import (
+    OrderCreate, OrderOut, OrderStatusChange, OrderStatusBulkChange, OrderStatusBulkResult,
+    OrderStatusRejection, OrderTrackingOut
+)
+from app.services.order_events import order_events
+from app.services.order_import import OrderImporter, request_orders
+from app.services.order_service import order_service
+from app.services.tracking import tracking_snapshots
 
 router = APIRouter()
 
-@router.get("/", response_model=List[WorkerOut])
-def list_workers(
-    db: Session = Depends(get_db),
+def _visible_orders(db: Session, principal: Principal):
+    """Orders with their items; customers only see their own"""
+    query = db.query(Order).options(selectinload(Order.items))
+    if principal.role == UserRole.CUSTOMER:
+        query = query.join(Customer, Order.customer_id == Customer.id).filter(Customer.user_id == principal.id)
+    return query
+
+@router.get("/track/{tracking_id}", response_model=OrderTrackingOut)
+@statement_budget(1)
+async def track_order(tracking_id: str = Path(..., min_length=1, max_length=64)):
+    """Public order tracking, served from cached snapshots"""
+    body = await tracking_snapshots.get(tracking_id)
+    if body is None:
+        raise HTTPException(status_code=404, detail="Order not found")
+    # Already serialized as OrderTrackingOut; skip response_model validation
+    return Response(content=body, media_type="application/json")
+
+# Budgets count the token version lookup a cold auth cache adds
+@router.get("/", response_model=List[OrderOut])
+@statement_budget(3)
+def list_orders(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    principal: Principal = Depends(get_current_principal),
+    status_filter: Optional[OrderStatus] = Query(None, alias="status"),
+    customer_id: Optional[int] = Query(None, ge=1),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor"),
 ):
-    return db.query(Worker).offset(offset).limit(limit).all()
+    query = _visible_orders(db, principal)
+    if status_filter is not None:
+        query = query.filter(Order.status == status_filter)
+    if customer_id is not None:
+        query = query.filter(Order.customer_id == customer_id)
+    rows, next_cursor = paginate(query, Order.id, limit, offset, cursor)
+    add_next_link(request, response, next_cursor)
+    return rows
 
-@router.get("/{worker_id}", response_model=WorkerOut)
-def get_worker(
-    worker_id: int = Path(..., ge=1),
+@router.get("/{order_id}", response_model=OrderOut)
+@statement_budget(3)
+def get_order(
+    order_id: int = Path(..., ge=1),
     db: Session = Depends(get_db),
+    principal: Principal = Depends(get_current_principal),
 ):
-    obj = db.get(Worker, worker_id)
+    obj = _visible_orders(db, principal).filter(Order.id == order_id).first()
     if not obj:
-        raise HTTPException(status_code=404, detail="Worker not found")
+        raise HTTPException(status_code=404, detail="Order not found")
     return obj
 
-@router.post("/", response_model=WorkerOut, status_code=status.HTTP_201_CREATED)
-def create_worker(
-    payload: WorkerCreate = Body(..., description="Worker data"),
-    db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
+@router.post("/", response_model=OrderOut, status_code=status.HTTP_201_CREATED)
+@statement_budget(8)
+async def create_order(
+    payload: OrderCreate = Body(..., description="Order with its items"),
+    db: AsyncSession = Depends(get_async_db),
+    principal: Principal = Depends(get_current_principal),
 ):
-    obj = Worker(**payload.model_dump())
-    db.add(obj); db.commit(); db.refresh(obj)
-    return obj
+    """Price and create an order with all its items in one transaction"""
+    order, intake = await order_service.create_order(db, payload, principal)
+    try:
+        await db.commit()
+    except BaseException:
+        intake.rolled_back()
+        raise
+    intake.committed()
+    return order
 
-@router.put("/{worker_id}", response_model=WorkerOut)
-def update_worker(
-    worker_id: int = Path(..., ge=1),
-    payload: WorkerUpdate = Body(...),
-    db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
+@router.post("/import", response_model=BulkResult)
+async def import_orders(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    principal: Principal = Depends(require_worker_or_admin),
 ):
-    obj = db.get(Worker, worker_id)
-    if not obj:
-        raise HTTPException(status_code=404, detail="Worker not found")
-    for k, v in payload.model_dump(exclude_unset=True).items():
-        setattr(obj, k, v)
-    db.commit(); db.refresh(obj)
-    return obj
+    """Import orders captured offline (CSV, NDJSON or JSON array), streamed in batches.
 
-@router.delete("/{worker_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_worker(
-    worker_id: int = Path(..., ge=1),
-    db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
+    CSV has one line per item; consecutive lines sharing an order_ref are
+    one order. Each batch commits on its own and bad rows are reported by
+    index, so a large file does not fail as a whole.
+    """
+    return await OrderImporter(db, captured_by_id=principal.id).run(request_orders(request))
+
+@router.patch("/status", response_model=OrderStatusBulkResult)
+async def change_orders_status(
+    payload: OrderStatusBulkChange = Body(...),
+    db: AsyncSession = Depends(get_async_db),
+    principal: Principal = Depends(require_worker_or_admin),
 ):
-    obj = db.get(Worker, worker_id)
-    if not obj:
-        raise HTTPException(status_code=404, detail="Worker not found")
-    db.delete(obj); db.commit()
-    return None
+    """Move many orders to one status; orders that cannot move are reported, not fatal"""
+    changed, events, errors = await order_service.change_status(
+        db, payload.order_ids, OrderStatus(payload.status), payload.notes, principal.id
+    )
+    await db.commit()
+    for event in events:
+        order_events.publish(event)
+    return OrderStatusBulkResult(
+        updated=[order["id"] for order in changed],
+        rejected=[OrderStatusRejection(order_id=order_id, error=error.detail) for order_id, error in errors.items()],
+    )
+
+@router.patch("/{order_id}/status", response_model=OrderOut)
+@statement_budget(5)
+async def change_order_status(
+    order_id: int = Path(..., ge=1),
+    payload: OrderStatusChange = Body(...),
+    db: AsyncSession = Depends(get_async_db),
+    principal: Principal = Depends(require_worker_or_admin),
+):
+    """Move an order along pending -> in-progress -> ready -> completed (or cancelled)"""
+    changed, events, errors = await order_service.change_status(
+        db, [order_id], OrderStatus(payload.status), payload.notes, principal.id
+    )
+    if errors:
+        raise errors[order_id]
+    await db.commit()
+    order_events.publish(events[0])
+    order = changed[0]
+    order["items"] = [row._asdict() for row in await db.execute(
+        select(OrderItem.id, OrderItem.service_type_id, OrderItem.quantity,
+               OrderItem.price_per_item, OrderItem.total_price)
+        .where(OrderItem.order_id == order_id).order_by(OrderItem.id)
+    )]
+    return order
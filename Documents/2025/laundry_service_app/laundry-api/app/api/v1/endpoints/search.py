@@ -0,0 +1,26 @@
+# app/api/v1/endpoints/search.py
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_async_db
+from app.core.auth import require_worker_or_admin, Principal
+from app.core.query_guard import statement_budget
+from app.schemas.search import SearchResults
+from app.services.search import search
+
+router = APIRouter()
+
+@router.get("/", response_model=SearchResults)
+@statement_budget(2)
+async def search_counter(
+    q: str = Query(..., min_length=3, max_length=100, description="Partial tracking ID, customer name, phone or note"),
+    limit: int = Query(20, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_db),
+    _: Principal = Depends(require_worker_or_admin),
+):
+    """Customers and orders for the counter screen, best match first.
+
+    Matches values containing q, or similar to it by trigrams (typos in
+    names); a matched customer also brings their latest orders.
+    """
+    return await search(db, q, limit)
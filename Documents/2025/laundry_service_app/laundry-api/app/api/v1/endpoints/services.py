@@ -1,17 +1,21 @@
 # app/api/v1/endpoints/services.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
 
-from app.core.database import get_db
-from app.core.auth import get_current_user
-from app.models import ServiceType, User
+from app.core.config import settings
+from app.core.database import get_db, get_read_db, get_async_db
+from app.core.auth import get_current_principal, require_admin, Principal
+from app.core.bulk import bulk_upsert, read_bulk_rows, summarize
+from app.models import ServiceType
+from app.schemas.bulk import BulkResult
 from app.schemas.service import ServiceTypeCreate, ServiceTypeUpdate, ServiceTypeOut
 
 router = APIRouter()
 
 @router.get("/", response_model=List[ServiceTypeOut])
-def list_services(db: Session = Depends(get_db)):
+def list_services(db: Session = Depends(get_read_db)):
     return db.query(ServiceType).all()
 
 @router.get("/{service_id}", response_model=ServiceTypeOut)
@@ -22,13 +26,21 @@ def get_service(service_id: int, db: Session = Depends(get_db)):
     return obj
 
 @router.post("/", response_model=ServiceTypeOut, status_code=status.HTTP_201_CREATED)
-def create_service(payload: ServiceTypeCreate, db: Session = Depends(get_db), _: User = Depends(get_current_user)):
+def create_service(payload: ServiceTypeCreate, db: Session = Depends(get_db), _: Principal = Depends(get_current_principal)):
     obj = ServiceType(**payload.model_dump())
     db.add(obj); db.commit(); db.refresh(obj)
     return obj
 
+@router.post("/bulk", response_model=BulkResult)
+async def bulk_upsert_services(request: Request, db: AsyncSession = Depends(get_async_db), _: Principal = Depends(require_admin)):
+    """Create or update service types by name (JSON array or NDJSON)"""
+    rows, results = await read_bulk_rows(request, ServiceTypeCreate, settings.bulk_max_rows)
+    results += await bulk_upsert(db, ServiceType, "name", rows, settings.bulk_batch_size)
+    await db.commit()
+    return summarize(results)
+
 @router.put("/{service_id}", response_model=ServiceTypeOut)
-def update_service(service_id: int, payload: ServiceTypeUpdate, db: Session = Depends(get_db), _: User = Depends(get_current_user)):
+def update_service(service_id: int, payload: ServiceTypeUpdate, db: Session = Depends(get_db), _: Principal = Depends(get_current_principal)):
     obj = db.get(ServiceType, service_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Service type not found")
@@ -38,7 +50,7 @@ def update_service(service_id: int, payload: ServiceTypeUpdate, db: Session = De
     return obj
 
 @router.delete("/{service_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_service(service_id: int, db: Session = Depends(get_db), _: User = Depends(get_current_user)):
+def delete_service(service_id: int, db: Session = Depends(get_db), _: Principal = Depends(get_current_principal)):
     obj = db.get(ServiceType, service_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Service type not found")
@@ -1,9 +1,10 @@
 # app/api/v1/endpoints/users.py
-from fastapi import APIRouter, Depends, HTTPException, status, Body, Path, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Path, Query, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.core.database import get_db
-from app.core.auth import get_current_user
+from app.core.auth import get_current_principal, invalidate_token_version, revoke_access_tokens, Principal
+from app.core.pagination import paginate, add_next_link
 from app.models import User
 from app.schemas.user import UserCreate, UserUpdate, UserResponse
 
@@ -11,11 +12,16 @@ router = APIRouter()
 
 @router.get("/", response_model=List[UserResponse])
 def list_users(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     limit: int = Query(50, ge=1, le=200, description="Max users to return"),
-    offset: int = Query(0, ge=0, description="Pagination offset"),
+    offset: int = Query(0, ge=0, description="Pagination offset (legacy, prefer cursor)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor"),
 ):
-    return db.query(User).offset(offset).limit(limit).all()
+    rows, next_cursor = paginate(db.query(User), User.id, limit, offset, cursor)
+    add_next_link(request, response, next_cursor)
+    return rows
 
 @router.get("/{user_id}", response_model=UserResponse)
 def get_user(
@@ -31,7 +37,7 @@ def get_user(
 def create_user(
     payload: UserCreate = Body(..., description="User data (JSON)"),
     db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
+    _: Principal = Depends(get_current_principal),
 ):
     obj = User(**payload.model_dump())
     db.add(obj); db.commit(); db.refresh(obj)
@@ -42,12 +48,16 @@ def update_user(
     user_id: int = Path(..., ge=1),
     payload: UserUpdate = Body(...),
     db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
+    _: Principal = Depends(get_current_principal),
 ):
     obj = db.get(User, user_id)
     if not obj:
         raise HTTPException(status_code=404, detail="User not found")
-    for k, v in payload.model_dump(exclude_unset=True).items():
+    changes = payload.model_dump(exclude_unset=True)
+    if "is_active" in changes and changes["is_active"] != obj.is_active:
+        revoke_access_tokens(obj)
+    for k, v in changes.items():
         setattr(obj, k, v)
     db.commit(); db.refresh(obj)
+    invalidate_token_version(obj.id)
     return obj
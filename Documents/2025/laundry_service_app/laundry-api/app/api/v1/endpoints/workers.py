@@ -1,29 +1,48 @@
 # app/api/v1/endpoints/workers.py
-from fastapi import APIRouter, Depends, HTTPException, status, Body, Path, Query
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Path, Query, Request, Response
+from sqlalchemy.orm import Session, joinedload
+from typing import List, Optional
 
-from app.core.database import get_db
-from app.core.auth import get_current_user
-from app.models import Worker, User
-from app.schemas.worker import WorkerCreate, WorkerUpdate, WorkerOut
+from app.core.database import get_db, get_read_db
+from app.core.auth import get_current_principal, require_worker_or_admin, Principal
+from app.core.pagination import paginate, add_next_link
+from app.core.query_guard import statement_budget
+from app.models import Worker
+from app.schemas.worker import WorkerCreate, WorkerUpdate, WorkerOut, WorkerLoadOut
+from app.services.assignment import assignment_scheduler
 
 router = APIRouter()
 
 @router.get("/", response_model=List[WorkerOut])
+@statement_budget(1)
 def list_workers(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor"),
+):
+    query = db.query(Worker).options(joinedload(Worker.user))
+    rows, next_cursor = paginate(query, Worker.id, limit, offset, cursor)
+    add_next_link(request, response, next_cursor)
+    return rows
+
+@router.get("/load", response_model=List[WorkerLoadOut])
+@statement_budget(0)
+def list_worker_load(
+    _: Principal = Depends(require_worker_or_admin),
 ):
-    return db.query(Worker).offset(offset).limit(limit).all()
+    """Open orders and remaining hours per active worker, least loaded first"""
+    return assignment_scheduler.snapshot()
 
 @router.get("/{worker_id}", response_model=WorkerOut)
+@statement_budget(1)
 def get_worker(
     worker_id: int = Path(..., ge=1),
     db: Session = Depends(get_db),
 ):
-    obj = db.get(Worker, worker_id)
+    obj = db.get(Worker, worker_id, options=[joinedload(Worker.user)])
     if not obj:
         raise HTTPException(status_code=404, detail="Worker not found")
     return obj
@@ -32,7 +51,7 @@ def get_worker(
 def create_worker(
     payload: WorkerCreate = Body(..., description="Worker data"),
     db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
+    _: Principal = Depends(get_current_principal),
 ):
     obj = Worker(**payload.model_dump())
     db.add(obj); db.commit(); db.refresh(obj)
@@ -43,7 +62,7 @@ def update_worker(
     worker_id: int = Path(..., ge=1),
     payload: WorkerUpdate = Body(...),
     db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
+    _: Principal = Depends(get_current_principal),
 ):
     obj = db.get(Worker, worker_id)
     if not obj:
@@ -57,7 +76,7 @@ def update_worker(
 def delete_worker(
     worker_id: int = Path(..., ge=1),
     db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
+    _: Principal = Depends(get_current_principal),
 ):
     obj = db.get(Worker, worker_id)
     if not obj:
@@ -0,0 +1,169 @@
+"""Operational commands, run once per deploy rather than in every API worker.
+
+    python -m app.cli bootstrap   # alembic upgrade head + seed default data
+    python -m app.cli migrate     # alembic upgrade head only
+    python -m app.cli seed        # seed default data only
+    python -m app.cli prune-revoked-tokens  # delete revocations of already-expired tokens
+    python -m app.cli calibrate-bcrypt --target-ms 250  # pick BCRYPT_ROUNDS for this host
+    python -m app.cli dispatch-outbox  # deliver outbox events (run as many as needed)
+    python -m app.cli import-orders orders.csv --captured-by 3  # load offline orders (.csv, .ndjson, .json)
+"""
+import argparse
+import logging
+import statistics
+import time
+
+from app.core.logging_config import setup_logging
+
+logger = logging.getLogger(__name__)
+
+
+def migrate(args):
+    from app.core.migrations import upgrade_to_head
+    upgrade_to_head()
+
+
+def seed(args):
+    from app.utils.init_data import initialize_default_data
+    initialize_default_data()
+
+
+def prune_revoked_tokens(args):
+    from sqlalchemy import delete, func
+    from app.core.database import SessionLocal
+    from app.models import RevokedToken
+    with SessionLocal() as db:
+        deleted = db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= func.now())).rowcount
+        db.commit()
+    logger.info(f"Pruned {deleted} expired token revocations")
+
+
+def measure_bcrypt_verify_ms(rounds: int, samples: int) -> float:
+    """Median time to verify one password hashed at the given cost"""
+    from passlib.hash import bcrypt
+    hashed = bcrypt.using(rounds=rounds).hash("calibration-password")
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        bcrypt.verify("calibration-password", hashed)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate_bcrypt(args):
+    """Highest cost whose verify time on this host stays within the target"""
+    from app.core.config import settings
+    chosen = args.min_rounds
+    print(f"{'rounds':>6} {'verify ms':>10}")
+    for rounds in range(args.min_rounds, args.max_rounds + 1):
+        elapsed = measure_bcrypt_verify_ms(rounds, args.samples)
+        print(f"{rounds:>6} {elapsed:>10.1f}")
+        if elapsed > args.target_ms:
+            break
+        chosen = rounds
+    # Each extra round doubles the cost, so the next one can only be slower
+    print(f"\nBCRYPT_ROUNDS={chosen}  (target {args.target_ms:.0f}ms, currently {settings.bcrypt_rounds})")
+    if chosen != settings.bcrypt_rounds:
+        print("Existing hashes are upgraded to the new cost as users log in.")
+
+
+def dispatch_outbox(args):
+    """Deliver outbox events until interrupted, or until drained with --once"""
+    import asyncio
+    from app.core.database import async_engine
+    from app.services.outbox import outbox
+    # Consumers register on import
+    import app.services.loyalty_service  # noqa: F401
+    import app.services.notification_service  # noqa: F401
+
+    async def run():
+        try:
+            if args.once:
+                delivered = 0
+                while (claimed := await outbox.dispatch_batch()):
+                    delivered += claimed
+                logger.info(f"Outbox drained: {delivered} events claimed")
+            else:
+                logger.info("Outbox dispatcher started")
+                await outbox.run()
+        finally:
+            await async_engine.dispose()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        logger.info("Outbox dispatcher stopped")
+
+
+def import_orders(args):
+    """Stream an offline order file into the DB, batch by batch"""
+    import asyncio
+    from app.core.database import AsyncSessionLocal, async_engine
+    from app.core.ids import tracking_ids
+    from app.services.assignment import assignment_scheduler
+    from app.services.eta import eta_engine
+    from app.services.order_import import OrderImporter, file_orders
+    # Completed orders queue loyalty events; the consumer registers on import
+    import app.services.loyalty_service  # noqa: F401
+
+    async def run():
+        await tracking_ids.start()
+        try:
+            # Worker loads and queues as the API sees them, so imported orders queue behind live ones
+            await asyncio.to_thread(assignment_scheduler.refresh)
+            await eta_engine.refresh()
+            async with AsyncSessionLocal() as db:
+                return await OrderImporter(db, captured_by_id=args.captured_by).run(file_orders(args.path))
+        finally:
+            await tracking_ids.stop()
+            await async_engine.dispose()
+
+    started = time.perf_counter()
+    result = asyncio.run(run())
+    rejected = [row for row in result.results if row.status == "rejected"]
+    print(f"{result.created} orders imported, {result.rejected} rejected in {time.perf_counter() - started:.1f}s")
+    for row in rejected[:args.show_errors]:
+        print(f"  row {row.index}: {row.error}")
+    if len(rejected) > args.show_errors:
+        print(f"  ... and {len(rejected) - args.show_errors} more")
+
+
+def bootstrap(args):
+    migrate(args)
+    seed(args)
+    logger.info("Bootstrap completed")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="LaundryPro operational commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("bootstrap", help="Migrate to head and seed default data").set_defaults(func=bootstrap)
+    commands.add_parser("migrate", help="Migrate to head").set_defaults(func=migrate)
+    commands.add_parser("seed", help="Seed default data (idempotent)").set_defaults(func=seed)
+    commands.add_parser(
+        "prune-revoked-tokens", help="Delete revocations of tokens that have expired anyway"
+    ).set_defaults(func=prune_revoked_tokens)
+    calibrate = commands.add_parser(
+        "calibrate-bcrypt", help="Benchmark bcrypt on this host and recommend BCRYPT_ROUNDS"
+    )
+    calibrate.add_argument("--target-ms", type=float, default=250, help="Target verify time per login")
+    calibrate.add_argument("--min-rounds", type=int, default=10, help="Never recommend less than this")
+    calibrate.add_argument("--max-rounds", type=int, default=16)
+    calibrate.add_argument("--samples", type=int, default=5)
+    calibrate.set_defaults(func=calibrate_bcrypt)
+    dispatch = commands.add_parser("dispatch-outbox", help="Deliver queued notification and loyalty events")
+    dispatch.add_argument("--once", action="store_true", help="Exit once no event is due")
+    dispatch.set_defaults(func=dispatch_outbox)
+    importer = commands.add_parser("import-orders", help="Import orders captured offline from a file")
+    importer.add_argument("path", help="CSV (one line per item, grouped by order_ref), NDJSON or JSON array")
+    importer.add_argument("--captured-by", type=int, help="User id recorded as capturing rows without captured_by_id")
+    importer.add_argument("--show-errors", type=int, default=20, help="Rejected rows to print")
+    importer.set_defaults(func=import_orders)
+
+    args = parser.parse_args(argv)
+    setup_logging()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,54 @@
+import asyncio
+import hashlib
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional, Union
+from typing import Optional, Set, Union
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import InvalidationBus, TTLCache
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import AsyncSessionLocal, get_async_db
+from app.core.metrics import metrics
+from app.core.password_pool import PasswordHashPool, PasswordPoolSaturated
 from app.models import User, UserRole
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+logger = logging.getLogger(__name__)
+
+# Password hashing. min = max = default pins the cost, so needs_update() flags
+# hashes made at any other cost (higher or lower) for a rehash on login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.bcrypt_rounds,
+    bcrypt__min_rounds=settings.bcrypt_rounds,
+    bcrypt__max_rounds=settings.bcrypt_rounds,
+)
+
+# bcrypt work for request handlers; see hash_password_async/verify_password_async
+password_pool = PasswordHashPool(
+    workers=settings.password_hash_workers or os.cpu_count() or 1,
+    max_queue=settings.password_hash_max_queue,
+)
 
 # JWT token security
 security = HTTPBearer()
 
+# Claims of access tokens that already passed jwt.decode, keyed by the SHA-256
+# of the whole token so an altered token can never hit an existing entry
+token_cache = TTLCache(
+    maxsize=settings.token_cache_size,
+    ttl=settings.access_token_expire_minutes * 60,
+    name="token",
+)
+
 
 class AuthHandler:
     def __init__(self):
@@ -31,6 +65,14 @@ class AuthHandler:
         """Verify a password against its hash"""
         return pwd_context.verify(plain_password, hashed_password)
 
+    async def hash_password_async(self, password: str) -> str:
+        """Hash a password on the bcrypt pool without blocking the event loop"""
+        return await password_pool.run(pwd_context.hash, password)
+
+    async def verify_password_async(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password on the bcrypt pool without blocking the event loop"""
+        return await password_pool.run(pwd_context.verify, plain_password, hashed_password)
+
     def create_access_token(self, data: dict, expires_delta: Optional[timedelta] = None) -> str:
         """Create JWT access token"""
         to_encode = data.copy()
@@ -43,11 +85,18 @@ class AuthHandler:
         encoded_jwt = jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
         return encoded_jwt
 
+    def create_user_access_token(self, user: User) -> str:
+        """Access token whose role/ver claims let routes authorize without loading the user"""
+        return self.create_access_token(
+            data={"sub": str(user.id), "role": user.role.value, "ver": user.token_version or 0}
+        )
+
     def create_refresh_token(self, data: dict) -> str:
-        """Create JWT refresh token"""
+        """Create JWT refresh token with a unique jti, in a new family unless data has "fam" """
         to_encode = data.copy()
         expire = datetime.utcnow() + timedelta(days=self.refresh_token_expire_days)
-        to_encode.update({"exp": expire, "type": "refresh"})
+        to_encode.setdefault("fam", uuid.uuid4().hex)
+        to_encode.update({"exp": expire, "type": "refresh", "jti": uuid.uuid4().hex})
         encoded_jwt = jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
         return encoded_jwt
 
@@ -63,9 +112,29 @@ class AuthHandler:
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
+    def decode_access_token(self, token: str) -> dict:
+        """Decode an access token, reusing the claims of a token verified earlier"""
+        key = hashlib.sha256(token.encode()).digest()
+        payload = token_cache.get(key)
+        # The cache TTL is measured on the monotonic clock; exp is wall-clock
+        if payload is not None and payload["exp"] > time.time():
+            return payload
+        payload = self.decode_token(token)
+        # Refresh tokens are only good at /auth/refresh, where rotation and revocation apply
+        if payload.get("type") != "access":
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            token_cache.set(key, payload, ttl=exp - time.time())
+        return payload
+
     def get_current_user_id(self, token: str) -> int:
         """Get current user ID from token"""
-        payload = self.decode_token(token)
+        payload = self.decode_access_token(token)
         user_id: int = payload.get("sub")
         if user_id is None:
             raise HTTPException(
@@ -80,27 +149,117 @@ class AuthHandler:
 auth_handler = AuthHandler()
 
 
-def get_current_user(
+@dataclass(frozen=True)
+class Principal:
+    """The fields authorization needs, without an ORM row"""
+    id: int
+    role: UserRole
+    is_active: bool
+
+
+# Current (token_version, is_active) per user id. Access tokens whose "ver"
+# claim no longer matches are refused, so a revocation applies as soon as the
+# entry is invalidated, or token_version_cache_ttl_seconds later without Redis.
+token_version_cache = TTLCache(
+    maxsize=settings.token_version_cache_size,
+    ttl=settings.token_version_cache_ttl_seconds,
+    name="token_version",
+)
+
+# Cross-worker invalidation, started in the app lifespan when enabled
+invalidation_bus = InvalidationBus(settings.redis_url)
+invalidation_bus.register("token_version", lambda key: token_version_cache.delete(int(key)))
+
+
+def revoke_access_tokens(user: User) -> None:
+    """Bump the user's token version; earlier access tokens stop working once committed"""
+    user.token_version = (user.token_version or 0) + 1
+
+
+def invalidate_token_version(user_id: int) -> None:
+    """Drop a cached token version here and, if enabled, on every other worker"""
+    token_version_cache.delete(user_id)
+    invalidation_bus.publish("token_version", user_id)
+
+
+def _credentials_exception(detail: str = "User not found") -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _inactive_user_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Inactive user"
+    )
+
+
+def _token_user_id(payload: dict) -> int:
+    try:
+        return int(payload["sub"])
+    except (KeyError, TypeError, ValueError):
+        raise _credentials_exception("Could not validate credentials")
+
+
+async def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    """Authenticate the request from token claims plus the cached token version"""
+    payload = auth_handler.decode_access_token(credentials.credentials)
+    user_id = _token_user_id(payload)
+    role, version = payload.get("role"), payload.get("ver")
+    # Without "ver" a token could never be revoked
+    if role is None or version is None:
+        raise _credentials_exception("Could not validate credentials")
+
+    state = token_version_cache.get(user_id)
+    if state is None:
+        generation = token_version_cache.generation_of(user_id)
+        row = (await db.execute(
+            select(User.token_version, User.is_active).where(User.id == user_id)
+        )).first()
+        if row is None:
+            raise _credentials_exception()
+        state = (row.token_version, bool(row.is_active))
+        token_version_cache.set(user_id, state, generation=generation)
+
+    current_version, is_active = state
+    if not is_active:
+        raise _inactive_user_exception()
+    if version != current_version:
+        raise _credentials_exception("Token has been revoked")
+    try:
+        return Principal(id=user_id, role=UserRole(role), is_active=True)
+    except ValueError:
+        raise _credentials_exception("Could not validate credentials")
+
+
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """Get current authenticated user"""
-    token = credentials.credentials
-    user_id = auth_handler.get_current_user_id(token)
+    payload = auth_handler.decode_access_token(credentials.credentials)
+    user_id = _token_user_id(payload)
+    if "ver" not in payload:
+        raise _credentials_exception("Could not validate credentials")
 
-    user = db.query(User).filter(User.id == user_id).first()
+    generation = token_version_cache.generation_of(user_id)
+    user = await db.get(User, user_id)
     if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _credentials_exception()
+
+    # Full row loaded anyway: refresh the cached token version for free
+    token_version_cache.set(user.id, (user.token_version, bool(user.is_active)), generation=generation)
 
     if not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Inactive user"
-        )
+        raise _inactive_user_exception()
+    if payload["ver"] != user.token_version:
+        raise _credentials_exception("Token has been revoked")
 
     return user
 
@@ -116,7 +275,7 @@ def get_current_active_user(
 
 def require_role(required_role: UserRole):
     """Dependency to require specific user role"""
-    def role_checker(current_user: User = Depends(get_current_active_user)) -> User:
+    def role_checker(current_user: Principal = Depends(get_current_principal)) -> Principal:
         if current_user.role != required_role:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -126,7 +285,7 @@ def require_role(required_role: UserRole):
     return role_checker
 
 
-def require_admin(current_user: User = Depends(get_current_active_user)) -> User:
+def require_admin(current_user: Principal = Depends(get_current_principal)) -> Principal:
     """Require admin role"""
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
@@ -136,7 +295,7 @@ def require_admin(current_user: User = Depends(get_current_active_user)) -> User
     return current_user
 
 
-def require_worker_or_admin(current_user: User = Depends(get_current_active_user)) -> User:
+def require_worker_or_admin(current_user: Principal = Depends(get_current_principal)) -> Principal:
     """Require worker or admin role"""
     if current_user.role not in [UserRole.WORKER, UserRole.ADMIN]:
         raise HTTPException(
@@ -146,11 +305,52 @@ def require_worker_or_admin(current_user: User = Depends(get_current_active_user
     return current_user
 
 
-def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
+# Strong references to in-flight rehashes; the event loop only keeps weak ones
+_rehash_tasks: Set[asyncio.Task] = set()
+_rehash_results = {
+    result: metrics.counter("password_rehash_total", result=result)
+    for result in ("updated", "skipped", "failed")
+}
+
+
+async def _rehash_password(user_id: int, old_hash: str, password: str) -> None:
+    try:
+        new_hash = await auth_handler.hash_password_async(password)
+        async with AsyncSessionLocal() as db:
+            # Compare-and-set: a password change in the meantime wins
+            result = await db.execute(
+                update(User)
+                .where(User.id == user_id, User.hashed_password == old_hash)
+                .values(hashed_password=new_hash)
+            )
+            await db.commit()
+        _rehash_results["updated" if result.rowcount else "skipped"].inc()
+    except PasswordPoolSaturated:
+        # Busy: the next successful login tries again
+        _rehash_results["skipped"].inc()
+    except Exception as e:
+        _rehash_results["failed"].inc()
+        logger.warning(f"Password rehash for user {user_id} failed: {e}")
+
+
+def schedule_rehash(user_id: int, old_hash: str, password: str) -> None:
+    """Re-hash at the current cost in the background, off the login response path"""
+    task = asyncio.get_running_loop().create_task(_rehash_password(user_id, old_hash, password))
+    _rehash_tasks.add(task)
+    task.add_done_callback(_rehash_tasks.discard)
+
+
+async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
     """Authenticate user with email and password"""
-    user = db.query(User).filter(User.email == email).first()
+    result = await db.execute(select(User).where(User.email == email))
+    user = result.scalars().first()
     if not user:
         return None
-    if not auth_handler.verify_password(password, user.hashed_password):
+    # Hand the connection back to the pool for the ~250ms bcrypt check
+    await db.commit()
+    if not await auth_handler.verify_password_async(password, user.hashed_password):
         return None
+    # Cost changes roll out as users log in, without a migration
+    if pwd_context.needs_update(user.hashed_password):
+        schedule_rehash(user.id, user.hashed_password, password)
     return user
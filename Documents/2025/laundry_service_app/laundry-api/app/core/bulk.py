@@ -0,0 +1,216 @@
+import csv
+import json
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Sequence, Tuple, Type, TypeVar
+
+from fastapi import HTTPException, Request, status
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import func, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import dialect_insert
+from app.schemas.bulk import BulkResult, BulkRowResult
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+CSV_CONTENT_TYPES = ("text/csv", "application/csv")
+
+T = TypeVar("T")
+SchemaT = TypeVar("SchemaT", bound=BaseModel)
+
+
+def batched(items: Sequence[T], size: int) -> Iterator[Sequence[T]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def rejected(index: int, error: str) -> BulkRowResult:
+    return BulkRowResult(index=index, status="rejected", error=error)
+
+
+def summarize(results: List[BulkRowResult]) -> BulkResult:
+    results.sort(key=lambda result: result.index)
+    counts = {"created": 0, "upserted": 0, "rejected": 0}
+    for result in results:
+        counts[result.status] += 1
+    return BulkResult(results=results, **counts)
+
+
+def _validation_message(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}" for error in exc.errors()
+    )
+
+
+async def stream_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Non-blank lines of a byte stream, without holding more than one chunk"""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if buffer.strip():
+        yield buffer
+
+
+async def csv_records(lines: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Dict[str, str]]]:
+    """(index, {column: value}) per data line after the header; empty cells are left out.
+
+    One record per line: quoted values may not contain line breaks.
+    """
+    header = None
+    index = 0
+    async for line in lines:
+        values = next(csv.reader([line.decode("utf-8-sig").rstrip("\r")]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        yield index, {name: value.strip() for name, value in zip(header, values) if value.strip()}
+        index += 1
+
+
+def request_format(request: Request) -> str:
+    """csv, ndjson or json, from the Content-Type"""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in CSV_CONTENT_TYPES:
+        return "csv"
+    return "ndjson" if content_type in NDJSON_CONTENT_TYPES else "json"
+
+
+async def _enumerate(items: AsyncIterator[Any]) -> AsyncIterator[Tuple[int, Any]]:
+    index = 0
+    async for item in items:
+        yield index, item
+        index += 1
+
+
+async def _ndjson_lines(request: Request) -> AsyncIterator[bytes]:
+    async for line in stream_lines(request.stream()):
+        yield line
+
+
+async def _json_array_items(request: Request) -> AsyncIterator[object]:
+    try:
+        body = json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Request body is not valid JSON")
+    if not isinstance(body, list):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Expected a JSON array of rows or an NDJSON body"
+        )
+    for item in body:
+        yield item
+
+
+def request_items(request: Request) -> AsyncIterator[Tuple[int, Any]]:
+    """(index, raw row) from a JSON array or, streamed, from an NDJSON body"""
+    if request_format(request) == "ndjson":
+        return _enumerate(_ndjson_lines(request))
+    return _enumerate(_json_array_items(request))
+
+
+async def stream_bulk_rows(
+    items: AsyncIterator[Tuple[int, Any]],
+    schema: Type[SchemaT],
+    chunk_size: int,
+    max_rows: int,
+) -> AsyncIterator[Tuple[List[Tuple[int, SchemaT]], List[BulkRowResult]]]:
+    """Validate (index, raw row) items chunk by chunk.
+
+    Raw rows are JSON bytes (NDJSON lines) or parsed JSON values. Yields
+    (valid rows, rejections) for every chunk_size rows, so a large body is
+    written as it arrives. Rows that fail validation are reported instead
+    of failing the request, so one bad line does not sink a batch of
+    thousands.
+    """
+    rows: List[Tuple[int, SchemaT]] = []
+    results: List[BulkRowResult] = []
+    count = 0
+    async for index, item in items:
+        if count >= max_rows:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Too many rows (max {max_rows})"
+            )
+        count += 1
+        try:
+            if isinstance(item, bytes):
+                rows.append((index, schema.model_validate_json(item)))
+            else:
+                rows.append((index, schema.model_validate(item)))
+        except ValidationError as exc:
+            results.append(rejected(index, _validation_message(exc)))
+        if len(rows) + len(results) >= chunk_size:
+            yield rows, results
+            rows, results = [], []
+    if rows or results:
+        yield rows, results
+
+
+async def read_bulk_rows(
+    request: Request,
+    schema: Type[SchemaT],
+    max_rows: int,
+) -> Tuple[List[Tuple[int, SchemaT]], List[BulkRowResult]]:
+    """Parse a JSON array or NDJSON body into validated rows, all at once"""
+    rows: List[Tuple[int, SchemaT]] = []
+    results: List[BulkRowResult] = []
+    async for chunk_rows, chunk_results in stream_bulk_rows(request_items(request), schema, max_rows, max_rows):
+        rows += chunk_rows
+        results += chunk_results
+    return rows, results
+
+
+async def bulk_upsert(
+    db: AsyncSession,
+    model,
+    key: str,
+    rows: Iterable[Tuple[int, BaseModel]],
+    batch_size: int,
+) -> List[BulkRowResult]:
+    """Multi-row INSERT ... ON CONFLICT (key) DO UPDATE, batch by batch.
+
+    The caller owns the transaction. A key repeated within one request would
+    make PostgreSQL touch the same row twice in one statement, so only the
+    first occurrence is written and the rest are rejected.
+    """
+    results: List[BulkRowResult] = []
+    first_seen = {}
+    unique: List[Tuple[int, BaseModel]] = []
+    for index, row in rows:
+        value = getattr(row, key)
+        if value in first_seen:
+            results.append(rejected(index, f"Duplicate {key} in request (first at row {first_seen[value]})"))
+            continue
+        first_seen[value] = index
+        unique.append((index, row))
+
+    key_column = getattr(model, key)
+    for chunk in batched(unique, batch_size):
+        values = [row.model_dump() for _, row in chunk]
+        stmt = dialect_insert(model, db.bind)
+        # onupdate defaults are not applied to ON CONFLICT updates, so set updated_at here
+        updates = {column: stmt.excluded[column] for column in values[0] if column != key}
+        if "updated_at" in model.__table__.c:
+            updates["updated_at"] = func.now()
+        stmt = stmt.on_conflict_do_update(index_elements=[key], set_=updates)
+        ids = dict((await db.execute(stmt.returning(key_column, model.id), values)).all())
+        results.extend(
+            BulkRowResult(index=index, status="upserted", id=ids[getattr(row, key)]) for index, row in chunk
+        )
+    return results
+
+
+async def copy_rows(db: AsyncSession, table, columns: Sequence[str], records: List[Tuple]) -> None:
+    """Bulk-load rows whose generated ids nobody needs back.
+
+    COPY on PostgreSQL (asyncpg), one multi-row INSERT elsewhere; either way
+    inside the caller's transaction.
+    """
+    dialect = db.bind.dialect
+    if dialect.name == "postgresql" and dialect.driver == "asyncpg":
+        raw = await (await db.connection()).get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(table.name, records=records, columns=list(columns))
+    else:
+        await db.execute(insert(table), [dict(zip(columns, record)) for record in records])
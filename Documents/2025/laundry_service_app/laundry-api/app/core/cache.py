@@ -0,0 +1,239 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Bounded, thread-safe LRU map whose entries also expire after a TTL.
+
+    maxsize=0 disables the cache (every get misses), which keeps call sites
+    free of feature flags.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, name: str = "default"):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by clear(); delete(key) bumps only that key's entry. See generation_of()
+        self.generation = 0
+        self._key_generations: Dict[Hashable, int] = {}
+        self._hits = metrics.counter("cache_hits_total", cache=name)
+        self._misses = metrics.counter("cache_misses_total", cache=name)
+        self._evictions = metrics.counter("cache_evictions_total", cache=name)
+        self._size = metrics.gauge("cache_entries", cache=name)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._data.move_to_end(key)
+                    self._hits.inc()
+                    return value
+                del self._data[key]
+                self._size.set(len(self._data))
+        self._misses.inc()
+        return default
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Read an unexpired entry without touching LRU order or hit/miss metrics"""
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING or entry[1] <= time.monotonic():
+            return default
+        return entry[0]
+
+    def generation_of(self, key: Hashable) -> Tuple[int, int]:
+        """Token for set(generation=...); it changes when key is deleted or the cache cleared"""
+        return self.generation, self._key_generations.get(key, 0)
+
+    def set(
+        self, key: Hashable, value: Any, ttl: Optional[float] = None, generation: Optional[Tuple[int, int]] = None
+    ) -> None:
+        """Store value for ttl seconds (default: the cache TTL).
+
+        Pass generation_of(key) read before loading the value to drop the
+        write if key was invalidated in between, so a slow loader cannot put
+        back data that was just invalidated. Deleting other keys does not
+        affect it.
+        """
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if self.maxsize <= 0 or ttl <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generation_of(key):
+                return
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._evictions.inc()
+            self._size.set(len(self._data))
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            if key not in self._key_generations and len(self._key_generations) >= max(self.maxsize, 1):
+                # Keep the map bounded: restart it under a new generation, which
+                # (conservatively) also drops writes for keys that were not deleted
+                self._key_generations.clear()
+                self.generation += 1
+            else:
+                self._key_generations[key] = self._key_generations.get(key, 0) + 1
+            self._data.pop(key, None)
+            self._size.set(len(self._data))
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._key_generations.clear()
+            self._data.clear()
+            self._size.set(0)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SingleFlight:
+    """Coalesces concurrent async loads of the same key into one call.
+
+    The first caller for a key starts the load; everyone who asks while it
+    is running awaits the same result instead of starting their own, so a
+    cache miss under load costs one DB round trip rather than one per client.
+    """
+
+    def __init__(self, name: str = "default"):
+        self.name = name
+        self._flights: Dict[Hashable, asyncio.Future] = {}
+        self._loads = metrics.counter("singleflight_loads_total", flight=name)
+        self._coalesced = metrics.counter("singleflight_coalesced_total", flight=name)
+
+    async def do(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = asyncio.ensure_future(load())
+            self._flights[key] = flight
+            flight.add_done_callback(lambda _: self._flights.pop(key, None))
+            self._loads.inc()
+        else:
+            self._coalesced.inc()
+        # Shielded so one caller disconnecting does not cancel the load for the rest
+        return await asyncio.shield(flight)
+
+
+class InvalidationBus:
+    """Fans cache invalidations out to every worker over Redis pub/sub.
+
+    Best effort: the publishing worker always drops its own entry, and if
+    Redis is unavailable the other workers catch up when their TTL expires.
+    publish() only queues the message, so it is safe from async handlers and
+    from threadpool code alike; a background task sends it on the event loop.
+    """
+
+    def __init__(self, redis_url: str, channel: str = "laundry:cache-invalidation", max_pending: int = 10000):
+        self.redis_url = redis_url
+        self.channel = channel
+        self.max_pending = max_pending
+        self.enabled = False
+        self._handlers: Dict[str, Callable[[str], None]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._publisher_task: Optional[asyncio.Task] = None
+        self._dropped = metrics.counter("cache_invalidations_dropped_total")
+
+    def register(self, topic: str, handler: Callable[[str], None]) -> None:
+        self._handlers[topic] = handler
+
+    def publish(self, topic: str, key: Any) -> None:
+        """Queue an invalidation for the other workers; never blocks"""
+        if not self.enabled or self._loop is None:
+            return
+        message = json.dumps({"topic": topic, "key": str(key)})
+        try:
+            # Callers run on the event loop or in the threadpool; the queue belongs to the loop
+            self._loop.call_soon_threadsafe(self._enqueue, message)
+        except RuntimeError:  # loop closed during shutdown
+            pass
+
+    def _enqueue(self, message: str) -> None:
+        try:
+            self._pending.put_nowait(message)
+        except asyncio.QueueFull:
+            self._dropped.inc()
+            logger.warning("Cache invalidation queue full; dropping an invalidation")
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._pending = asyncio.Queue(maxsize=self.max_pending)
+        self.enabled = True
+        self._task = asyncio.create_task(self._listen())
+        self._publisher_task = asyncio.create_task(self._publish_pending())
+
+    async def stop(self) -> None:
+        self.enabled = False
+        for task in (self._task, self._publisher_task):
+            if task is None:
+                continue
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._task = self._publisher_task = None
+        self._loop = None
+
+    async def _publish_pending(self) -> None:
+        import redis.asyncio as aioredis
+
+        client = aioredis.from_url(self.redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        try:
+            while True:
+                message = await self._pending.get()
+                try:
+                    await client.publish(self.channel, message)
+                except Exception as e:
+                    logger.warning(f"Cache invalidation publish failed ({message}): {e}")
+        finally:
+            await client.aclose()
+
+    def _dispatch(self, data) -> None:
+        try:
+            message = json.loads(data)
+            handler = self._handlers.get(message["topic"])
+        except (ValueError, KeyError, TypeError):
+            logger.warning(f"Ignoring malformed cache invalidation message: {data!r}")
+            return
+        if handler is not None:
+            handler(message["key"])
+
+    async def _listen(self) -> None:
+        import redis.asyncio as aioredis
+
+        while True:
+            client = aioredis.from_url(self.redis_url)
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self._dispatch(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener disconnected: {e}; retrying")
+                await asyncio.sleep(1)
+            finally:
+                await client.aclose()
@@ -1,44 +1,200 @@
-from sqlalchemy import create_engine
+import hashlib
+from typing import Optional
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import StaticPool
+from sqlalchemy.sql import Select
 from app.core.config import settings
+from app.core.pool_metrics import InstrumentedAsyncQueuePool, InstrumentedQueuePool, instrument_pool
+from app.core.replicas import ReplicaRouter
+
+# Async drivers for each sync driver we support
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def get_async_database_url(url: str) -> str:
+    """Translate a sync database URL to the matching asyncio driver"""
+    if settings.async_database_url:
+        return settings.async_database_url
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+# Pool settings shared by every engine. With admission control on, a request
+# that can't get a connection within the checkout budget fails fast (503)
+# instead of queueing for the full pool timeout.
+pool_options = dict(
+    pool_pre_ping=True,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=(
+        settings.db_checkout_budget_ms / 1000
+        if settings.db_admission_control
+        else settings.db_pool_timeout
+    ),
+)
 
 # Create database engine
 if settings.environment == "test":
     # Use in-memory SQLite for testing
     engine = create_engine(
         settings.database_url,
-        pool_pre_ping=True,
-        pool_size=10,
-        max_overflow=20,
+        poolclass=InstrumentedQueuePool,
+        **pool_options,
     )
 
 else:
     # Use PostgreSQL for development/production
     engine = create_engine(
         settings.database_url,
-        pool_pre_ping=True,
-        pool_size=10,
-        max_overflow=20,
+        poolclass=InstrumentedQueuePool,
+        **pool_options,
     )
 
+# Async engine on the same database, used by the async endpoints
+async_engine = create_async_engine(
+    get_async_database_url(settings.database_url),
+    poolclass=InstrumentedAsyncQueuePool,
+    **pool_options,
+)
+
+# Read replicas for GET traffic; empty list means everything uses the primary
+replica_router = ReplicaRouter(
+    settings.database_replica_urls,
+    max_lag_seconds=settings.replica_max_lag_seconds,
+    health_check_seconds=settings.replica_health_check_seconds,
+    sticky_seconds=settings.replica_sticky_seconds,
+    poolclass=InstrumentedQueuePool,
+    **pool_options,
+)
+
+instrument_pool(engine, "primary")
+instrument_pool(async_engine.sync_engine, "primary_async")
+for index, replica in enumerate(replica_router.replicas):
+    instrument_pool(replica.engine, f"replica_{index}")
+
+
+class RoutingSession(Session):
+    """Session that sends SELECTs of read-only sessions to a replica.
+
+    A session becomes read-only through get_read_db; writes, flushes and
+    anything that isn't a plain SELECT always go to the primary. The replica
+    is chosen once per session so a request sees one consistent snapshot.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if (
+            self.info.get("read_only")
+            and not self._flushing
+            and (clause is None or isinstance(clause, Select))
+        ):
+            if "replica" not in self.info:
+                self.info["replica"] = replica_router.pick()
+            if self.info["replica"] is not None:
+                return self.info["replica"]
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+@event.listens_for(Session, "after_flush")
+def _record_write(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _record_statement_write(orm_execute_state):
+    # Core and bulk insert()/update()/delete() run through execute() never flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _pin_writer_to_primary(session):
+    # Read-your-writes: the client's next reads skip the replicas for a while
+    if session.info.pop("wrote", False):
+        replica_router.mark_write(session.info.get("client_key"))
+
+
+def get_client_key(request: Request) -> Optional[str]:
+    """Identify the caller for read-your-writes stickiness"""
+    identity = request.headers.get("authorization") or (request.client.host if request.client else None)
+    if not identity:
+        return None
+    return hashlib.sha256(identity.encode()).hexdigest()[:32]
+
+
 # Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
+
+# Async session factory; expire_on_commit=False so objects stay readable
+# after commit without an implicit (and in asyncio, illegal) lazy refresh
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
 
 # Create Base class for models
 Base = declarative_base()
 
 
 # Dependency to get database session
-def get_db():
+def get_db(request: Request):
+    db = SessionLocal()
+    db.info["client_key"] = get_client_key(request)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# Dependency for read-only endpoints: SELECTs go to a replica unless the
+# caller wrote recently or no replica is healthy
+def get_read_db(request: Request):
     db = SessionLocal()
+    client_key = get_client_key(request)
+    db.info["client_key"] = client_key
+    db.info["read_only"] = replica_router.enabled and not replica_router.is_sticky(client_key)
     try:
         yield db
     finally:
         db.close()
 
 
+# Dependency to get an async database session (for async def endpoints)
+async def get_async_db(request: Request):
+    async with AsyncSessionLocal() as db:
+        db.info["client_key"] = get_client_key(request)
+        yield db
+
+
+# INSERT constructs that support ON CONFLICT, per dialect
+_CONFLICT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def dialect_insert(table, bind=None):
+    """INSERT for the bound dialect with on_conflict_do_nothing/do_update available"""
+    dialect = (bind or engine).dialect.name
+    if dialect not in _CONFLICT_INSERTS:
+        raise NotImplementedError(f"ON CONFLICT inserts are not supported on {dialect}")
+    return _CONFLICT_INSERTS[dialect](table)
+
+
 # Create all tables
 def create_tables():
     Base.metadata.create_all(bind=engine)
@@ -0,0 +1,283 @@
+import asyncio
+import hashlib
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.core.database import SessionLocal, dialect_insert
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# 60-bit IDs: seconds since EPOCH | node | per-second sequence, 12 base32 chars
+EPOCH = 1735689600  # 2025-01-01T00:00:00Z
+TIME_BITS, NODE_BITS, SEQUENCE_BITS = 32, 10, 18
+ID_BITS = TIME_BITS + NODE_BITS + SEQUENCE_BITS
+MAX_NODES = 1 << NODE_BITS
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+# Crockford base32: no I, L, O or U, so codes survive being read out or retyped
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+CODE_LENGTH = ID_BITS // 5
+
+
+class TrackingIdExhausted(RuntimeError):
+    """No node id is leased, or the generator is as far ahead of the clock as it may run"""
+
+
+def encode_base32(value: int, length: int = CODE_LENGTH) -> str:
+    chars = []
+    for _ in range(length):
+        value, digit = divmod(value, 32)
+        chars.append(ALPHABET[digit])
+    return "".join(reversed(chars))
+
+
+def decode_base32(code: str) -> int:
+    value = 0
+    for char in code.upper():
+        value = value * 32 + ALPHABET.index(char)
+    return value
+
+
+class FeistelPermutation:
+    """Keyed bijection on ID_BITS-bit integers.
+
+    Raw IDs are sequential within a second, which would make a public
+    tracking lookup enumerable. Permuting them keeps every ID unique (it is
+    a bijection) while making neighbours unrelated.
+    """
+
+    def __init__(self, key: bytes, bits: int = ID_BITS, rounds: int = 4):
+        key = hashlib.blake2b(key, digest_size=32, person=b"tracking-ids").digest()
+        self.half = bits // 2
+        self.mask = (1 << self.half) - 1
+        self.rounds = rounds
+        # Keyed states are copied per call; re-keying costs more than the hash
+        self._round_hashes = [
+            hashlib.blake2b(digest_size=8, key=key, person=b"round%d" % i) for i in range(rounds)
+        ]
+
+    def _f(self, round_index: int, value: int) -> int:
+        h = self._round_hashes[round_index].copy()
+        h.update(value.to_bytes(8, "big"))
+        return int.from_bytes(h.digest(), "big") & self.mask
+
+    def encrypt(self, value: int) -> int:
+        left, right = value >> self.half, value & self.mask
+        for i in range(self.rounds):
+            left, right = right, left ^ self._f(i, right)
+        return (left << self.half) | right
+
+    def decrypt(self, value: int) -> int:
+        left, right = value >> self.half, value & self.mask
+        for i in reversed(range(self.rounds)):
+            left, right = right ^ self._f(i, left), left
+        return (left << self.half) | right
+
+
+class TrackingIdGenerator:
+    """Collision-free tracking IDs: time + node + sequence, like Snowflake.
+
+    Each process holds a node id leased from the tracking_id_nodes table (or
+    a fixed one from TRACKING_NODE_ID), so no two live processes on any host
+    share one. Within a process a lock-protected sequence counts IDs per
+    second; when it runs out the generator borrows the next second, up to
+    max_drift_seconds ahead of the wall clock. The logical clock never moves
+    backwards, and a reused node id starts past anything its previous holder
+    could have issued. Hosts are expected to keep their clocks in sync (NTP).
+
+    next() never waits or touches the database: leases are claimed and
+    renewed by maintain(), which the lifespan runs off the event loop. Without
+    a live lease, or past the drift budget, next() raises TrackingIdExhausted.
+    """
+
+    def __init__(
+        self,
+        prefix: str,
+        key: bytes,
+        lease_seconds: float,
+        max_drift_seconds: int,
+        node_id: Optional[int] = None,
+        session_factory=SessionLocal,
+    ):
+        if node_id is not None and not 0 <= node_id < MAX_NODES:
+            raise ValueError(f"Tracking node id must be in [0, {MAX_NODES})")
+        self.prefix = prefix
+        self.permutation = FeistelPermutation(key)
+        self.lease_seconds = lease_seconds
+        self.max_drift_seconds = max_drift_seconds
+        self.fixed_node_id = node_id
+        self.session_factory = session_factory
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.node_id: Optional[int] = node_id
+        self._lease_deadline = float("inf") if node_id is not None else 0.0
+        self._second = 0
+        self._sequence = -1
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._issued = metrics.counter("tracking_ids_issued_total")
+        self._borrowed = metrics.counter("tracking_id_borrowed_seconds_total")
+
+    def next(self) -> str:
+        """Return a new tracking ID such as LP0Q8ZK3VN7D2M"""
+        with self._lock:
+            if self.node_id is None or time.monotonic() >= self._lease_deadline:
+                raise TrackingIdExhausted("No tracking ID node lease is held")
+            now = int(time.time()) - EPOCH
+            if now > self._second:
+                self._second, self._sequence = now, 0
+            elif self._sequence < MAX_SEQUENCE:
+                self._sequence += 1
+            else:
+                if self._second - now >= self.max_drift_seconds:
+                    # Sustained bursts past 2**18 IDs/s per process: shed load rather than block
+                    raise TrackingIdExhausted(f"Tracking IDs are {self.max_drift_seconds}s ahead of the clock")
+                self._second, self._sequence = self._second + 1, 0
+                self._borrowed.inc()
+            raw = (self._second << (NODE_BITS + SEQUENCE_BITS)) | (self.node_id << SEQUENCE_BITS) | self._sequence
+        self._issued.inc()
+        return self.prefix + encode_base32(self.permutation.encrypt(raw))
+
+    def parse(self, tracking_id: str) -> Tuple[datetime, int, int]:
+        """(issue time, node id, sequence) of an ID from this generator"""
+        raw = self.permutation.decrypt(decode_base32(tracking_id[len(self.prefix):]))
+        second = raw >> (NODE_BITS + SEQUENCE_BITS)
+        node = (raw >> SEQUENCE_BITS) & (MAX_NODES - 1)
+        return datetime.fromtimestamp(EPOCH + second, timezone.utc), node, raw & MAX_SEQUENCE
+
+    def _claim(self) -> None:
+        """Lease a node id: a never-used one if any, else one whose lease expired"""
+        from app.models import TrackingIdNode
+
+        now = datetime.now(timezone.utc)
+        expires_at = now + timedelta(seconds=self.lease_seconds)
+        deadline = time.monotonic() + self.lease_seconds * 0.9
+        with self.session_factory() as db:
+            rows = db.execute(select(TrackingIdNode.node_id, TrackingIdNode.expires_at)).all()
+            used = {row.node_id for row in rows}
+            free = [node for node in range(MAX_NODES) if node not in used]
+            random.shuffle(free)
+            for node in free:
+                stmt = dialect_insert(TrackingIdNode, db.bind).values(
+                    node_id=node, owner=self.owner, expires_at=expires_at, issued_until=0
+                )
+                if db.execute(stmt.on_conflict_do_nothing(index_elements=["node_id"])).rowcount:
+                    db.commit()
+                    self._take(node, floor=0, deadline=deadline)
+                    return
+
+            expired = [row.node_id for row in rows if _as_utc(row.expires_at) < now]
+            random.shuffle(expired)
+            for node in expired:
+                claimed = db.execute(
+                    update(TrackingIdNode)
+                    .where(TrackingIdNode.node_id == node, TrackingIdNode.expires_at < now)
+                    .values(owner=self.owner, expires_at=expires_at)
+                    .returning(TrackingIdNode.issued_until)
+                ).first()
+                if claimed is not None:
+                    # The previous holder may have run up to max_drift_seconds ahead
+                    floor = max(claimed.issued_until, int(now.timestamp()) - EPOCH) + self.max_drift_seconds + 1
+                    # Recorded at once: until the first renewal this holder is already past the clock,
+                    # and a takeover of its lease must start beyond that too
+                    db.execute(
+                        update(TrackingIdNode)
+                        .where(TrackingIdNode.node_id == node, TrackingIdNode.owner == self.owner)
+                        .values(issued_until=floor)
+                    )
+                    db.commit()
+                    self._take(node, floor=floor, deadline=deadline)
+                    return
+        raise TrackingIdExhausted(f"All {MAX_NODES} tracking ID nodes are leased")
+
+    def _take(self, node: int, floor: int, deadline: float) -> None:
+        with self._lock:
+            self.node_id = node
+            self._second = max(self._second, floor, int(time.time()) - EPOCH)
+            self._sequence = -1
+            self._lease_deadline = deadline
+        logger.info(f"Tracking ID node {node} leased by {self.owner}")
+
+    def renew(self, release: bool = False) -> None:
+        """Extend (or give up) the lease, recording how far this node has issued"""
+        from app.models import TrackingIdNode
+
+        if self.fixed_node_id is not None or self.node_id is None:
+            return
+        now = datetime.now(timezone.utc)
+        expires_at = now if release else now + timedelta(seconds=self.lease_seconds)
+        deadline = time.monotonic() + self.lease_seconds * 0.9
+        with self._lock:
+            node, issued_until = self.node_id, self._second
+        with self.session_factory() as db:
+            renewed = db.execute(
+                update(TrackingIdNode)
+                .where(TrackingIdNode.node_id == node, TrackingIdNode.owner == self.owner)
+                .values(expires_at=expires_at, issued_until=issued_until)
+            ).rowcount
+            db.commit()
+        with self._lock:
+            if release or not renewed:
+                # Lost the lease (e.g. paused past its expiry): maintain() claims a fresh node
+                if not renewed and not release:
+                    logger.warning(f"Tracking ID node {node} lease lost; claiming a new node")
+                self.node_id, self._lease_deadline = None, 0.0
+            else:
+                self._lease_deadline = deadline
+
+    def maintain(self) -> None:
+        """Renew the lease, or claim a node if none is held; blocking, so run it in a thread"""
+        if self.fixed_node_id is not None:
+            return
+        if self.node_id is not None:
+            self.renew()
+        if self.node_id is None:
+            self._claim()
+
+    async def start(self) -> None:
+        if self.fixed_node_id is None:
+            await asyncio.to_thread(self._claim)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            await asyncio.to_thread(self.renew, True)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                await asyncio.to_thread(self.maintain)
+            except Exception as e:
+                logger.warning(f"Tracking ID node lease renewal failed: {e}")
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+# Global tracking ID generator; the app lifespan keeps its node lease alive
+tracking_ids = TrackingIdGenerator(
+    prefix="LP",
+    key=(settings.tracking_id_key or settings.secret_key).encode(),
+    lease_seconds=settings.tracking_node_lease_seconds,
+    max_drift_seconds=settings.tracking_id_max_drift_seconds,
+    node_id=settings.tracking_node_id,
+)
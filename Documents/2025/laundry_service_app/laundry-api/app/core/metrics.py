@@ -0,0 +1,101 @@
+import bisect
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Latency buckets in milliseconds
+DEFAULT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class Counter:
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    def snapshot(self) -> Dict:
+        return {"value": self._value}
+
+
+class Gauge:
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    def inc(self, amount: float = 1) -> float:
+        with self._lock:
+            self._value += amount
+            return self._value
+
+    def dec(self, amount: float = 1) -> float:
+        return self.inc(-amount)
+
+    def snapshot(self) -> Dict:
+        return {"value": self._value}
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+        cumulative, buckets = 0, {}
+        for bound, bucket_count in zip(list(self.buckets) + ["+Inf"], counts):
+            cumulative += bucket_count
+            buckets[str(bound)] = cumulative
+        return {"count": count, "sum": round(total, 3), "buckets": buckets}
+
+
+class MetricsRegistry:
+    """Process-local metrics exposed on the admin metrics endpoint"""
+
+    def __init__(self):
+        self._metrics: Dict[Tuple[str, Tuple], Tuple[str, object]] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, **labels) -> Counter:
+        return self._get(name, labels, Counter)
+
+    def gauge(self, name: str, **labels) -> Gauge:
+        return self._get(name, labels, Gauge)
+
+    def histogram(self, name: str, buckets: Optional[Sequence[float]] = None, **labels) -> Histogram:
+        return self._get(name, labels, Histogram, *([buckets] if buckets else []))
+
+    def snapshot(self) -> List[Dict]:
+        with self._lock:
+            items = list(self._metrics.items())
+        return [
+            {"name": name, "type": kind, "labels": dict(labels), **metric.snapshot()}
+            for (name, labels), (kind, metric) in sorted(items, key=lambda item: item[0])
+        ]
+
+    def _get(self, name, labels, factory, *args):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            if key not in self._metrics:
+                self._metrics[key] = (factory.__name__.lower(), factory(*args))
+            return self._metrics[key][1]
+
+
+# Global metrics registry
+metrics = MetricsRegistry()
@@ -0,0 +1,55 @@
+import logging
+from pathlib import Path
+from typing import Optional, Set
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.database import engine
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+class SchemaVersionError(RuntimeError):
+    """The database is not migrated to the revision this code expects"""
+
+
+def alembic_config(database_url: Optional[str] = None) -> Config:
+    config = Config(str(PROJECT_ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(PROJECT_ROOT / "alembic"))
+    config.set_main_option("sqlalchemy.url", database_url or settings.database_url)
+    return config
+
+
+def upgrade_to_head(database_url: Optional[str] = None) -> None:
+    command.upgrade(alembic_config(database_url), "head")
+
+
+def expected_heads() -> Set[str]:
+    return set(ScriptDirectory.from_config(alembic_config()).get_heads())
+
+
+def current_heads(bind: Engine = engine) -> Set[str]:
+    with bind.connect() as conn:
+        return set(MigrationContext.configure(conn).get_current_heads())
+
+
+def check_schema_version(bind: Engine = engine) -> str:
+    """Fail fast unless the database is at the migration head.
+
+    A single SELECT on alembic_version; schema changes and seeding are done
+    once per deploy by `python -m app.cli bootstrap`, not by every worker.
+    """
+    expected, current = expected_heads(), current_heads(bind)
+    if current != expected:
+        raise SchemaVersionError(
+            f"Database schema is at {sorted(current) or 'no revision'}, expected {sorted(expected)}. "
+            "Run `python -m app.cli bootstrap` (or `alembic upgrade head`) before starting the API."
+        )
+    return ",".join(sorted(current))
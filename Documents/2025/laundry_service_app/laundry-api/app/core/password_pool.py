@@ -0,0 +1,80 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+from app.core.metrics import metrics
+
+T = TypeVar("T")
+
+# Hashing a bcrypt password at the default cost takes 200-300ms
+HASH_BUCKETS_MS = (10, 50, 100, 200, 300, 500, 1000, 2500, 5000, 10000)
+
+
+class PasswordPoolSaturated(RuntimeError):
+    """More password operations are pending than the pool accepts"""
+
+
+class PasswordHashPool:
+    """Runs bcrypt off the event loop on a small, bounded thread pool.
+
+    bcrypt releases the GIL while hashing, so threads give real parallelism
+    without the pickling and startup cost of a process pool. At most
+    `workers` hashes run at once and `max_queue` more may wait; past that,
+    callers get PasswordPoolSaturated (a 503) instead of queueing without
+    bound while every login times out anyway.
+    """
+
+    def __init__(self, workers: int, max_queue: int, name: str = "password"):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._rejected = metrics.counter("password_pool_rejected_total", pool=name)
+        self._in_flight = metrics.gauge("password_pool_pending", pool=name)
+        self._size = metrics.gauge("password_pool_workers", pool=name)
+        self._queue_wait_ms = metrics.histogram("password_pool_queue_wait_ms", pool=name)
+        self._duration_ms = metrics.histogram("password_pool_duration_ms", HASH_BUCKETS_MS, pool=name)
+        self._size.set(workers)
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                self._rejected.inc()
+                raise PasswordPoolSaturated(f"{self._pending} password operations pending")
+            self._pending += 1
+            self._in_flight.set(self._pending)
+
+        enqueued = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            self._queue_wait_ms.observe((started - enqueued) * 1000)
+            try:
+                return fn(*args)
+            finally:
+                self._duration_ms.observe((time.perf_counter() - started) * 1000)
+
+        future = self.executor.submit(timed)
+        # Released when the job finishes or is cancelled before it starts, not
+        # when the caller stops waiting, so abandoned work still counts
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, _future) -> None:
+        with self._lock:
+            self._pending -= 1
+            self._in_flight.set(self._pending)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,71 @@
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.metrics import metrics
+
+
+class PoolMetrics:
+    def __init__(self, name: str):
+        self.checkout_wait_ms = metrics.histogram("db_pool_checkout_wait_ms", pool=name)
+        self.timeouts = metrics.counter("db_pool_checkout_timeouts_total", pool=name)
+        self.in_use = metrics.gauge("db_pool_connections_in_use", pool=name)
+        self.overflow = metrics.gauge("db_pool_overflow_in_use", pool=name)
+        self.size = metrics.gauge("db_pool_size", pool=name)
+
+
+class _InstrumentedPoolMixin:
+    """Times every checkout, including the wait for a free connection"""
+
+    metrics = None
+
+    def connect(self):
+        if self.metrics is None:
+            return super().connect()
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.metrics.timeouts.inc()
+            raise
+        finally:
+            self.metrics.checkout_wait_ms.observe((time.perf_counter() - start) * 1000)
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep reporting into the same series
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrument_pool(engine: Engine, name: str) -> None:
+    """Publish checkout wait, timeouts and in-use/overflow gauges for an engine's pool"""
+    pool = engine.pool
+    pool_metrics = PoolMetrics(name)
+    if isinstance(pool, _InstrumentedPoolMixin):
+        pool.metrics = pool_metrics
+    if not isinstance(pool, QueuePool):
+        return
+    size = pool.size()
+    pool_metrics.size.set(size)
+
+    def on_checkout(*args):
+        in_use = pool_metrics.in_use.inc()
+        pool_metrics.overflow.set(max(in_use - size, 0))
+
+    def on_checkin(*args):
+        in_use = pool_metrics.in_use.dec()
+        pool_metrics.overflow.set(max(in_use - size, 0))
+
+    event.listen(pool, "checkout", on_checkout)
+    event.listen(pool, "checkin", on_checkin)
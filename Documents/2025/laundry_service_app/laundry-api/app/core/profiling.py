@@ -0,0 +1,122 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Longest statement prefix kept for the slow-request log
+MAX_SQL_LENGTH = 300
+
+
+class RequestProfile:
+    """Where one request spent its time: SQL, outbound HTTP, and the rest"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.db_ms = 0.0
+        self.external_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest_sql: Optional[str] = None
+
+    @property
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def record_statement(self, sql: str, elapsed_ms: float) -> None:
+        self.statements += 1
+        self.db_ms += elapsed_ms
+        if elapsed_ms > self.slowest_ms:
+            self.slowest_ms = elapsed_ms
+            self.slowest_sql = sql
+
+    def server_timing(self, total_ms: float) -> str:
+        app_ms = max(total_ms - self.db_ms - self.external_ms, 0.0)
+        return ", ".join([
+            f'db;dur={self.db_ms:.1f};desc="{self.statements} queries"',
+            f"external;dur={self.external_ms:.1f}",
+            f"app;dur={app_ms:.1f}",
+            f"total;dur={total_ms:.1f}",
+        ])
+
+    def summary(self) -> str:
+        text = f"{self.statements} queries, db {self.db_ms:.1f}ms, external {self.external_ms:.1f}ms"
+        if self.slowest_sql:
+            sql = " ".join(self.slowest_sql.split())[:MAX_SQL_LENGTH]
+            text += f", slowest {self.slowest_ms:.1f}ms: {sql}"
+        return text
+
+
+# Shared by reference with the threadpool and the async engine's greenlets,
+# which run on copies of the request's context
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+
+
+def start_profile() -> RequestProfile:
+    profile = RequestProfile()
+    _current_profile.set(profile)
+    return profile
+
+
+def current_profile() -> Optional[RequestProfile]:
+    return _current_profile.get()
+
+
+def record_external(elapsed_ms: float) -> None:
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.external_ms += elapsed_ms
+
+
+@contextmanager
+def external_call():
+    """Attribute the wrapped block to the "external" Server-Timing metric"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_external((time.perf_counter() - start) * 1000)
+
+
+def aiohttp_trace_config():
+    """aiohttp TraceConfig that records outbound request time as external time"""
+    import aiohttp
+
+    async def on_request_start(session, context, params):
+        context.started = time.perf_counter()
+
+    async def on_request_end(session, context, params):
+        record_external((time.perf_counter() - context.started) * 1000)
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_request_end.append(on_request_end)
+    trace_config.on_request_exception.append(on_request_end)
+    return trace_config
+
+
+# Registered on Engine itself so the primary, replica and async engines are all covered
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_profile.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile.get()
+    starts = conn.info.get("query_start")
+    if profile is not None and starts:
+        profile.record_statement(statement, (time.perf_counter() - starts.pop()) * 1000)
+
+
+@event.listens_for(Engine, "handle_error")
+def _discard_failed_statement(exception_context):
+    # after_cursor_execute does not fire for a failed statement
+    conn = exception_context.connection
+    starts = conn.info.get("query_start") if conn is not None else None
+    # Not every error path sets .cursor (e.g. some DBAPI errors under the async adapters)
+    if starts and getattr(exception_context, "cursor", None) is not None:
+        starts.pop()
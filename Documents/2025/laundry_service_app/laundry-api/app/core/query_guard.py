@@ -0,0 +1,70 @@
+from contextlib import contextmanager
+from typing import Callable, List, Optional
+
+from fastapi import FastAPI
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.profiling import current_profile
+
+
+class StatementBudgetExceeded(AssertionError):
+    """An endpoint ran more SQL statements than it declared"""
+
+
+def statement_budget(max_statements: int) -> Callable:
+    """Declare how many SQL statements an endpoint may run per request.
+
+    Put it under the route decorator; assert_endpoint_budget enforces it.
+    """
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.__statement_budget__ = max_statements
+        return endpoint
+    return decorator
+
+
+def get_statement_budget(app: FastAPI, method: str, path: str) -> Optional[int]:
+    for route in app.routes:
+        if getattr(route, "path", None) == path and method.upper() in getattr(route, "methods", ()):
+            return getattr(route.endpoint, "__statement_budget__", None)
+    return None
+
+
+@contextmanager
+def assert_max_statements(max_statements: int, target=Engine, requests_only: bool = False):
+    """Fail if the block runs more than max_statements SQL statements.
+
+    Listens on every engine by default, so statements issued from the
+    threadpool or through the async engine are counted too. With
+    requests_only, only statements run on behalf of an HTTP request (under
+    its profile) count, so the app's background loops are not charged to
+    the block. Yields the list of captured statements for inspection.
+    """
+    statements: List[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if requests_only and current_profile() is None:
+            return
+        statements.append(statement)
+
+    event.listen(target, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(target, "before_cursor_execute", before_cursor_execute)
+
+    if len(statements) > max_statements:
+        listing = "\n".join(f"  {i + 1}. {sql.splitlines()[0]}" for i, sql in enumerate(statements))
+        raise StatementBudgetExceeded(
+            f"{len(statements)} statements executed, budget is {max_statements}:\n{listing}"
+        )
+
+
+def assert_endpoint_budget(client, app: FastAPI, method: str, path: str, url: Optional[str] = None, **kwargs):
+    """Call an endpoint through a test client and enforce its declared budget"""
+    budget = get_statement_budget(app, method, path)
+    if budget is None:
+        raise ValueError(f"{method} {path} does not declare a statement budget")
+    with assert_max_statements(budget, requests_only=True):
+        response = client.request(method, url or path, **kwargs)
+    return response
@@ -0,0 +1,216 @@
+import hashlib
+import ipaddress
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def _estimate(previous: int, current: int, window: float, elapsed: float) -> float:
+    # Sliding window counter: the previous fixed window's count, weighted by
+    # how much of it still overlaps the sliding window, plus the current count
+    return previous * (1 - elapsed / window) + current
+
+
+def _retry_after(previous: int, current: int, limit: int, window: float, elapsed: float) -> int:
+    if current < limit and previous:
+        # The previous window's share decays linearly; wait until it frees a slot
+        wait = window * (1 - (limit - current) / previous) - elapsed
+    else:
+        wait = window - elapsed
+    return max(1, math.ceil(wait))
+
+
+class MemorySlidingWindow:
+    """Sliding window counters for a single node.
+
+    Keeps two counts per key, so memory is O(keys); the least recently seen
+    keys are dropped past max_keys so a spray of random IPs can't grow it
+    without bound.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._windows: "OrderedDict[str, Tuple[int, int, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def hit(self, key: str, limit: int, window: float) -> int:
+        """Count one attempt; return 0 if allowed, else seconds until retry"""
+        index, elapsed = divmod(time.time(), window)
+        with self._lock:
+            entry = self._windows.get(key)
+            if entry is None or entry[0] < index - 1:
+                previous, current = 0, 0
+            elif entry[0] == index - 1:
+                previous, current = entry[2], 0
+            else:
+                previous, current = entry[1], entry[2]
+
+            allowed = _estimate(previous, current, window, elapsed) < limit
+            if allowed:
+                current += 1
+            self._windows[key] = (index, previous, current)
+            self._windows.move_to_end(key)
+            while len(self._windows) > self.max_keys:
+                self._windows.popitem(last=False)
+        return 0 if allowed else _retry_after(previous, current, limit, window, elapsed)
+
+
+# Reads both windows and increments the current one in a single round trip,
+# atomically across every API node
+_REDIS_HIT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local limit, window, elapsed = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+if previous * (1 - elapsed / window) + current >= limit then
+    return {0, previous, current}
+end
+redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], math.ceil(window * 2))
+return {1, previous, current + 1}
+"""
+
+
+class RedisSlidingWindow:
+    """Sliding window counters shared by all nodes through Redis.
+
+    If Redis is unreachable, attempts are counted by a per-node fallback
+    instead, so throttling degrades to single-node limits rather than off.
+    """
+
+    def __init__(self, redis_url: str, prefix: str = "laundry:ratelimit:"):
+        self.redis_url = redis_url
+        self.prefix = prefix
+        self.fallback = MemorySlidingWindow()
+        self._client = None
+        self._script = None
+        self._warned_at = 0.0
+
+    async def hit(self, key: str, limit: int, window: float) -> int:
+        index, elapsed = divmod(time.time(), window)
+        try:
+            if self._client is None:
+                import redis.asyncio as aioredis
+                self._client = aioredis.from_url(self.redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+                self._script = self._client.register_script(_REDIS_HIT)
+            allowed, previous, current = await self._script(
+                keys=[f"{self.prefix}{key}:{int(index)}", f"{self.prefix}{key}:{int(index) - 1}"],
+                args=[limit, window, elapsed],
+            )
+        except Exception as e:
+            # Once a minute, not once per login attempt during an outage
+            if time.monotonic() - self._warned_at > 60:
+                self._warned_at = time.monotonic()
+                logger.warning(f"Rate limit backend unavailable, counting locally: {e}")
+            return await self.fallback.hit(key, limit, window)
+        return 0 if allowed else _retry_after(int(previous), int(current), limit, window, elapsed)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class LoginRateLimiter:
+    """Per-IP and per-email login throttling, checked before any bcrypt work.
+
+    The IP limit stops one source from spraying many accounts; the email
+    limit stops many sources from hammering one account.
+    """
+
+    def __init__(self, backend, per_ip: int, per_email: int, window: float, enabled: bool = True):
+        self.backend = backend
+        self.per_ip = per_ip
+        self.per_email = per_email
+        self.window = window
+        self.enabled = enabled
+        self._throttled = {
+            scope: metrics.counter("login_throttled_total", scope=scope) for scope in ("ip", "email")
+        }
+
+    async def check(self, ip: Optional[str], email: str) -> None:
+        """Count a login attempt, raising 429 if either limit is exhausted"""
+        if not self.enabled:
+            return
+        # Emails are hashed so Redis keys don't hold addresses
+        email_key = hashlib.sha256(email.strip().lower().encode()).hexdigest()[:32]
+        checks = [("email", f"login:email:{email_key}", self.per_email)]
+        if ip:
+            checks.insert(0, ("ip", f"login:ip:{ip}", self.per_ip))
+        for scope, key, limit in checks:
+            retry_after = await self.backend.hit(key, limit, self.window)
+            if retry_after:
+                self._throttled[scope].inc()
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many login attempts, please retry later",
+                    headers={"Retry-After": str(retry_after)},
+                )
+
+    async def close(self) -> None:
+        close = getattr(self.backend, "close", None)
+        if close is not None:
+            await close()
+
+
+def _networks(entries):
+    networks = []
+    for entry in entries:
+        try:
+            networks.append(ipaddress.ip_network(entry.strip(), strict=False))
+        except ValueError:
+            logger.warning("Ignoring invalid trusted proxy %r", entry)
+    return networks
+
+
+_trusted_proxies = _networks(settings.trusted_proxies)
+
+
+def _is_trusted(host: str) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in _trusted_proxies)
+
+
+def client_ip(request: Request) -> Optional[str]:
+    """The caller's IP, looking through X-Forwarded-For only when the peer is a trusted proxy.
+
+    Hops are read right to left and trusted proxies skipped, so the first
+    untrusted address is the client; anything left of it could be forged.
+    """
+    peer = request.client.host if request.client else None
+    if not peer or not _is_trusted(peer):
+        return peer
+    hops = [hop.strip() for header in request.headers.getlist("x-forwarded-for") for hop in header.split(",")]
+    hops = [hop for hop in hops if hop]
+    for hop in reversed(hops):
+        if not _is_trusted(hop):
+            return hop
+    return hops[0] if hops else peer
+
+
+def _login_backend():
+    if settings.login_rate_limit_backend == "redis":
+        return RedisSlidingWindow(settings.redis_url)
+    return MemorySlidingWindow()
+
+
+# Global login limiter, configured from LOGIN_RATE_LIMIT_*
+login_limiter = LoginRateLimiter(
+    backend=_login_backend(),
+    per_ip=settings.login_rate_limit_per_ip,
+    per_email=settings.login_rate_limit_per_email,
+    window=settings.login_rate_limit_window_seconds,
+    enabled=settings.login_rate_limit_enabled,
+)
@@ -0,0 +1,128 @@
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Replication lag in seconds; 0 when the replica has replayed everything it received
+POSTGRES_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class ReplicaState:
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.healthy = True
+        self.lag_seconds = 0.0
+        self.checked_at = 0.0
+
+
+class ReplicaRouter:
+    """Picks a healthy read replica and tracks read-your-writes stickiness"""
+
+    def __init__(
+        self,
+        urls: List[str],
+        max_lag_seconds: float = 5.0,
+        health_check_seconds: float = 10.0,
+        sticky_seconds: float = 5.0,
+        max_sticky_clients: int = 10000,
+        **engine_kwargs
+    ):
+        self.max_lag_seconds = max_lag_seconds
+        self.health_check_seconds = health_check_seconds
+        self.sticky_seconds = sticky_seconds
+        self.max_sticky_clients = max_sticky_clients
+        self.replicas: List[ReplicaState] = []
+        self._sticky: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        for url in urls:
+            replica_engine = create_engine(url, **engine_kwargs)
+            state = ReplicaState(replica_engine)
+            event.listen(replica_engine, "handle_error", self._on_error(state))
+            self.replicas.append(state)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    def pick(self) -> Optional[Engine]:
+        """Return a healthy replica engine, or None to fall back to the primary"""
+        candidates = [state for state in self.replicas if self._is_usable(state)]
+        if not candidates:
+            return None
+        return random.choice(candidates).engine
+
+    def mark_write(self, client_key: Optional[str]) -> None:
+        """Pin a client's reads to the primary for the next sticky_seconds"""
+        if not client_key or not self.enabled:
+            return
+        with self._lock:
+            self._sticky[client_key] = time.monotonic() + self.sticky_seconds
+            self._sticky.move_to_end(client_key)
+            while len(self._sticky) > self.max_sticky_clients:
+                self._sticky.popitem(last=False)
+
+    def is_sticky(self, client_key: Optional[str]) -> bool:
+        if not client_key:
+            return False
+        with self._lock:
+            until = self._sticky.get(client_key)
+            if until is None:
+                return False
+            if until <= time.monotonic():
+                del self._sticky[client_key]
+                return False
+            return True
+
+    def status(self) -> List[Dict]:
+        return [
+            {
+                "url": state.engine.url.render_as_string(hide_password=True),
+                "healthy": state.healthy,
+                "lag_seconds": state.lag_seconds,
+            }
+            for state in self.replicas
+        ]
+
+    def _is_usable(self, state: ReplicaState) -> bool:
+        if time.monotonic() - state.checked_at >= self.health_check_seconds:
+            self._check(state)
+        return state.healthy
+
+    def _check(self, state: ReplicaState) -> None:
+        with self._lock:
+            # Another thread may have refreshed it while we waited
+            if time.monotonic() - state.checked_at < self.health_check_seconds:
+                return
+            state.checked_at = time.monotonic()
+        try:
+            with state.engine.connect() as conn:
+                if state.engine.dialect.name == "postgresql":
+                    state.lag_seconds = float(conn.execute(POSTGRES_LAG_QUERY).scalar() or 0)
+                else:
+                    conn.execute(text("SELECT 1"))
+                    state.lag_seconds = 0.0
+            state.healthy = state.lag_seconds <= self.max_lag_seconds
+            if not state.healthy:
+                logger.warning(f"Replica {state.engine.url!r} lagging {state.lag_seconds:.1f}s, using primary")
+        except Exception as e:
+            state.healthy = False
+            logger.warning(f"Replica {state.engine.url!r} unavailable, using primary: {e}")
+
+    def _on_error(self, state: ReplicaState):
+        def handle_error(context):
+            if context.is_disconnect:
+                # Take it out of rotation until the next health check
+                state.healthy = False
+                state.checked_at = time.monotonic()
+        return handle_error
@@ -0,0 +1,159 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional, Set
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.auth import invalidation_bus
+from app.core.bloom import BloomFilter
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, dialect_insert
+from app.core.metrics import metrics
+from app.models import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+FAMILY_PREFIX = "family:"
+
+# Full rebuilds drop expired keys and reset the filter's count
+REBUILD_SECONDS = 3600
+
+# Ids are assigned at insert but become visible at commit, so a slow revoking
+# transaction can commit below ids an incremental sync has already seen. Each
+# sync re-reads this many ids below its watermark (cheap: a primary key range).
+SYNC_OVERLAP_IDS = 1000
+
+
+def family_key(family: str) -> str:
+    return FAMILY_PREFIX + family
+
+
+class RevocationStore:
+    """Revoked refresh tokens: a per-worker Bloom filter over the revoked_tokens table.
+
+    Almost every refresh presents a token that was never revoked, and the
+    filter answers that from memory. Only filter hits (a revoked token, or
+    a false positive) query the table, which stays authoritative. Workers
+    load the filter at startup, then keep it current from the invalidation
+    bus (when enabled) and an incremental sync every `sync_seconds`.
+    """
+
+    def __init__(self, capacity: int, error_rate: float, sync_seconds: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_seconds = sync_seconds
+        self.filter = BloomFilter(capacity, error_rate)
+        # Until the first load the filter knows nothing, so every check goes to the DB
+        self.loaded = False
+        self._last_id = 0
+        self._rebuilt_at = 0.0
+        self._added_during_rebuild: Optional[Set[str]] = None
+        self._task: Optional[asyncio.Task] = None
+        self._checks = {
+            result: metrics.counter("revocation_checks_total", result=result)
+            for result in ("filtered", "false_positive", "revoked", "unloaded")
+        }
+        self._size = metrics.gauge("revocation_filter_keys")
+
+    def add(self, key: str) -> None:
+        self.filter.add(key)
+        if self._added_during_rebuild is not None:
+            self._added_during_rebuild.add(key)
+        self._size.set(self.filter.count)
+
+    async def revoked(self, db: AsyncSession, keys: Iterable[str]) -> Set[str]:
+        """Return which of the keys are revoked, touching the DB only on filter hits"""
+        keys = list(keys)
+        candidates = [key for key in keys if key in self.filter] if self.loaded else keys
+        if not candidates:
+            self._checks["filtered"].inc()
+            return set()
+        revoked = set(await db.scalars(select(RevokedToken.jti).where(RevokedToken.jti.in_(candidates))))
+        if not self.loaded:
+            self._checks["unloaded"].inc()
+        else:
+            self._checks["revoked" if revoked else "false_positive"].inc()
+        return revoked
+
+    async def revoke(self, db: AsyncSession, key: str, user_id: Optional[int], expires_at: datetime) -> bool:
+        """Revoke key in the caller's transaction; False if it was already revoked"""
+        stmt = dialect_insert(RevokedToken, db.bind).values(jti=key, user_id=user_id, expires_at=expires_at)
+        inserted = (await db.execute(
+            stmt.on_conflict_do_nothing(index_elements=["jti"]).returning(RevokedToken.id)
+        )).first()
+        # Adding before commit can only cause a false positive, never a missed revocation
+        self.add(key)
+        invalidation_bus.publish("revoked_token", key)
+        return inserted is not None
+
+    async def revoke_family(self, db: AsyncSession, family: str, user_id: Optional[int]) -> None:
+        """Revoke every refresh token issued in a login session"""
+        # No token of the family can be issued after this, so none outlives a full refresh lifetime
+        expires_at = datetime.now(timezone.utc) + timedelta(days=settings.refresh_token_expire_days)
+        await self.revoke(db, family_key(family), user_id, expires_at)
+
+    async def sync(self, full: bool = False) -> None:
+        """Add newly revoked keys to the filter, or rebuild it from the table"""
+        async with AsyncSessionLocal() as db:
+            query = select(RevokedToken.id, RevokedToken.jti).where(RevokedToken.expires_at > func.now())
+            if not full:
+                rows = (await db.execute(query.where(RevokedToken.id > self._last_id - SYNC_OVERLAP_IDS))).all()
+                for row in rows:
+                    # Re-read rows are mostly known already; skipping them keeps the count honest
+                    if row.jti not in self.filter:
+                        self.add(row.jti)
+                self._last_id = max([self._last_id] + [row.id for row in rows])
+                return
+
+            self._added_during_rebuild = set()
+            try:
+                rows = (await db.execute(query)).all()
+                bloom = BloomFilter(max(self.capacity, 2 * len(rows)), self.error_rate)
+                for row in rows:
+                    bloom.add(row.jti)
+                for key in self._added_during_rebuild:
+                    bloom.add(key)
+            finally:
+                self._added_during_rebuild = None
+        self.filter = bloom
+        self._size.set(bloom.count)
+        self._last_id = max([0] + [row.id for row in rows])
+        self._rebuilt_at = time.monotonic()
+        self.loaded = True
+
+    async def start(self) -> None:
+        await self.sync(full=True)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.sync_seconds)
+            full = (
+                time.monotonic() - self._rebuilt_at > REBUILD_SECONDS
+                or self.filter.count > self.filter.capacity
+            )
+            try:
+                await self.sync(full=full)
+            except Exception as e:
+                logger.warning(f"Revocation filter sync failed: {e}")
+
+
+# Global refresh-token revocation store, started in the app lifespan
+revocation_store = RevocationStore(
+    capacity=settings.revocation_filter_capacity,
+    error_rate=settings.revocation_filter_error_rate,
+    sync_seconds=settings.revocation_sync_seconds,
+)
+invalidation_bus.register("revoked_token", revocation_store.add)
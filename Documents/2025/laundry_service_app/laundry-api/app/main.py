@@ -6,11 +6,27 @@ from fastapi.staticfiles import StaticFiles
 import time
 import logging
 from contextlib import asynccontextmanager
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 
+from app.core.auth import invalidation_bus, password_pool
 from app.core.config import settings
-from app.core.database import create_tables
+from app.core.database import async_engine
+from app.core.ids import TrackingIdExhausted, tracking_ids
+from app.core.migrations import check_schema_version
+from app.core.password_pool import PasswordPoolSaturated
 from app.api.v1.api import api_router
 from app.core.logging_config import setup_logging
+from app.core.profiling import start_profile
+from app.core.rate_limit import login_limiter
+from app.core.revocation import revocation_store
+from app.services.assignment import assignment_scheduler
+from app.services.eta import eta_engine
+from app.services.search import search_index
+from app.services.order_events import order_events
+from app.services.outbox import outbox
+# Outbox consumers register when imported
+from app.services.loyalty_service import loyalty_service  # noqa: F401
+from app.services.notification_service import notification_service  # noqa: F401
 
 # Setup logging
 setup_logging()
@@ -22,17 +38,34 @@ async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # Startup
     logger.info("Starting LaundryPro API...")
-    create_tables()
-    logger.info("Database tables created/verified")
-
-    # Initialize default data if needed
-    from app.utils.init_data import initialize_default_data
-    initialize_default_data()
+    # Schema and default data are owned by `python -m app.cli bootstrap`
+    revision = check_schema_version()
+    logger.info(f"Database schema at revision {revision}")
+    if settings.cache_invalidation_redis:
+        await invalidation_bus.start()
+    await revocation_store.start()
+    await tracking_ids.start()
+    await assignment_scheduler.start()
+    await eta_engine.start()
+    await search_index.start()
+    if settings.outbox_dispatcher_in_app:
+        await outbox.start()
 
     yield
 
     # Shutdown
     logger.info("Shutting down LaundryPro API...")
+    await outbox.stop()
+    await assignment_scheduler.stop()
+    await eta_engine.stop()
+    await search_index.stop()
+    await order_events.drain()
+    await tracking_ids.stop()
+    await revocation_store.stop()
+    await invalidation_bus.stop()
+    password_pool.shutdown()
+    await login_limiter.close()
+    await async_engine.dispose()
 
 
 # Create FastAPI app
@@ -53,6 +86,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Link", "Server-Timing"],
 )
 
 # Trusted host middleware (security)
@@ -63,21 +97,59 @@ if settings.environment == "production":
     )
 
 
-# Request timing middleware
+# Request timing middleware: total wall time plus a db/external/app breakdown
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
     start_time = time.time()
+    profile = start_profile()
     response = await call_next(request)
     process_time = time.time() - start_time
     response.headers["X-Process-Time"] = str(process_time)
+    if settings.server_timing_enabled:
+        response.headers["Server-Timing"] = profile.server_timing(process_time * 1000)
 
     # Log slow requests
-    if process_time > 1.0:
-        logger.warning(f"Slow request: {request.method} {request.url} took {process_time:.2f}s")
+    if process_time > settings.slow_request_seconds:
+        logger.warning(
+            f"Slow request: {request.method} {request.url} took {process_time:.2f}s ({profile.summary()})"
+        )
 
     return response
 
 
+# Connection pool exhausted: shed load instead of letting requests pile up
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    logger.warning(f"Database pool exhausted: {request.method} {request.url}")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Service temporarily overloaded, please retry", "type": "overloaded"},
+        headers={"Retry-After": str(settings.db_retry_after_seconds)},
+    )
+
+
+# Too many logins/registrations queued for bcrypt: fail fast, other routes stay responsive
+@app.exception_handler(PasswordPoolSaturated)
+async def password_pool_saturated_handler(request: Request, exc: PasswordPoolSaturated):
+    logger.warning(f"Password hashing pool saturated ({exc}): {request.method} {request.url}")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Service temporarily overloaded, please retry", "type": "overloaded"},
+        headers={"Retry-After": str(settings.password_retry_after_seconds)},
+    )
+
+
+# No tracking ID node leased, or a burst has used up the drift budget: shed the order, don't block
+@app.exception_handler(TrackingIdExhausted)
+async def tracking_id_exhausted_handler(request: Request, exc: TrackingIdExhausted):
+    logger.warning(f"Tracking IDs unavailable ({exc}): {request.method} {request.url}")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Service temporarily overloaded, please retry", "type": "overloaded"},
+        headers={"Retry-After": "1"},
+    )
+
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
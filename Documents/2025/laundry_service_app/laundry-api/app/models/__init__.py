@@ -1,14 +1,20 @@
-from .user import User, UserRole
+from .user import User, UserRole, RevokedToken
 from .customer import Customer, SubscriptionPlan, LoyaltyTier
 from .worker import Worker, WorkerRole
 from .service import ServiceType, ServiceCategory
-from .order import Order, OrderItem, OrderStatus, OrderStatusHistory
+from .order import Order, OrderItem, OrderStatus, OrderStatusHistory, TrackingIdNode
 from .loyalty import PointsTransaction, TransactionType, LoyaltyTierConfig, SubscriptionPlanConfig
+from .outbox import OutboxEvent
+from .notification import (
+    MessageTemplate, Notification, NotificationPreference, WebhookEvent,
+    NotificationType, MessageStatus
+)
 
 __all__ = [
     # User models
     "User",
     "UserRole",
+    "RevokedToken",
 
     # Customer models
     "Customer",
@@ -28,10 +34,22 @@ __all__ = [
     "OrderItem",
     "OrderStatus",
     "OrderStatusHistory",
+    "TrackingIdNode",
 
     # Loyalty models
     "PointsTransaction",
     "TransactionType",
     "LoyaltyTierConfig",
     "SubscriptionPlanConfig",
+
+    # Notification models
+    "MessageTemplate",
+    "Notification",
+    "NotificationPreference",
+    "WebhookEvent",
+    "NotificationType",
+    "MessageStatus",
+
+    # Outbox models
+    "OutboxEvent",
 ]
@@ -67,3 +67,7 @@ class Customer(Base):
     @property
     def phone(self):
         return self.user.phone if self.user else None
+
+    @property
+    def is_active(self):
+        return bool(self.user.is_active) if self.user else False
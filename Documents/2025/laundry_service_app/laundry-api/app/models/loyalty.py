@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Enum, DateTime, ForeignKey, Numeric, Boolean
+from sqlalchemy import Column, Integer, String, Text, Enum, DateTime, ForeignKey, Numeric, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -15,6 +15,10 @@ class TransactionType(str, enum.Enum):
 
 class PointsTransaction(Base):
     __tablename__ = "points_transactions"
+    __table_args__ = (
+        # Per-customer points history, keyset-paginated on id
+        Index("ix_points_transactions_customer_id_id", "customer_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     customer_id = Column(Integer, ForeignKey("customers.id"), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Enum, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Enum, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -66,6 +66,13 @@ class MessageTemplate(Base):
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # get_notification_stats: status counts over a created_at window
+        Index("ix_notifications_status_created_at", "status", "created_at"),
+        Index("ix_notifications_customer_id_created_at", "customer_id", "created_at"),
+        # retry_failed_notifications: status = failed and retry_count < max
+        Index("ix_notifications_status_retry_count", "status", "retry_count"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     customer_id = Column(Integer, ForeignKey("customers.id"), nullable=False)
@@ -99,11 +106,11 @@ class Notification(Base):
     delivered_at = Column(DateTime(timezone=True), nullable=True)
     read_at = Column(DateTime(timezone=True), nullable=True)
 
-    # Metadata
-    metadata = Column(JSON, nullable=True)  # Additional data for tracking
+    # Metadata ("metadata" is reserved on declarative classes, so only the column keeps the name)
+    message_metadata = Column("metadata", JSON, nullable=True)  # Additional data for tracking
 
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
@@ -1,9 +1,8 @@
-from sqlalchemy import Column, Integer, String, Numeric, Text, Enum, DateTime, ForeignKey
+from sqlalchemy import BigInteger, Column, Integer, String, Numeric, Text, Enum, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
 import enum
-import uuid
 
 
 class OrderStatus(str, enum.Enum):
@@ -16,6 +15,14 @@ class OrderStatus(str, enum.Enum):
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        # Per-customer order history, keyset-paginated on id
+        Index("ix_orders_customer_id_id", "customer_id", "id"),
+        # Status boards and worker queues
+        Index("ix_orders_status_created_at", "status", "created_at"),
+        Index("ix_orders_assigned_to_id_status", "assigned_to_id", "status"),
+        # Counter search: pg_trgm GIN indexes on tracking_id and notes (PostgreSQL only, migration 0008)
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     tracking_id = Column(String, unique=True, nullable=False, index=True)
@@ -41,7 +48,7 @@ class Order(Base):
     actual_completion_time = Column(DateTime(timezone=True), nullable=True)
 
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     completed_at = Column(DateTime(timezone=True), nullable=True)
 
@@ -58,17 +65,15 @@ class Order(Base):
     @staticmethod
     def generate_tracking_id():
         """Generate a unique tracking ID"""
-        import time
-        timestamp = str(int(time.time()))[-6:]  # Last 6 digits of timestamp
-        random_part = str(uuid.uuid4())[:4].upper()
-        return f"LP{timestamp}{random_part}"
+        from app.core.ids import tracking_ids
+        return tracking_ids.next()
 
 
 class OrderItem(Base):
     __tablename__ = "order_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, index=True)
     service_type_id = Column(Integer, ForeignKey("service_types.id"), nullable=False)
 
     quantity = Column(Integer, nullable=False)
@@ -88,6 +93,9 @@ class OrderItem(Base):
 
 class OrderStatusHistory(Base):
     __tablename__ = "order_status_history"
+    __table_args__ = (
+        Index("ix_order_status_history_order_id_created_at", "order_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
@@ -104,3 +112,17 @@ class OrderStatusHistory(Base):
 
     def __repr__(self):
         return f"<OrderStatusHistory(id={self.id}, order_id={self.order_id}, status='{self.status}')>"
+
+
+class TrackingIdNode(Base):
+    """Lease on one tracking ID node id, held by one running process"""
+    __tablename__ = "tracking_id_nodes"
+
+    node_id = Column(Integer, primary_key=True, autoincrement=False)
+    owner = Column(String(128), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    # Last logical second the holder reported; a new holder starts past it
+    issued_until = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<TrackingIdNode(node_id={self.node_id}, owner='{self.owner}')>"
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class OutboxEvent(Base):
+    """One event waiting for one consumer, written in the transaction that caused it"""
+    __tablename__ = "outbox_events"
+    __table_args__ = (
+        # Dispatcher claim: oldest deliverable rows first
+        Index("ix_outbox_events_available_at_id", "available_at", "id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    consumer = Column(String(64), nullable=False)
+    topic = Column(String(64), nullable=False)
+    payload = Column(JSON, nullable=False)
+
+    # Delivery state: claimed rows are leased by pushing available_at ahead
+    attempts = Column(Integer, nullable=False, default=0)
+    available_at = Column(DateTime(timezone=True), nullable=False)
+    last_error = Column(Text, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<OutboxEvent(id={self.id}, consumer='{self.consumer}', topic='{self.topic}')>"
@@ -16,7 +16,7 @@ class ServiceType(Base):
     __tablename__ = "service_types"
 
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, nullable=False, index=True)
+    name = Column(String, unique=True, nullable=False, index=True)
     category = Column(Enum(ServiceCategory), nullable=False)
     base_price = Column(Numeric(10, 2), nullable=False)
     description = Column(Text, nullable=True)
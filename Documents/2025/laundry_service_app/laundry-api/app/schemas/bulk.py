@@ -0,0 +1,15 @@
+# app/schemas/bulk.py
+from pydantic import BaseModel
+from typing import List, Literal, Optional
+
+class BulkRowResult(BaseModel):
+    index: int  # position of the row in the request body
+    status: Literal["created", "upserted", "rejected"]
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+class BulkResult(BaseModel):
+    created: int = 0
+    upserted: int = 0
+    rejected: int = 0
+    results: List[BulkRowResult]
@@ -1,11 +1,12 @@
 # app/schemas/loyalty.py
 from pydantic import BaseModel, ConfigDict
-from typing import Optional, Literal
+from typing import Optional
+from app.models import TransactionType
 
 class PointsTxnBase(BaseModel):
     customer_id: int
     order_id: Optional[int] = None
-    transaction_type: Literal["earned", "redeemed", "expired", "bonus", "adjustment"]
+    transaction_type: TransactionType
     points: int
     description: str
     processed_by_id: Optional[int] = None
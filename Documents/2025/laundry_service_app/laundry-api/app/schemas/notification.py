@@ -18,6 +18,10 @@ class NotificationPreferenceBase(BaseModel):
     timezone: str = "UTC"
 
 
+class NotificationPreferenceCreate(NotificationPreferenceBase):
+    customer_id: int
+
+
 class NotificationPreferenceUpdate(NotificationPreferenceBase):
     pass
 
@@ -109,6 +113,8 @@ class NotificationResponse(NotificationBase):
     template_id: Optional[int] = None
     order_id: Optional[int] = None
     whatsapp_message_id: Optional[str] = None
+    # The model keeps it as message_metadata; "metadata" is reserved on declarative classes
+    metadata: Optional[Dict[str, Any]] = Field(None, validation_alias="message_metadata")
     status: MessageStatus
     delivery_status: Optional[str] = None
     error_message: Optional[str] = None
@@ -177,6 +183,25 @@ class WhatsAppWebhookEvent(BaseModel):
     entry: Optional[List[Dict[str, Any]]] = None
 
 
+class WebhookEventIn(BaseModel):
+    event_type: str
+    whatsapp_message_id: Optional[str] = None
+    notification_id: Optional[int] = None
+    status: Optional[str] = None
+    timestamp: Optional[datetime] = None
+    raw_data: Dict[str, Any]
+
+
+class WebhookEventOut(WebhookEventIn):
+    id: int
+    processed: bool
+    processed_at: Optional[datetime] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 class WhatsAppStatusUpdate(BaseModel):
     message_id: str
     status: str
@@ -1,22 +1,36 @@
 # app/schemas/order.py
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List, Literal
+from datetime import datetime
 
 class OrderItemIn(BaseModel):
     service_type_id: int
-    quantity: int
-    price_per_item: Optional[float] = None  # if omitted, use service base_price
+    quantity: int = Field(..., ge=1)
+    price_per_item: Optional[float] = Field(None, ge=0)  # if omitted, use service base_price
 
 class OrderBase(BaseModel):
     customer_id: int
     status: Optional[Literal["pending", "in-progress", "ready", "completed", "cancelled"]] = "pending"
-    discount_amount: Optional[float] = 0.0
+    discount_amount: Optional[float] = Field(0.0, ge=0)
     notes: Optional[str] = None
     captured_by_id: Optional[int] = None
     assigned_to_id: Optional[int] = None
 
 class OrderCreate(OrderBase):
-    items: List[OrderItemIn]
+    items: List[OrderItemIn] = Field(..., min_length=1)
+
+class OrderImportItem(OrderItemIn):
+    service_type_id: Optional[int] = None
+    service: Optional[str] = None  # service name, as written on paper tickets
+
+class OrderImport(OrderBase):
+    # One of customer_id, customer_email or customer_phone identifies the customer
+    customer_id: Optional[int] = None
+    customer_email: Optional[str] = None
+    customer_phone: Optional[str] = None
+    created_at: Optional[datetime] = None  # when the order was taken; defaults to now
+    completed_at: Optional[datetime] = None
+    items: List[OrderImportItem] = Field(..., min_length=1)
 
 class OrderUpdate(BaseModel):
     status: Optional[Literal["pending", "in-progress", "ready", "completed", "cancelled"]] = None
@@ -30,7 +44,18 @@ class OrderAssign(BaseModel):
 class OrderStatusChange(BaseModel):
     status: Literal["pending", "in-progress", "ready", "completed", "cancelled"]
     notes: Optional[str] = None
-    updated_by_id: Optional[int] = None
+    # The change is always recorded under the authenticated user
+
+class OrderStatusBulkChange(OrderStatusChange):
+    order_ids: List[int] = Field(..., min_length=1, max_length=1000)
+
+class OrderStatusRejection(BaseModel):
+    order_id: int
+    error: str
+
+class OrderStatusBulkResult(BaseModel):
+    updated: List[int]
+    rejected: List[OrderStatusRejection]
 
 class OrderItemOut(BaseModel):
     id: int
@@ -51,5 +76,17 @@ class OrderOut(BaseModel):
     notes: Optional[str]
     captured_by_id: Optional[int]
     assigned_to_id: Optional[int]
+    estimated_completion_time: Optional[datetime] = None
     items: List[OrderItemOut]
     model_config = ConfigDict(from_attributes=True)
+
+class TrackingEntryOut(BaseModel):
+    status: str
+    notes: Optional[str] = None
+    at: Optional[datetime] = None
+
+class OrderTrackingOut(BaseModel):
+    tracking_id: str
+    status: str
+    estimated_completion_time: Optional[datetime] = None
+    last_update: Optional[TrackingEntryOut] = None
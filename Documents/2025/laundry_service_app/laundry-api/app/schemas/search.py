@@ -0,0 +1,29 @@
+# app/schemas/search.py
+from pydantic import BaseModel
+from typing import List, Literal, Optional
+from datetime import datetime
+
+class CustomerSearchHit(BaseModel):
+    customer_id: int
+    name: str
+    phone: Optional[str] = None
+    email: str
+    matched: Literal["name", "phone"]
+    score: float  # trigram similarity to the query, 0-1
+
+class OrderSearchHit(BaseModel):
+    order_id: int
+    tracking_id: str
+    status: str
+    created_at: Optional[datetime] = None
+    customer_id: int
+    customer_name: str
+    customer_phone: Optional[str] = None
+    notes: Optional[str] = None
+    # "name"/"phone": one of the matched customers' latest orders
+    matched: Literal["tracking_id", "notes", "name", "phone"]
+    score: float
+
+class SearchResults(BaseModel):
+    customers: List[CustomerSearchHit]
+    orders: List[OrderSearchHit]
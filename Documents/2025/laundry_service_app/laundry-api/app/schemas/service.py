@@ -1,10 +1,11 @@
 # app/schemas/service.py
 from pydantic import BaseModel, ConfigDict
-from typing import Optional, Literal
+from typing import Optional
+from app.models import ServiceCategory
 
 class ServiceTypeBase(BaseModel):
-    name: Optional[str] = None
-    category: Literal["wash", "dry-clean", "iron", "special"]
+    name: str
+    category: ServiceCategory
     base_price: float
     description: Optional[str] = None
     estimated_duration_hours: Optional[int] = 2
@@ -15,7 +16,7 @@ class ServiceTypeCreate(ServiceTypeBase):
 
 class ServiceTypeUpdate(BaseModel):
     name: Optional[str] = None
-    category: Optional[Literal["wash", "dry-clean", "iron", "special"]] = None
+    category: Optional[ServiceCategory] = None
     base_price: Optional[float] = None
     description: Optional[str] = None
     estimated_duration_hours: Optional[int] = None
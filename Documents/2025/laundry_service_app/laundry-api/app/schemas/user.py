@@ -56,6 +56,10 @@ class RefreshTokenRequest(BaseModel):
     refresh_token: str
 
 
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
+
+
 class PasswordChange(BaseModel):
     current_password: str
     new_password: str
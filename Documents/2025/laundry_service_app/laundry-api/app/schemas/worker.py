@@ -1,11 +1,12 @@
 # app/schemas/worker.py
 from pydantic import BaseModel, ConfigDict
-from typing import Optional, Literal
+from typing import Optional
+from app.models import WorkerRole
 
 class WorkerBase(BaseModel):
     user_id: int
     employee_id: str
-    worker_role: Optional[Literal["worker", "supervisor"]] = "worker"
+    worker_role: Optional[WorkerRole] = WorkerRole.WORKER
     is_active: Optional[bool] = True
     total_orders_processed: Optional[int] = 0
     created_by_id: Optional[int] = None
@@ -15,11 +16,21 @@ class WorkerCreate(WorkerBase):
 
 class WorkerUpdate(BaseModel):
     employee_id: Optional[str] = None
-    worker_role: Optional[Literal["worker", "supervisor"]] = None
+    worker_role: Optional[WorkerRole] = None
     is_active: Optional[bool] = None
     total_orders_processed: Optional[int] = None
     created_by_id: Optional[int] = None
 
 class WorkerOut(WorkerBase):
     id: int
+    # From the linked user row
+    name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
     model_config = ConfigDict(from_attributes=True)
+
+class WorkerLoadOut(BaseModel):
+    worker_id: Optional[int] = None
+    user_id: int
+    open_orders: int
+    remaining_hours: float
@@ -0,0 +1,160 @@
+import asyncio
+import heapq
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import metrics
+from app.models import Order, OrderItem, OrderStatus, ServiceType, User, Worker, WorkerRole
+from app.services.order_events import OrderStatusChanged, order_events
+
+logger = logging.getLogger(__name__)
+
+# Orders still waiting for or in the hands of a worker
+OPEN_STATUSES = (OrderStatus.PENDING, OrderStatus.IN_PROGRESS)
+
+
+class AssignmentScheduler:
+    """Assigns new orders to the least-loaded active worker.
+
+    Load per worker is (remaining hours, open orders), where an order's
+    hours are the sum of quantity x ServiceType.estimated_duration_hours of
+    its items. Workers sit in a min-heap with lazy deletion: assigning or
+    releasing pushes the worker's new load and stale entries are skipped
+    when they surface, so both are O(log n). State lives in this process;
+    it is rebuilt from the DB at startup and every refresh_seconds, which
+    also picks up orders and workers changed by other processes.
+    """
+
+    def __init__(self, refresh_seconds: float, session_factory=SessionLocal):
+        self.refresh_seconds = refresh_seconds
+        self.session_factory = session_factory
+        self._lock = threading.Lock()
+        self._load: Dict[int, List] = {}  # worker user id -> [hours, open orders, version]
+        self._orders: Dict[int, Tuple[int, float]] = {}  # open order id -> (worker user id, hours)
+        self._worker_ids: Dict[int, int] = {}  # worker user id -> Worker.id
+        self._heap: List[Tuple[float, int, int, int]] = []  # (hours, open orders, user id, version)
+        self._task: Optional[asyncio.Task] = None
+        self._assigned = metrics.counter("orders_auto_assigned_total")
+
+    def assign(self, hours: float) -> Optional[int]:
+        """Reserve the least-loaded worker for an order; None if no worker is active"""
+        with self._lock:
+            while self._heap:
+                _, _, user_id, version = self._heap[0]
+                load = self._load.get(user_id)
+                if load is not None and load[2] == version:
+                    self._charge(user_id, hours, 1)
+                    self._assigned.inc()
+                    return user_id
+                heapq.heappop(self._heap)
+        return None
+
+    def add(self, order_id: int, user_id: int, hours: float, reserved: bool = False) -> None:
+        """Track an open order; charge its worker unless assign() already did"""
+        with self._lock:
+            if user_id not in self._load:
+                return  # not an active worker
+            self._orders[order_id] = (user_id, hours)
+            if not reserved:
+                self._charge(user_id, hours, 1)
+
+    def unreserve(self, user_id: int, hours: float) -> None:
+        """Give back an assign() reservation whose order was never committed"""
+        with self._lock:
+            if user_id in self._load:
+                self._charge(user_id, -hours, -1)
+
+    def release(self, order_id: int) -> None:
+        """The order left the worker's queue (ready, completed or cancelled)"""
+        with self._lock:
+            tracked = self._orders.pop(order_id, None)
+            if tracked is not None and tracked[0] in self._load:
+                self._charge(tracked[0], -tracked[1], -1)
+
+    def snapshot(self) -> List[Dict]:
+        """Current load of every active worker, least loaded first"""
+        with self._lock:
+            rows = [
+                {"worker_id": self._worker_ids.get(user_id), "user_id": user_id,
+                 "remaining_hours": round(load[0], 2), "open_orders": load[1]}
+                for user_id, load in self._load.items()
+            ]
+        return sorted(rows, key=lambda row: (row["remaining_hours"], row["open_orders"], row["user_id"]))
+
+    def reset(self, workers: Dict[int, int], open_orders: Iterable[Tuple[int, int, float]]) -> None:
+        """Replace all state: workers maps user id -> Worker.id, open_orders are (order id, user id, hours)"""
+        load = {user_id: [0.0, 0, 0] for user_id in workers}
+        orders = {}
+        for order_id, user_id, hours in open_orders:
+            if user_id in load:
+                orders[order_id] = (user_id, hours)
+                load[user_id][0] += hours
+                load[user_id][1] += 1
+        heap = [(hours, count, user_id, version) for user_id, (hours, count, version) in load.items()]
+        heapq.heapify(heap)
+        with self._lock:
+            self._load, self._orders, self._worker_ids, self._heap = load, orders, dict(workers), heap
+
+    def refresh(self) -> None:
+        """Rebuild from active workers and their open orders (two queries)"""
+        with self.session_factory() as db:
+            workers = dict(db.execute(
+                select(Worker.user_id, Worker.id)
+                .join(User, User.id == Worker.user_id)
+                .where(Worker.is_active == True, User.is_active == True, Worker.worker_role == WorkerRole.WORKER)
+            ).all())
+            open_orders = db.execute(
+                select(Order.id, Order.assigned_to_id,
+                       func.sum(OrderItem.quantity * func.coalesce(ServiceType.estimated_duration_hours, 0)))
+                .join(OrderItem, OrderItem.order_id == Order.id)
+                .join(ServiceType, ServiceType.id == OrderItem.service_type_id)
+                .where(Order.status.in_(OPEN_STATUSES), Order.assigned_to_id.isnot(None))
+                .group_by(Order.id, Order.assigned_to_id)
+            ).all()
+        self.reset(workers, ((order_id, user_id, float(hours or 0)) for order_id, user_id, hours in open_orders))
+
+    def on_status_changed(self, event: OrderStatusChanged) -> None:
+        if event.status not in OPEN_STATUSES:
+            self.release(event.order_id)
+
+    def _charge(self, user_id: int, hours: float, orders: int) -> None:
+        load = self._load[user_id]
+        load[0] = max(0.0, load[0] + hours)
+        load[1] = max(0, load[1] + orders)
+        load[2] += 1
+        heapq.heappush(self._heap, (load[0], load[1], user_id, load[2]))
+        if len(self._heap) > 4 * len(self._load) + 64:
+            # Drop stale entries before they dominate the heap
+            self._heap = [(h, n, uid, v) for uid, (h, n, v) in self._load.items()]
+            heapq.heapify(self._heap)
+
+    async def start(self) -> None:
+        await asyncio.to_thread(self.refresh)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            try:
+                await asyncio.to_thread(self.refresh)
+            except Exception as e:
+                logger.warning(f"Worker load refresh failed: {e}")
+
+
+# Global assignment scheduler; the app lifespan loads and refreshes it
+assignment_scheduler = AssignmentScheduler(refresh_seconds=settings.assignment_refresh_seconds)
+order_events.subscribe(OrderStatusChanged, assignment_scheduler.on_status_changed)
@@ -0,0 +1,293 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from itertools import accumulate
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import bindparam, func, or_, select, update
+
+from app.core.bulk import batched
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import metrics
+from app.models import Order, OrderItem, ServiceType
+from app.services.assignment import OPEN_STATUSES
+from app.services.order_events import OrderStatusChanged, order_events
+from app.services.tracking import tracking_snapshots
+
+logger = logging.getLogger(__name__)
+
+# What an order needs from one service category: (hours of work, longest item in hours)
+Work = Tuple[float, float]
+
+_orders = Order.__table__
+# OR rather than IN: expanding IN parameters cannot be used with executemany
+_SET_ETA = (
+    update(_orders)
+    .where(_orders.c.id == bindparam("order_id"), or_(*(_orders.c.status == status for status in OPEN_STATUSES)))
+    .values(estimated_completion_time=bindparam("eta"))
+)
+
+
+def _value(value):
+    return getattr(value, "value", value)
+
+
+def _epoch(value: Optional[datetime]) -> Optional[float]:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        # SQLite hands back naive datetimes; they are stored as UTC
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def work_by_category(lines: Iterable[Tuple[object, int, Optional[int]]]) -> Dict[str, Work]:
+    """Fold (category, quantity, estimated_duration_hours) item lines into Work per category"""
+    work: Dict[str, Work] = {}
+    for category, quantity, duration in lines:
+        category, duration = _value(category), float(duration or 0)
+        hours, longest = work.get(category, (0.0, 0.0))
+        work[category] = (hours + quantity * duration, max(longest, duration))
+    return work
+
+
+class EtaEngine:
+    """Queue-aware estimated completion times for open orders.
+
+    Each service category works through its open orders first come, first
+    served at `capacity` hours of work per hour, starting from its anchor:
+    the moment its current head order started (when the previous head
+    left). An order is through a category at
+    max(anchor + (work queued ahead + its own work) / capacity,
+        arrival + its longest item there),
+    and done when its slowest category is (never before now). While work
+    goes as estimated the ETAs hold still; they move when orders finish
+    early or late, leave the queue, or a category falls behind.
+
+    Queues, backlog totals and anchors are kept in memory and updated as
+    orders arrive and leave, so quoting a new order costs no queries.
+    flush() recomputes every open order in one prefix-sum pass per category
+    and writes only the ETAs that moved by threshold_seconds or more, in
+    one executemany UPDATE per 1000 rows. Everything runs on the event
+    loop. The queues are rebuilt from the DB at startup and every
+    refresh_seconds, which also picks up orders created or closed by other
+    processes.
+    """
+
+    def __init__(
+        self,
+        default_capacity: float,
+        category_capacity: Dict[str, float],
+        threshold_seconds: float,
+        flush_interval: float,
+        refresh_seconds: float,
+        session_factory=AsyncSessionLocal,
+    ):
+        self.default_capacity = default_capacity
+        self.category_capacity = dict(category_capacity)
+        self.threshold_seconds = threshold_seconds
+        self.flush_interval = flush_interval
+        self.refresh_seconds = refresh_seconds
+        self.session_factory = session_factory
+        # category -> {order id: (hours of work, earliest finish as epoch)}, in arrival order
+        self._queues: Dict[str, Dict[int, Tuple[float, float]]] = {}
+        self._backlog: Dict[str, float] = {}  # category -> queued hours of work
+        self._anchors: Dict[str, float] = {}  # category -> when its head order started (epoch)
+        self._orders: Dict[int, list] = {}  # order id -> [tracking id, last written ETA, categories]
+        self._dirty = False
+        self._task: Optional[asyncio.Task] = None
+        self._recomputed = metrics.counter("eta_recomputed_total")
+        self._written = metrics.counter("eta_written_total")
+
+    def capacity(self, category: str) -> float:
+        return self.category_capacity.get(category, self.default_capacity)
+
+    def quote(
+        self, work: Dict[str, Work], now: Optional[float] = None, ahead: Optional[Dict[str, float]] = None,
+    ) -> datetime:
+        """ETA for a new order joining the back of every queue it needs.
+
+        `ahead` adds hours per category for orders quoted but not added yet
+        (earlier rows of the same import batch).
+        """
+        now = time.time() if now is None else now
+        eta = now
+        for category, (own, longest) in work.items():
+            anchor = self._anchors.get(category, now) if self._queues.get(category) else now
+            queued = self._backlog.get(category, 0.0) + own + (ahead.get(category, 0.0) if ahead else 0.0)
+            queued = queued * 3600 / self.capacity(category)
+            eta = max(eta, anchor + queued, now + longest * 3600)
+        return datetime.fromtimestamp(eta, timezone.utc)
+
+    def add(
+        self, order_id: int, tracking_id: str, work: Dict[str, Work], eta: Optional[datetime],
+        arrival: Optional[float] = None,
+    ) -> None:
+        """Queue a new open order whose ETA (as written) is eta"""
+        arrival = time.time() if arrival is None else arrival
+        for category, (hours, longest) in work.items():
+            queue = self._queues.setdefault(category, {})
+            if not queue:
+                self._anchors[category] = arrival
+            queue[order_id] = (hours, arrival + longest * 3600)
+            self._backlog[category] = self._backlog.get(category, 0.0) + hours
+        self._orders[order_id] = [tracking_id, _epoch(eta), tuple(work)]
+
+    def release(self, order_id: int, now: Optional[float] = None) -> None:
+        """The order left its queues (ready, completed or cancelled)"""
+        tracked = self._orders.pop(order_id, None)
+        if tracked is None:
+            return
+        now = time.time() if now is None else now
+        for category in tracked[2]:
+            queue = self._queues[category]
+            if next(iter(queue)) == order_id:
+                # The head finished: the next order starts now
+                self._anchors[category] = now
+            hours, _ = queue.pop(order_id)
+            self._backlog[category] -= hours
+        self._dirty = True
+
+    def on_status_changed(self, event: OrderStatusChanged) -> None:
+        if event.status not in OPEN_STATUSES:
+            self.release(event.order_id)
+
+    def recompute(self, now: Optional[float] = None) -> List[Tuple[int, str, float]]:
+        """New ETAs of every open order; returns (order id, tracking id, ETA) for those that moved"""
+        if not self._dirty:
+            return []
+        self._dirty = False
+        now = time.time() if now is None else now
+        finish: Dict[int, float] = {}
+        for category, queue in self._queues.items():
+            anchor, rate = self._anchors.get(category, now), 3600 / self.capacity(category)
+            done = list(accumulate(hours for hours, _ in queue.values()))
+            self._backlog[category] = done[-1] if done else 0.0
+            # When each order is through this category, in queue order
+            through = map(max, (earliest for _, earliest in queue.values()),
+                          (anchor + queued * rate for queued in done))
+            if not finish:
+                finish.update(zip(queue, through))
+                continue
+            for order_id, at in zip(queue, through):
+                if at > finish.get(order_id, 0.0):
+                    finish[order_id] = at
+        self._recomputed.inc(len(finish))
+
+        moved = []
+        threshold = self.threshold_seconds
+        for order_id, eta in finish.items():
+            tracked = self._orders[order_id]
+            eta = max(eta, now)
+            if tracked[1] is None or abs(eta - tracked[1]) >= threshold:
+                tracked[1] = eta
+                moved.append((order_id, tracked[0], eta))
+        return moved
+
+    async def flush(self) -> int:
+        """Recompute if orders left since the last flush and write the ETAs that moved"""
+        moved = self.recompute()
+        if not moved:
+            return 0
+        try:
+            async with self.session_factory() as db:
+                for chunk in batched(moved, 1000):
+                    await db.execute(_SET_ETA, [
+                        {"order_id": order_id, "eta": datetime.fromtimestamp(eta, timezone.utc)}
+                        for order_id, _, eta in chunk
+                    ])
+                await db.commit()
+        except Exception:
+            # Forget what was "written" so the next flush tries again
+            for order_id, _, _ in moved:
+                if order_id in self._orders:
+                    self._orders[order_id][1] = None
+            self._dirty = True
+            raise
+        self._written.inc(len(moved))
+        tracking_snapshots.drop([tracking_id for _, tracking_id, _ in moved])
+        return len(moved)
+
+    def reset(self, rows: Iterable[Tuple]) -> None:
+        """Replace all queues with (order id, tracking id, ETA, created at, category, hours, longest) rows.
+
+        Rows come in arrival order. Anchors are kept; a category seen for the
+        first time starts now.
+        """
+        now = time.time()
+        queues: Dict[str, Dict[int, Tuple[float, float]]] = {}
+        backlog: Dict[str, float] = {}
+        orders: Dict[int, list] = {}
+        for order_id, tracking_id, eta, created_at, category, hours, longest in rows:
+            category, hours = _value(category), float(hours or 0)
+            arrival = _epoch(created_at) or now
+            queues.setdefault(category, {})[order_id] = (hours, arrival + float(longest or 0) * 3600)
+            backlog[category] = backlog.get(category, 0.0) + hours
+            tracked = orders.get(order_id)
+            if tracked is None:
+                orders[order_id] = [tracking_id, _epoch(eta), (category,)]
+            else:
+                tracked[2] += (category,)
+        self._anchors = {category: self._anchors.get(category, now) for category in queues}
+        self._queues, self._backlog, self._orders = queues, backlog, orders
+        # Fills in missing ETAs and corrects any that drifted
+        self._dirty = True
+
+    async def refresh(self) -> None:
+        """Rebuild the queues from open orders (one query)"""
+        async with self.session_factory() as db:
+            rows = (await db.execute(
+                select(
+                    Order.id, Order.tracking_id, Order.estimated_completion_time, Order.created_at,
+                    ServiceType.category,
+                    func.sum(OrderItem.quantity * func.coalesce(ServiceType.estimated_duration_hours, 0)),
+                    func.max(ServiceType.estimated_duration_hours),
+                )
+                .join(OrderItem, OrderItem.order_id == Order.id)
+                .join(ServiceType, ServiceType.id == OrderItem.service_type_id)
+                .where(Order.status.in_(OPEN_STATUSES))
+                .group_by(
+                    Order.id, Order.tracking_id, Order.estimated_completion_time, Order.created_at,
+                    ServiceType.category,
+                )
+                .order_by(Order.id)
+            )).all()
+        self.reset(rows)
+
+    async def start(self) -> None:
+        await self.refresh()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        refreshed = time.monotonic()
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                if time.monotonic() - refreshed >= self.refresh_seconds:
+                    refreshed = time.monotonic()
+                    await self.refresh()
+                await self.flush()
+            except Exception as e:
+                logger.warning(f"ETA refresh failed: {e}")
+
+
+# Global ETA engine; the app lifespan loads it and flushes in the background
+eta_engine = EtaEngine(
+    default_capacity=settings.eta_default_capacity,
+    category_capacity=settings.eta_category_capacity,
+    threshold_seconds=settings.eta_write_threshold_seconds,
+    flush_interval=settings.eta_flush_interval_seconds,
+    refresh_seconds=settings.eta_refresh_seconds,
+)
+order_events.subscribe(OrderStatusChanged, eta_engine.on_status_changed)
@@ -0,0 +1,55 @@
+import logging
+
+from sqlalchemy import func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Customer, LoyaltyTier, OrderStatus
+from app.services.order_events import OrderStatusChanged
+from app.services.outbox import outbox
+from app.services.pricing import get_pricing_config
+
+logger = logging.getLogger(__name__)
+
+
+class LoyaltyService:
+    async def on_order_status_changed(self, event: OrderStatusChanged, db: AsyncSession) -> None:
+        """Count a completed order towards the customer's totals and tier.
+
+        Runs in the outbox transaction that acknowledges the event, so each
+        completion is counted exactly once.
+        """
+        if event.status != OrderStatus.COMPLETED:
+            return
+        customer = (await db.execute(
+            update(Customer)
+            .where(Customer.id == event.customer_id)
+            .values(
+                total_orders=func.coalesce(Customer.total_orders, 0) + 1,
+                total_spent=func.coalesce(Customer.total_spent, 0) + event.final_amount,
+            )
+            .returning(Customer.total_orders, Customer.loyalty_tier)
+            .execution_options(synchronize_session=False)
+        )).first()
+        if customer is None:
+            return
+        config = await get_pricing_config(db)
+        tier = config.tier_for(customer.total_orders)
+        current = getattr(customer.loyalty_tier, "value", customer.loyalty_tier)
+        # Only ever upgrade: a tier set by hand above the earned one is kept
+        if (tier in LoyaltyTier._value2member_map_
+                and config.tier_min_orders[tier] > config.tier_min_orders.get(current, -1)):
+            await db.execute(
+                update(Customer)
+                .where(Customer.id == event.customer_id)
+                .values(loyalty_tier=LoyaltyTier(tier))
+                .execution_options(synchronize_session=False)
+            )
+            logger.info(f"Customer {event.customer_id} reached the {tier} tier")
+
+
+# Global loyalty service instance
+loyalty_service = LoyaltyService()
+outbox.register(
+    "loyalty", OrderStatusChanged, loyalty_service.on_order_status_changed,
+    when=lambda event: event.status == OrderStatus.COMPLETED,
+)
@@ -2,16 +2,21 @@ import asyncio
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, or_
 
+from app.core.database import SessionLocal
 from app.models.notification import (
     Notification, MessageTemplate, NotificationPreference,
     MessageStatus, NotificationType
 )
 from app.models.customer import Customer
+from app.models.loyalty import TransactionType
 from app.models.order import Order, OrderStatus
 from app.models.user import User
+from app.services.order_events import OrderCreated, OrderStatusChanged, PointsChanged
+from app.services.outbox import outbox
 from app.services.whatsapp import whatsapp_service
 from app.schemas.notification import (
     NotificationCreate, SendNotificationRequest,
@@ -21,6 +26,25 @@ from app.schemas.notification import (
 logger = logging.getLogger(__name__)
 
 
+# Results the customer's own data decides; retrying would not change them, so the event is acked
+UNDELIVERABLE = frozenset({"Customer not found", "Customer opted out", "No phone number available"})
+
+
+class NotificationNotSent(RuntimeError):
+    """An outbox notification that failed and should be retried"""
+
+
+def _delivered(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Pass a handled result through; raise on a failure so the outbox retries the event"""
+    if result["success"] or result.get("error") in UNDELIVERABLE:
+        return result
+    raise NotificationNotSent(result.get("error") or "Notification not sent")
+
+
+async def _run_inline(fn, *args):
+    return fn(*args)
+
+
 class NotificationService:
     def __init__(self):
         self.whatsapp = whatsapp_service
@@ -28,63 +52,16 @@ class NotificationService:
     async def send_notification(
         self,
         db: Session,
-        request: SendNotificationRequest
+        request: SendNotificationRequest,
+        in_thread: bool = False
     ) -> Dict[str, Any]:
-        """Send a single notification to a customer"""
+        """Send a single notification to a customer. With in_thread, the DB work
+        runs in a worker thread so the event loop only waits on WhatsApp."""
+        run = asyncio.to_thread if in_thread else _run_inline
         try:
-            # Get customer and check preferences
-            customer = db.query(Customer).filter(Customer.id == request.customer_id).first()
-            if not customer:
-                return {"success": False, "error": "Customer not found"}
-
-            preferences = self._get_notification_preferences(db, request.customer_id)
-
-            # Check if customer opted in for this type of notification
-            if not self._should_send_notification(preferences, request.notification_type):
-                logger.info(f"Customer {request.customer_id} opted out of {request.notification_type}")
-                return {"success": False, "error": "Customer opted out"}
-
-            # Get phone number (prefer preference setting, fallback to user phone)
-            recipient_phone = preferences.whatsapp_phone or customer.user.phone
-            if not recipient_phone:
-                return {"success": False, "error": "No phone number available"}
-
-            # Create notification record
-            notification_data = {
-                "customer_id": request.customer_id,
-                "order_id": request.order_id,
-                "notification_type": request.notification_type,
-                "recipient_phone": recipient_phone,
-                "template_name": request.template_name,
-                "template_language": preferences.preferred_language,
-                "template_parameters": request.template_parameters,
-                "scheduled_at": request.scheduled_at,
-                "metadata": {"request_source": "api"}
-            }
-
-            # Handle template vs custom message
-            if request.template_name:
-                template = db.query(MessageTemplate).filter(
-                    MessageTemplate.template_name == request.template_name,
-                    MessageTemplate.is_active == True,
-                    MessageTemplate.is_approved == True
-                ).first()
-
-                if not template:
-                    return {"success": False, "error": "Template not found or not approved"}
-
-                notification_data["template_id"] = template.id
-                notification_data["message_text"] = self._build_message_from_template(
-                    template, request.template_parameters or []
-                )
-            else:
-                notification_data["message_text"] = request.custom_message or "Order update"
-
-            # Create notification in database
-            notification = Notification(**notification_data)
-            db.add(notification)
-            db.commit()
-            db.refresh(notification)
+            notification = await run(self._store_notification, db, request)
+            if isinstance(notification, dict):
+                return notification
 
             # Send immediately or schedule
             if request.scheduled_at and request.scheduled_at > datetime.utcnow():
@@ -95,31 +72,89 @@ class NotificationService:
                     "notification_id": notification.id,
                     "status": "scheduled"
                 }
-            else:
-                # Send now
-                result = await self._send_whatsapp_notification(notification)
-
-                # Update notification with result
-                notification.status = MessageStatus.SENT if result["success"] else MessageStatus.FAILED
-                if result.get("message_id"):
-                    notification.whatsapp_message_id = result["message_id"]
-                if result.get("error"):
-                    notification.error_message = result["error"]
-
-                db.commit()
-
-                return {
-                    "success": result["success"],
-                    "notification_id": notification.id,
-                    "message_id": result.get("message_id"),
-                    "error": result.get("error")
-                }
+            # Send now
+            result = await self._send_whatsapp_notification(notification)
+            return await run(self._record_send_result, db, notification, result)
 
         except Exception as e:
             logger.error(f"Error sending notification: {str(e)}")
-            db.rollback()
+            await run(db.rollback)
             return {"success": False, "error": str(e)}
 
+    def _store_notification(self, db: Session, request: SendNotificationRequest):
+        """Check the customer's preferences and store the notification; an error result if it should not go out"""
+        # Get customer and check preferences
+        customer = db.query(Customer).filter(Customer.id == request.customer_id).first()
+        if not customer:
+            return {"success": False, "error": "Customer not found"}
+
+        preferences = self._get_notification_preferences(db, request.customer_id)
+
+        # Check if customer opted in for this type of notification
+        if not self._should_send_notification(preferences, request.notification_type):
+            logger.info(f"Customer {request.customer_id} opted out of {request.notification_type}")
+            return {"success": False, "error": "Customer opted out"}
+
+        # Get phone number (prefer preference setting, fallback to user phone)
+        recipient_phone = preferences.whatsapp_phone or customer.user.phone
+        if not recipient_phone:
+            return {"success": False, "error": "No phone number available"}
+
+        # Create notification record
+        notification_data = {
+            "customer_id": request.customer_id,
+            "order_id": request.order_id,
+            "notification_type": request.notification_type,
+            "recipient_phone": recipient_phone,
+            "template_name": request.template_name,
+            "template_language": preferences.preferred_language,
+            "template_parameters": request.template_parameters,
+            "scheduled_at": request.scheduled_at,
+            "message_metadata": {"request_source": "api"}
+        }
+
+        # Handle template vs custom message
+        if request.template_name:
+            template = db.query(MessageTemplate).filter(
+                MessageTemplate.template_name == request.template_name,
+                MessageTemplate.is_active == True,
+                MessageTemplate.is_approved == True
+            ).first()
+
+            if not template:
+                return {"success": False, "error": "Template not found or not approved"}
+
+            notification_data["template_id"] = template.id
+            notification_data["message_text"] = self._build_message_from_template(
+                template, request.template_parameters or []
+            )
+        else:
+            notification_data["message_text"] = request.custom_message or "Order update"
+
+        # Create notification in database
+        notification = Notification(**notification_data)
+        db.add(notification)
+        db.commit()
+        db.refresh(notification)
+        return notification
+
+    def _record_send_result(self, db: Session, notification: Notification, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Update the notification with the WhatsApp result"""
+        notification.status = MessageStatus.SENT if result["success"] else MessageStatus.FAILED
+        if result.get("message_id"):
+            notification.whatsapp_message_id = result["message_id"]
+        if result.get("error"):
+            notification.error_message = result["error"]
+
+        db.commit()
+
+        return {
+            "success": result["success"],
+            "notification_id": notification.id,
+            "message_id": result.get("message_id"),
+            "error": result.get("error")
+        }
+
     async def send_bulk_notifications(
         self,
         db: Session,
@@ -224,6 +259,48 @@ class NotificationService:
             logger.error(f"Error sending order notification: {str(e)}")
             return {"success": False, "error": str(e)}
 
+    # Outbox consumers: called by the dispatcher with the event's data, so the
+    # order is not reloaded. They use their own sync session, only ever touched
+    # from worker threads; `db` only acks the event. A failed send raises, so
+    # the row stays queued and is retried with backoff.
+    async def on_order_created(self, event: OrderCreated, db: AsyncSession) -> Dict[str, Any]:
+        return await self._send_order_event(
+            event.customer_id, event.order_id, NotificationType.ORDER_CONFIRMATION, "order_confirmation",
+            lambda name: [name, event.tracking_id, str(event.final_amount)]
+        )
+
+    async def on_order_status_changed(self, event: OrderStatusChanged, db: AsyncSession) -> Dict[str, Any]:
+        return await self._send_order_event(
+            event.customer_id, event.order_id, NotificationType.STATUS_UPDATE, "status_update",
+            lambda name: [name, event.tracking_id, event.status.value]
+        )
+
+    async def on_points_changed(self, event: PointsChanged, db: AsyncSession) -> Dict[str, Any]:
+        with SessionLocal() as session:
+            request = await asyncio.to_thread(self._loyalty_request, session, event.customer_id, event.points)
+            if isinstance(request, dict):
+                return _delivered(request)
+            return _delivered(await self.send_notification(session, request, in_thread=True))
+
+    async def _send_order_event(self, customer_id, order_id, notification_type, template_name, parameters):
+        with SessionLocal() as session:
+            name = await asyncio.to_thread(self._customer_name, session, customer_id)
+            if name is None:
+                return {"success": False, "error": "Customer not found"}
+            request = SendNotificationRequest(
+                customer_id=customer_id,
+                notification_type=notification_type,
+                template_name=template_name,
+                template_parameters=parameters(name),
+                order_id=order_id
+            )
+            return _delivered(await self.send_notification(session, request, in_thread=True))
+
+    def _customer_name(self, db: Session, customer_id: int) -> Optional[str]:
+        return db.query(User.name).join(Customer, Customer.user_id == User.id).filter(
+            Customer.id == customer_id
+        ).scalar()
+
     async def send_loyalty_notification(
         self,
         db: Session,
@@ -232,6 +309,19 @@ class NotificationService:
         new_tier: Optional[str] = None
     ) -> Dict[str, Any]:
         """Send loyalty program related notification"""
+        request = self._loyalty_request(db, customer_id, points_earned, new_tier)
+        if isinstance(request, dict):
+            return request
+        return await self.send_notification(db, request)
+
+    def _loyalty_request(
+        self,
+        db: Session,
+        customer_id: int,
+        points_earned: int,
+        new_tier: Optional[str] = None
+    ):
+        """The loyalty notification for a customer, or an error result"""
         customer = db.query(Customer).filter(Customer.id == customer_id).first()
         if not customer:
             return {"success": False, "error": "Customer not found"}
@@ -244,15 +334,13 @@ class NotificationService:
         else:
             template_name = "loyalty_points_earned"
 
-        request = SendNotificationRequest(
+        return SendNotificationRequest(
             customer_id=customer_id,
             notification_type=NotificationType.LOYALTY_UPDATE,
             template_name=template_name,
             template_parameters=parameters
         )
 
-        return await self.send_notification(db, request)
-
     def get_notification_stats(
         self,
         db: Session,
@@ -423,3 +511,11 @@ class NotificationService:
 
 # Global notification service instance
 notification_service = NotificationService()
+# Only queue notification events while WhatsApp can actually send them
+if notification_service.whatsapp.enabled:
+    outbox.register("notifications", OrderCreated, notification_service.on_order_created)
+    outbox.register("notifications", OrderStatusChanged, notification_service.on_order_status_changed)
+    outbox.register(
+        "notifications", PointsChanged, notification_service.on_points_changed,
+        when=lambda event: event.transaction_type in (TransactionType.EARNED, TransactionType.BONUS),
+    )
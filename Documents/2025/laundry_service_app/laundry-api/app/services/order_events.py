@@ -0,0 +1,150 @@
+import asyncio
+import contextvars
+import enum
+import logging
+import typing
+from collections import defaultdict
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Set, Type
+
+from app.core.metrics import metrics
+from app.models import OrderStatus, TransactionType
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class OrderCreated:
+    order_id: int
+    tracking_id: str
+    customer_id: int
+    final_amount: Decimal
+    at: datetime
+
+
+@dataclass(frozen=True)
+class PointsChanged:
+    """A points transaction was posted for a customer"""
+    customer_id: int
+    transaction_id: int
+    transaction_type: TransactionType
+    points: int
+    order_id: Optional[int]
+
+
+@dataclass(frozen=True)
+class OrderStatusChanged:
+    """A committed status transition, with what consumers need to act on it"""
+    order_id: int
+    tracking_id: str
+    customer_id: int
+    assigned_to_id: Optional[int]
+    status: OrderStatus
+    final_amount: Decimal
+    estimated_completion_time: Optional[datetime]
+    completed_at: Optional[datetime]
+    history_id: int
+    notes: Optional[str]
+    changed_by_id: Optional[int]
+    at: datetime
+
+
+# Stable names for events stored in the outbox
+EVENT_TOPICS: Dict[str, Type] = {
+    "order.created": OrderCreated,
+    "order.status_changed": OrderStatusChanged,
+    "loyalty.points_changed": PointsChanged,
+}
+_TOPIC_OF = {event_type: topic for topic, event_type in EVENT_TOPICS.items()}
+
+
+def topic_of(event: Any) -> str:
+    return _TOPIC_OF[type(event)]
+
+
+def event_to_payload(event: Any) -> Dict[str, Any]:
+    """JSON-safe dict of an event's fields"""
+    payload = {}
+    for name, value in asdict(event).items():
+        if isinstance(value, enum.Enum):
+            value = value.value
+        elif isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, Decimal):
+            value = str(value)
+        payload[name] = value
+    return payload
+
+
+def event_from_payload(topic: str, payload: Dict[str, Any]) -> Any:
+    event_type = EVENT_TOPICS[topic]
+    hints = typing.get_type_hints(event_type)
+    values = {}
+    for field in fields(event_type):
+        value = payload.get(field.name)
+        kind = hints[field.name]
+        if typing.get_origin(kind) is typing.Union:
+            kind = next(arg for arg in typing.get_args(kind) if arg is not type(None))
+        if value is not None and kind is datetime:
+            value = datetime.fromisoformat(value)
+        elif value is not None and kind in (Decimal, OrderStatus, TransactionType):
+            value = kind(value)
+        values[field.name] = value
+    return event_type(**values)
+
+
+class OrderEventBus:
+    """In-process fan-out of order events to subscribed consumers.
+
+    Publishers call publish() after their transaction commits. Plain
+    functions run inline, so keep them cheap (cache writes); coroutine
+    functions run as background tasks. A failing handler is logged and
+    counted, never raised to the publisher. Events are not durable: handlers
+    still pending when the process dies are lost, so consumers that must
+    see every event (notifications, loyalty) read them from the outbox
+    instead.
+    """
+
+    def __init__(self):
+        self._handlers: Dict[Type, List[Callable[[Any], Any]]] = defaultdict(list)
+        self._tasks: Set[asyncio.Task] = set()
+        self._published = metrics.counter("order_events_published_total")
+        self._failed = metrics.counter("order_event_handler_errors_total")
+
+    def subscribe(self, event_type: Type, handler: Callable[[Any], Any]) -> None:
+        self._handlers[event_type].append(handler)
+
+    def publish(self, event: Any) -> None:
+        self._published.inc()
+        for handler in self._handlers[type(event)]:
+            if asyncio.iscoroutinefunction(handler):
+                # A fresh context keeps the handler's queries out of the request's profile
+                task = asyncio.get_running_loop().create_task(
+                    self._run(handler, event), context=contextvars.Context()
+                )
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            else:
+                try:
+                    handler(event)
+                except Exception:
+                    self._failed.inc()
+                    logger.exception(f"Order event handler {handler.__qualname__} failed")
+
+    async def drain(self) -> None:
+        """Wait for background handlers, e.g. before shutdown"""
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _run(self, handler, event) -> None:
+        try:
+            await handler(event)
+        except Exception:
+            self._failed.inc()
+            logger.exception(f"Order event handler {handler.__qualname__} failed")
+
+
+# Global order event bus; consumers subscribe when their module is imported
+order_events = OrderEventBus()
@@ -0,0 +1,358 @@
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Optional, Tuple
+
+from fastapi import Request
+from sqlalchemy import insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.bulk import (
+    copy_rows, csv_records, rejected, request_format, request_items, stream_bulk_rows, stream_lines, summarize,
+)
+from app.core.config import settings
+from app.models import Customer, Order, OrderItem, OrderStatus, OrderStatusHistory, ServiceType, User, UserRole, Worker
+from app.schemas.bulk import BulkResult, BulkRowResult
+from app.schemas.order import OrderImport
+from app.services.assignment import OPEN_STATUSES, assignment_scheduler
+from app.services.eta import eta_engine, work_by_category
+from app.services.order_events import OrderStatusChanged
+from app.services.outbox import outbox
+from app.services.pricing import ZERO, get_pricing_config, line_total, price_order, to_money
+from app.services.search import search_index
+
+logger = logging.getLogger(__name__)
+
+# CSV columns that describe the order; the rest of a line describes one item
+ORDER_COLUMNS = frozenset(OrderImport.model_fields) - {"items"}
+
+# Imported completed orders count towards loyalty like live ones, but
+# customers are not messaged about orders that are already history
+IMPORT_EVENT_CONSUMERS = ("loyalty",)
+
+_ITEM_COLUMNS = ("order_id", "service_type_id", "quantity", "price_per_item", "total_price")
+
+# Core inserts: ORM bulk inserts split rows into one statement per run of
+# rows that leave the same columns None
+_orders = Order.__table__
+_history = OrderStatusHistory.__table__
+
+
+class _Service(NamedTuple):
+    id: int
+    price: Decimal
+    category: Any
+    duration: Optional[int]
+
+
+def _value(value):
+    return getattr(value, "value", value)
+
+
+def _utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+async def group_order_lines(
+    records: AsyncIterator[Tuple[int, Dict[str, str]]],
+) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+    """Fold CSV item lines into orders.
+
+    Consecutive lines with the same order_ref make one order whose fields
+    come from its first line; a line without order_ref is an order of one
+    item. An order's index is the index of its first line.
+    """
+    current: Optional[Tuple[int, Dict[str, Any]]] = None
+    current_ref = None
+    async for index, record in records:
+        ref = record.pop("order_ref", None)
+        item = {column: value for column, value in record.items() if column not in ORDER_COLUMNS}
+        if current is not None and ref is not None and ref == current_ref:
+            current[1]["items"].append(item)
+            continue
+        if current is not None:
+            yield current
+        order = {column: value for column, value in record.items() if column in ORDER_COLUMNS}
+        order["items"] = [item]
+        current, current_ref = (index, order), ref
+    if current is not None:
+        yield current
+
+
+def request_orders(request: Request) -> AsyncIterator[Tuple[int, Any]]:
+    """(index, raw order) from a CSV, NDJSON or JSON array body, streamed where the format allows"""
+    if request_format(request) == "csv":
+        return group_order_lines(csv_records(stream_lines(request.stream())))
+    return request_items(request)
+
+
+async def _file_chunks(path: str, size: int = 1 << 16) -> AsyncIterator[bytes]:
+    with open(path, "rb") as file:
+        while chunk := file.read(size):
+            yield chunk
+
+
+async def file_orders(path: str) -> AsyncIterator[Tuple[int, Any]]:
+    """(index, raw order) from a .csv, .ndjson/.jsonl or .json (array) file"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        async for order in group_order_lines(csv_records(stream_lines(_file_chunks(path)))):
+            yield order
+    elif extension in (".ndjson", ".jsonl"):
+        index = 0
+        async for line in stream_lines(_file_chunks(path)):
+            yield index, line
+            index += 1
+    else:
+        with open(path, "rb") as file:
+            rows = json.load(file)
+        if not isinstance(rows, list):
+            raise ValueError(f"{path}: expected a JSON array of orders")
+        for index, row in enumerate(rows):
+            yield index, row
+
+
+class OrderImporter:
+    """Loads orders captured offline (paper, spreadsheets) in bulk.
+
+    Rows are validated in chunks of bulk_batch_size with the OrderImport
+    schema and priced like live intake, from a service price map loaded once
+    per import. Customers and staff a chunk refers to are looked up in one
+    query each, then the chunk is written with one multi-row INSERT per table
+    (order items through COPY on PostgreSQL) and committed on its own: a bad
+    row is reported by index and a failing chunk rejects only its own rows.
+    Open orders get an ETA and, unless assigned, a worker; completed ones
+    are counted towards the customer's loyalty totals through the outbox.
+    """
+
+    def __init__(self, db: AsyncSession, captured_by_id: Optional[int]):
+        self.db = db
+        self.captured_by_id = captured_by_id
+        self._by_id: Dict[int, _Service] = {}
+        self._by_name: Dict[str, _Service] = {}
+        self._config = None
+
+    async def run(self, items: AsyncIterator[Tuple[int, Any]]) -> BulkResult:
+        services = await self.db.execute(
+            select(ServiceType.id, ServiceType.name, ServiceType.base_price, ServiceType.category,
+                   ServiceType.estimated_duration_hours)
+            .where(ServiceType.is_active == True)
+        )
+        for service_id, name, price, category, duration in services:
+            service = _Service(service_id, price, category, duration)
+            self._by_id[service_id] = service
+            self._by_name[name.strip().lower()] = service
+        self._config = await get_pricing_config(self.db)
+
+        results: List[BulkRowResult] = []
+        async for rows, rejections in stream_bulk_rows(
+            items, OrderImport, settings.bulk_batch_size, settings.order_import_max_rows
+        ):
+            results += rejections
+            if rows:
+                results += await self._import_chunk(rows)
+        return summarize(results)
+
+    async def _import_chunk(self, rows: List[Tuple[int, OrderImport]]) -> List[BulkRowResult]:
+        customers = await self._customers(rows)
+        staff = await self._staff(rows)
+        prepared = []
+        try:
+            results = self._prepare(rows, customers, staff, prepared)
+        except BaseException:
+            self._unreserve(prepared)
+            raise
+
+        if not prepared:
+            return results
+        try:
+            order_ids = await self._write(prepared)
+            await self.db.commit()
+        except Exception as e:
+            await self.db.rollback()
+            self._unreserve(prepared)
+            logger.warning(f"Order import batch of {len(prepared)} failed: {e}")
+            results += [rejected(index, f"Batch failed: {e}") for index, *_ in prepared]
+            return results
+
+        for index, order, _, work, hours, reserved in prepared:
+            order_id = order_ids[order["tracking_id"]]
+            results.append(BulkRowResult(index=index, status="created", id=order_id))
+            search_index.add_order(order_id, order["tracking_id"], order["notes"])
+            if work is not None:
+                eta_engine.add(order_id, order["tracking_id"], work, order["estimated_completion_time"],
+                               arrival=order["created_at"].timestamp())
+                if order["assigned_to_id"] is not None:
+                    assignment_scheduler.add(order_id, order["assigned_to_id"], hours, reserved=reserved)
+        return results
+
+    def _prepare(self, rows, customers, staff, prepared: list) -> List[BulkRowResult]:
+        """Price the chunk's valid rows into `prepared`, reserving workers for open ones; returns the rejections"""
+        results: List[BulkRowResult] = []
+        now = datetime.now(timezone.utc)
+        ahead: Dict[str, float] = {}  # hours quoted to earlier open orders of this chunk, per category
+        for index, row in rows:
+            customer = (
+                customers.get(("id", row.customer_id))
+                or customers.get(("email", (row.customer_email or "").lower()))
+                or customers.get(("phone", row.customer_phone))
+            )
+            if customer is None:
+                results.append(rejected(index, "Customer not found"))
+                continue
+            error = self._check(row, staff)
+            if error:
+                results.append(rejected(index, error))
+                continue
+
+            lines = []
+            for item in row.items:
+                if item.service_type_id is not None:
+                    service = self._by_id.get(item.service_type_id)
+                else:
+                    service = self._by_name.get((item.service or "").strip().lower())
+                if service is None:
+                    error = f"Unknown or inactive service type: {item.service_type_id or item.service}"
+                    break
+                price = service.price if item.price_per_item is None else item.price_per_item
+                price_per_item, total_price = line_total(item.quantity, price)
+                lines.append((service, item.quantity, price_per_item, total_price))
+            if error:
+                results.append(rejected(index, error))
+                continue
+
+            status = OrderStatus(row.status or OrderStatus.PENDING.value)
+            created_at = _utc(row.created_at) if row.created_at else now
+            completed_at = None
+            if status == OrderStatus.COMPLETED:
+                completed_at = _utc(row.completed_at) if row.completed_at else created_at
+            totals = price_order(
+                (line[3] for line in lines),
+                self._config.discount_percentage(_value(customer.loyalty_tier), _value(customer.subscription_plan)),
+                to_money(row.discount_amount or ZERO),
+            )
+            order = {
+                "tracking_id": Order.generate_tracking_id(),
+                "customer_id": customer.id,
+                "status": status,
+                "total_amount": totals.total_amount,
+                "discount_amount": totals.discount_amount,
+                "final_amount": totals.final_amount,
+                "notes": row.notes,
+                "captured_by_id": row.captured_by_id or self.captured_by_id,
+                "assigned_to_id": row.assigned_to_id,
+                "estimated_completion_time": None,
+                "created_at": created_at,
+                "completed_at": completed_at,
+                "actual_completion_time": completed_at,
+            }
+            work, hours, reserved = None, 0.0, False
+            if status in OPEN_STATUSES:
+                work = work_by_category((service.category, quantity, service.duration)
+                                        for service, quantity, _, _ in lines)
+                hours = sum(hours for hours, _ in work.values())
+                order["estimated_completion_time"] = eta_engine.quote(work, ahead=ahead)
+                for category, (category_hours, _) in work.items():
+                    ahead[category] = ahead.get(category, 0.0) + category_hours
+                if order["assigned_to_id"] is None and settings.auto_assign_orders:
+                    order["assigned_to_id"] = assignment_scheduler.assign(hours)
+                    reserved = order["assigned_to_id"] is not None
+            prepared.append((index, order, lines, work, hours, reserved))
+        return results
+
+    @staticmethod
+    def _unreserve(prepared) -> None:
+        """Give back the workers reserved for orders that were not committed"""
+        for _, order, _, _, hours, reserved in prepared:
+            if reserved:
+                assignment_scheduler.unreserve(order["assigned_to_id"], hours)
+
+    def _check(self, row: OrderImport, staff: Tuple[set, set]) -> Optional[str]:
+        if len(row.items) > settings.order_max_items:
+            return f"An order may have at most {settings.order_max_items} items"
+        workers, captors = staff
+        if row.assigned_to_id is not None and row.assigned_to_id not in workers:
+            return f"assigned_to_id: user {row.assigned_to_id} is not an active worker"
+        if row.captured_by_id is not None and row.captured_by_id not in captors:
+            return f"captured_by_id: user {row.captured_by_id} is not active staff"
+        if row.completed_at is not None and row.status != OrderStatus.COMPLETED.value:
+            return "completed_at is only allowed on completed orders"
+        return None
+
+    async def _write(self, prepared) -> Dict[str, int]:
+        """Orders, their items and one status row each; returns tracking id -> order id"""
+        # No sort_by_parameter_order: SQLite would fall back to one INSERT per row
+        order_ids = dict((await self.db.execute(
+            insert(_orders).returning(_orders.c.tracking_id, _orders.c.id),
+            [order for _, order, *_ in prepared],
+        )).all())
+        await copy_rows(self.db, OrderItem.__table__, _ITEM_COLUMNS, [
+            (order_ids[order["tracking_id"]], service.id, quantity, price_per_item, total_price)
+            for _, order, lines, *_ in prepared
+            for service, quantity, price_per_item, total_price in lines
+        ])
+        history_ids = dict((await self.db.execute(
+            insert(_history).returning(_history.c.order_id, _history.c.id),
+            [
+                {"order_id": order_ids[order["tracking_id"]], "status": order["status"],
+                 "updated_by_id": order["captured_by_id"], "notes": "Imported",
+                 "created_at": order["completed_at"] or order["created_at"]}
+                for _, order, *_ in prepared
+            ],
+        )).all())
+        await outbox.add_async(self.db, [
+            OrderStatusChanged(
+                order_id=order_ids[order["tracking_id"]], tracking_id=order["tracking_id"],
+                customer_id=order["customer_id"], assigned_to_id=order["assigned_to_id"],
+                status=order["status"], final_amount=order["final_amount"],
+                estimated_completion_time=None, completed_at=order["completed_at"],
+                history_id=history_ids[order_ids[order["tracking_id"]]], notes="Imported",
+                changed_by_id=order["captured_by_id"], at=order["completed_at"],
+            )
+            for _, order, *_ in prepared if order["status"] == OrderStatus.COMPLETED
+        ], only=IMPORT_EVENT_CONSUMERS)
+        return order_ids
+
+    async def _customers(self, rows: List[Tuple[int, OrderImport]]) -> Dict[Tuple[str, Any], Any]:
+        """Customers the chunk refers to, keyed by ("id", id), ("email", email) and ("phone", phone)"""
+        ids = {row.customer_id for _, row in rows if row.customer_id is not None}
+        emails = {row.customer_email for _, row in rows if row.customer_email}
+        phones = {row.customer_phone for _, row in rows if row.customer_phone}
+        conditions = []
+        if ids:
+            conditions.append(Customer.id.in_(ids))
+        if emails:
+            conditions.append(User.email.in_(emails | {email.lower() for email in emails}))
+        if phones:
+            conditions.append(User.phone.in_(phones))
+        if not conditions:
+            return {}
+        found = await self.db.execute(
+            select(Customer.id, Customer.loyalty_tier, Customer.subscription_plan, User.email, User.phone)
+            .join(User, User.id == Customer.user_id)
+            .where(or_(*conditions))
+        )
+        customers = {}
+        for customer in found:
+            customers["id", customer.id] = customer
+            customers["email", customer.email.lower()] = customer
+            if customer.phone:
+                customers.setdefault(("phone", customer.phone), customer)
+        return customers
+
+    async def _staff(self, rows: List[Tuple[int, OrderImport]]) -> Tuple[set, set]:
+        """(active workers, active workers and admins) among the users the chunk names"""
+        user_ids = {
+            user_id for _, row in rows for user_id in (row.assigned_to_id, row.captured_by_id) if user_id is not None
+        }
+        if not user_ids:
+            return set(), set()
+        found = (await self.db.execute(
+            select(User.id, User.role, Worker.is_active)
+            .outerjoin(Worker, Worker.user_id == User.id)
+            .where(User.id.in_(user_ids), User.is_active == True, User.role.in_((UserRole.WORKER, UserRole.ADMIN)))
+        )).all()
+        workers = {user_id for user_id, role, active in found if role == UserRole.WORKER and active}
+        return workers, {user_id for user_id, _, _ in found}
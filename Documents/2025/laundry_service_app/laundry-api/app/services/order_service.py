@@ -0,0 +1,289 @@
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.auth import Principal
+from app.core.config import settings
+from app.models import Customer, Order, OrderItem, OrderStatus, OrderStatusHistory, ServiceType, UserRole
+from app.schemas.order import OrderCreate
+from app.services.assignment import assignment_scheduler
+from app.services.eta import Work, eta_engine, work_by_category
+from app.services.order_events import OrderCreated, OrderStatusChanged
+from app.services.outbox import outbox
+from app.services.pricing import ZERO, get_pricing_config, line_total, price_order, to_money
+from app.services.search import search_index
+
+logger = logging.getLogger(__name__)
+
+# Fields only staff may set; a customer ordering for themselves gets list prices
+STAFF_ONLY_FIELDS = ("discount_amount", "captured_by_id", "assigned_to_id")
+
+# Allowed status moves; completed and cancelled are final
+STATUS_TRANSITIONS = {
+    OrderStatus.PENDING: (OrderStatus.IN_PROGRESS, OrderStatus.CANCELLED),
+    OrderStatus.IN_PROGRESS: (OrderStatus.READY, OrderStatus.CANCELLED),
+    OrderStatus.READY: (OrderStatus.COMPLETED, OrderStatus.CANCELLED),
+    OrderStatus.COMPLETED: (),
+    OrderStatus.CANCELLED: (),
+}
+
+# Order columns returned by a transition, shaped like OrderOut without items
+_ORDER_COLUMNS = (
+    Order.id, Order.tracking_id, Order.customer_id, Order.status, Order.total_amount,
+    Order.discount_amount, Order.final_amount, Order.notes, Order.captured_by_id,
+    Order.assigned_to_id, Order.estimated_completion_time, Order.completed_at,
+)
+
+
+def _enum_value(value):
+    return getattr(value, "value", value)
+
+
+@dataclass(frozen=True)
+class OrderIntake:
+    """In-memory bookkeeping for a new order, applied only once its transaction commits"""
+    order_id: int
+    tracking_id: str
+    notes: Optional[str]
+    work: Dict[str, Work]
+    eta: Optional[datetime]
+    assigned_to_id: Optional[int]
+    hours: float
+    reserved: bool
+
+    def committed(self) -> None:
+        if self.assigned_to_id is not None:
+            assignment_scheduler.add(self.order_id, self.assigned_to_id, self.hours, reserved=self.reserved)
+        eta_engine.add(self.order_id, self.tracking_id, self.work, self.eta)
+        search_index.add_order(self.order_id, self.tracking_id, self.notes)
+
+    def rolled_back(self) -> None:
+        if self.reserved:
+            assignment_scheduler.unreserve(self.assigned_to_id, self.hours)
+
+
+class OrderService:
+    async def create_order(
+        self, db: AsyncSession, payload: OrderCreate, principal: Principal
+    ) -> Tuple[Dict[str, Any], OrderIntake]:
+        """Price and insert an order, its items and its first status row.
+
+        Runs the same five statements whatever the number of items (plus one
+        when the discount config is not cached, and one for the outbox when
+        anything consumes OrderCreated): the customer, every referenced
+        service price in one SELECT, then the order, all items in one
+        multi-row INSERT, and the status history row. Orders without an
+        assignee go to the least-loaded worker, and every order gets a
+        queue-aware ETA. The caller commits, then calls the intake's
+        committed(), or rolled_back() if the commit fails.
+        Returns the created order shaped like OrderOut, and its intake.
+        """
+        if len(payload.items) > settings.order_max_items:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"An order may have at most {settings.order_max_items} items"
+            )
+        if payload.status not in (None, OrderStatus.PENDING.value):
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="New orders start as pending"
+            )
+
+        is_customer = principal.role == UserRole.CUSTOMER
+        if is_customer:
+            overridden = [field for field in STAFF_ONLY_FIELDS if getattr(payload, field)]
+            if any(item.price_per_item is not None for item in payload.items):
+                overridden.append("items.price_per_item")
+            if overridden:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail=f"Only staff can set {', '.join(overridden)}"
+                )
+
+        customer = (await db.execute(
+            select(Customer.user_id, Customer.loyalty_tier, Customer.subscription_plan)
+            .where(Customer.id == payload.customer_id)
+        )).first()
+        if customer is None or (is_customer and customer.user_id != principal.id):
+            raise HTTPException(status_code=404, detail="Customer not found")
+
+        service_ids = {item.service_type_id for item in payload.items}
+        services = (await db.execute(
+            select(ServiceType.id, ServiceType.base_price, ServiceType.category, ServiceType.estimated_duration_hours)
+            .where(ServiceType.id.in_(service_ids), ServiceType.is_active == True)
+        )).all()
+        services = {service.id: service for service in services}
+        prices = {service_id: service.base_price for service_id, service in services.items()}
+        missing = sorted(service_ids - prices.keys())
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Unknown or inactive service types: {missing}"
+            )
+
+        config = await get_pricing_config(db)
+        items = []
+        for item in payload.items:
+            price = prices[item.service_type_id] if item.price_per_item is None else item.price_per_item
+            price_per_item, total_price = line_total(item.quantity, price)
+            items.append({
+                "service_type_id": item.service_type_id,
+                "quantity": item.quantity,
+                "price_per_item": price_per_item,
+                "total_price": total_price,
+            })
+        totals = price_order(
+            (item["total_price"] for item in items),
+            config.discount_percentage(_enum_value(customer.loyalty_tier), _enum_value(customer.subscription_plan)),
+            to_money(payload.discount_amount or ZERO),
+        )
+
+        work = work_by_category(
+            (services[item.service_type_id].category, item.quantity,
+             services[item.service_type_id].estimated_duration_hours)
+            for item in payload.items
+        )
+        hours = sum(hours for hours, _ in work.values())
+        assigned_to_id, reserved = payload.assigned_to_id, False
+        if assigned_to_id is None and settings.auto_assign_orders:
+            assigned_to_id = assignment_scheduler.assign(hours)
+            reserved = assigned_to_id is not None
+        try:
+            order = await self._insert_order(db, payload, principal, items, totals, work, assigned_to_id)
+        except BaseException:
+            if reserved:
+                assignment_scheduler.unreserve(assigned_to_id, hours)
+            raise
+        return order, OrderIntake(
+            order_id=order["id"], tracking_id=order["tracking_id"], notes=order["notes"], work=work,
+            eta=order["estimated_completion_time"], assigned_to_id=assigned_to_id, hours=hours, reserved=reserved,
+        )
+
+    async def _insert_order(self, db, payload, principal, items, totals, work, assigned_to_id) -> Dict[str, Any]:
+        """Insert the order, its items, its first status row and its OrderCreated event"""
+        is_customer = principal.role == UserRole.CUSTOMER
+        order = {
+            "tracking_id": Order.generate_tracking_id(),
+            "customer_id": payload.customer_id,
+            "status": OrderStatus.PENDING,
+            "total_amount": totals.total_amount,
+            "discount_amount": totals.discount_amount,
+            "final_amount": totals.final_amount,
+            "notes": payload.notes,
+            "captured_by_id": payload.captured_by_id or (None if is_customer else principal.id),
+            "assigned_to_id": assigned_to_id,
+            "estimated_completion_time": eta_engine.quote(work),
+        }
+        order["id"] = await db.scalar(insert(Order).values(**order).returning(Order.id))
+        for item in items:
+            item["order_id"] = order["id"]
+        # No sort_by_parameter_order: SQLite would fall back to one INSERT per
+        # row. The rows come back whole instead and are put in id order.
+        rows = await db.execute(
+            insert(OrderItem).returning(
+                OrderItem.id, OrderItem.service_type_id, OrderItem.quantity,
+                OrderItem.price_per_item, OrderItem.total_price,
+            ),
+            items,
+        )
+        items = sorted((row._asdict() for row in rows), key=lambda item: item["id"])
+        await db.execute(insert(OrderStatusHistory).values(
+            order_id=order["id"], status=OrderStatus.PENDING, updated_by_id=principal.id, notes="Order created"
+        ))
+        await outbox.add_async(db, [OrderCreated(
+            order_id=order["id"], tracking_id=order["tracking_id"], customer_id=order["customer_id"],
+            final_amount=order["final_amount"], at=datetime.now(timezone.utc),
+        )])
+
+        order["status"] = OrderStatus.PENDING.value
+        order["items"] = items
+        return order
+
+    async def change_status(
+        self,
+        db: AsyncSession,
+        order_ids: Sequence[int],
+        target: OrderStatus,
+        notes: Optional[str],
+        changed_by_id: Optional[int],
+    ) -> Tuple[List[Dict[str, Any]], List[OrderStatusChanged], Dict[int, HTTPException]]:
+        """Move orders to `target`, recording one history row each.
+
+        Two statements for any number of orders: an UPDATE ... RETURNING
+        that only matches orders whose current status may move to `target`
+        (so concurrent transitions cannot both win), and one multi-row
+        history INSERT, plus one outbox INSERT for the durable consumers.
+        Orders left out are looked up once more to explain why. The caller
+        commits, then publishes the returned events in-process.
+        Returns (changed orders shaped like OrderOut without items, events,
+        errors by order id).
+        """
+        sources = [source for source, targets in STATUS_TRANSITIONS.items() if target in targets]
+        now = datetime.now(timezone.utc)
+        values = {"status": target, "updated_at": now}
+        if target == OrderStatus.COMPLETED:
+            values.update(completed_at=now, actual_completion_time=now)
+
+        order_ids = list(dict.fromkeys(order_ids))
+        changed = []
+        if sources:
+            rows = await db.execute(
+                update(Order)
+                .where(Order.id.in_(order_ids), Order.status.in_(sources))
+                .values(**values)
+                .returning(*_ORDER_COLUMNS)
+                .execution_options(synchronize_session=False)
+            )
+            changed = sorted((row._asdict() for row in rows), key=lambda order: order["id"])
+
+        events = []
+        if changed:
+            history = await db.execute(
+                insert(OrderStatusHistory).returning(OrderStatusHistory.id, OrderStatusHistory.order_id),
+                [
+                    {"order_id": order["id"], "status": target, "updated_by_id": changed_by_id,
+                     "notes": notes, "created_at": now}
+                    for order in changed
+                ],
+            )
+            history_ids = {row.order_id: row.id for row in history}
+            for order in changed:
+                order["status"] = target.value
+                events.append(OrderStatusChanged(
+                    order_id=order["id"],
+                    tracking_id=order["tracking_id"],
+                    customer_id=order["customer_id"],
+                    assigned_to_id=order["assigned_to_id"],
+                    status=target,
+                    final_amount=order["final_amount"],
+                    estimated_completion_time=order["estimated_completion_time"],
+                    completed_at=order["completed_at"],
+                    history_id=history_ids[order["id"]],
+                    notes=notes,
+                    changed_by_id=changed_by_id,
+                    at=now,
+                ))
+            await outbox.add_async(db, events)
+
+        errors = {}
+        missed = set(order_ids) - {order["id"] for order in changed}
+        if missed:
+            current = dict((await db.execute(select(Order.id, Order.status).where(Order.id.in_(missed)))).all())
+            for order_id in sorted(missed):
+                if order_id not in current:
+                    errors[order_id] = HTTPException(status_code=404, detail="Order not found")
+                else:
+                    errors[order_id] = HTTPException(
+                        status_code=status.HTTP_409_CONFLICT,
+                        detail=f"Cannot move an order from {current[order_id].value} to {target.value}"
+                    )
+        return changed, events, errors
+
+
+# Global order service instance
+order_service = OrderService()
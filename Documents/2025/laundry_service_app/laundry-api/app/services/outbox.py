@@ -0,0 +1,184 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Collection, Dict, Iterable, List, Optional, Tuple, Type
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import metrics
+from app.models import OutboxEvent
+from app.services.order_events import event_from_payload, event_to_payload, topic_of
+
+logger = logging.getLogger(__name__)
+
+# handler(event, db): db is the transaction that also acknowledges the event
+OutboxHandler = Callable[[Any, AsyncSession], Awaitable[None]]
+
+
+class Outbox:
+    """Transactional outbox for events that must reach their consumers.
+
+    Writers add one row per subscribed consumer in the same transaction as
+    the change, so an event exists if and only if the change committed. The
+    dispatcher claims due rows in one UPDATE ... WHERE id IN (SELECT ...
+    FOR UPDATE SKIP LOCKED) ... RETURNING, leasing them for lease_seconds so
+    any number of dispatchers can run side by side. Each row is handled in
+    its own transaction, which also deletes the row: a handler's DB writes
+    commit exactly once, while external effects (WhatsApp) are at least
+    once. Failures are retried with exponential backoff up to max_attempts;
+    rows past that stay in the table with their last error.
+    """
+
+    def __init__(
+        self,
+        batch_size: int,
+        concurrency: int,
+        poll_interval: float,
+        lease_seconds: float,
+        max_attempts: int,
+        session_factory=AsyncSessionLocal,
+    ):
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.session_factory = session_factory
+        self._consumers: Dict[Type, Dict[str, OutboxHandler]] = {}
+        self._filters: Dict[Tuple[Type, str], Callable[[Any], bool]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def register(
+        self, consumer: str, event_type: Type, handler: OutboxHandler, when: Optional[Callable[[Any], bool]] = None
+    ) -> None:
+        """Deliver events of event_type to handler; `when` skips queuing events it would ignore"""
+        self._consumers.setdefault(event_type, {})[consumer] = handler
+        if when is not None:
+            self._filters[event_type, consumer] = when
+
+    def rows(self, events: Iterable[Any], only: Optional[Collection[str]] = None) -> List[Dict[str, Any]]:
+        now = datetime.now(timezone.utc)
+        rows = []
+        for event in events:
+            consumers = [
+                consumer for consumer in self._consumers.get(type(event), ())
+                if (only is None or consumer in only) and self._filters.get((type(event), consumer), bool)(event)
+            ]
+            if not consumers:
+                continue
+            topic, payload = topic_of(event), event_to_payload(event)
+            rows.extend(
+                {"consumer": consumer, "topic": topic, "payload": payload, "attempts": 0, "available_at": now}
+                for consumer in consumers
+            )
+        return rows
+
+    def add(self, db: Session, events: Iterable[Any]) -> None:
+        """Queue events in the caller's (sync) transaction"""
+        rows = self.rows(events)
+        if rows:
+            db.execute(insert(OutboxEvent), rows)
+
+    async def add_async(self, db: AsyncSession, events: Iterable[Any], only: Optional[Collection[str]] = None) -> None:
+        """Queue events in the caller's transaction; one multi-row INSERT. `only` limits the consumers"""
+        rows = self.rows(events, only)
+        if rows:
+            await db.execute(insert(OutboxEvent), rows)
+
+    async def dispatch_batch(self) -> int:
+        """Claim and deliver up to batch_size due events; returns how many were claimed"""
+        now = datetime.now(timezone.utc)
+        due = (
+            select(OutboxEvent.id)
+            .where(OutboxEvent.available_at <= now, OutboxEvent.attempts < self.max_attempts)
+            .order_by(OutboxEvent.available_at, OutboxEvent.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        async with self.session_factory() as db:
+            claimed = (await db.execute(
+                update(OutboxEvent)
+                .where(OutboxEvent.id.in_(due))
+                .values(attempts=OutboxEvent.attempts + 1, available_at=now + timedelta(seconds=self.lease_seconds))
+                .returning(OutboxEvent.id, OutboxEvent.consumer, OutboxEvent.topic,
+                           OutboxEvent.payload, OutboxEvent.attempts)
+                .execution_options(synchronize_session=False)
+            )).all()
+            await db.commit()
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def deliver(row):
+            async with semaphore:
+                await self._deliver(row)
+
+        await asyncio.gather(*(deliver(row) for row in claimed))
+        return len(claimed)
+
+    async def _deliver(self, row) -> None:
+        # The attempts match guards against a lease that ran out and was re-claimed
+        mine = (OutboxEvent.id == row.id, OutboxEvent.attempts == row.attempts)
+        handler = None
+        try:
+            event = event_from_payload(row.topic, row.payload)
+            handler = self._consumers.get(type(event), {}).get(row.consumer)
+            async with self.session_factory() as db:
+                if handler is not None:
+                    await handler(event, db)
+                acked = (await db.execute(delete(OutboxEvent).where(*mine))).rowcount
+                if not acked:
+                    # Another dispatcher owns it now; undo our writes and let it deliver
+                    await db.rollback()
+                    metrics.counter("outbox_lease_lost_total", consumer=row.consumer).inc()
+                    return
+                await db.commit()
+            metrics.counter("outbox_delivered_total", consumer=row.consumer).inc()
+            if handler is None:
+                logger.warning(f"Dropped outbox event {row.id}: no consumer {row.consumer} for {row.topic}")
+        except Exception as e:
+            metrics.counter("outbox_failed_total", consumer=row.consumer).inc()
+            retry_at = datetime.now(timezone.utc) + timedelta(seconds=min(2 ** row.attempts, 300))
+            log = logger.error if row.attempts >= self.max_attempts else logger.warning
+            log(f"Outbox event {row.id} ({row.topic} -> {row.consumer}) failed, attempt {row.attempts}: {e}")
+            async with self.session_factory() as db:
+                await db.execute(
+                    update(OutboxEvent).where(*mine).values(last_error=str(e)[:2000], available_at=retry_at)
+                )
+                await db.commit()
+
+    async def run(self) -> None:
+        """Dispatch until cancelled; back-to-back while batches come back full"""
+        while True:
+            try:
+                claimed = await self.dispatch_batch()
+            except Exception as e:
+                logger.warning(f"Outbox dispatch failed: {e}")
+                claimed = 0
+            if claimed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Global outbox; consumers register when their module is imported
+outbox = Outbox(
+    batch_size=settings.outbox_batch_size,
+    concurrency=settings.outbox_concurrency,
+    poll_interval=settings.outbox_poll_interval_seconds,
+    lease_seconds=settings.outbox_lease_seconds,
+    max_attempts=settings.outbox_max_attempts,
+)
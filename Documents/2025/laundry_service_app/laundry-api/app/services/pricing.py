@@ -0,0 +1,102 @@
+from dataclasses import dataclass
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.auth import invalidation_bus
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models import LoyaltyTierConfig, SubscriptionPlanConfig
+
+CENT = Decimal("0.01")
+ZERO = Decimal("0.00")
+
+
+def to_money(value) -> Decimal:
+    """Round to whole cents the way the Numeric(10, 2) columns store it"""
+    return Decimal(str(value)).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+@dataclass(frozen=True)
+class PricingConfig:
+    """Discount percentages per loyalty tier and subscription plan name,
+    and the completed-order count each tier starts at"""
+    tier_discounts: Dict[str, Decimal]
+    plan_discounts: Dict[str, Decimal]
+    tier_min_orders: Dict[str, int]
+
+    def discount_percentage(self, tier: Optional[str], plan: Optional[str]) -> Decimal:
+        return self.tier_discounts.get(tier, ZERO) + self.plan_discounts.get(plan, ZERO)
+
+    def tier_for(self, total_orders: int) -> Optional[str]:
+        """Highest active tier reached with this many orders"""
+        reached = [(min_orders, tier) for tier, min_orders in self.tier_min_orders.items() if total_orders >= min_orders]
+        return max(reached)[1] if reached else None
+
+
+@dataclass(frozen=True)
+class OrderTotals:
+    total_amount: Decimal
+    discount_amount: Decimal
+    final_amount: Decimal
+
+
+# Tier and plan discounts change rarely but are read by every order; the
+# loyalty endpoints invalidate this whenever a tier or plan is written
+pricing_config_cache = TTLCache(maxsize=1, ttl=settings.pricing_config_cache_ttl_seconds, name="pricing_config")
+invalidation_bus.register("pricing_config", lambda key: pricing_config_cache.clear())
+
+
+def invalidate_pricing_config() -> None:
+    """Drop the cached discounts here and, if enabled, on every other worker"""
+    pricing_config_cache.clear()
+    invalidation_bus.publish("pricing_config", "all")
+
+
+async def get_pricing_config(db: AsyncSession) -> PricingConfig:
+    """Active tier and plan discounts, loaded in one statement on a cache miss"""
+    config = pricing_config_cache.get("config")
+    if config is not None:
+        return config
+
+    generation = pricing_config_cache.generation_of("config")
+    rows = await db.execute(union_all(
+        select(literal("tier").label("kind"), LoyaltyTierConfig.tier_name.label("name"),
+               LoyaltyTierConfig.discount_percentage.label("discount"),
+               LoyaltyTierConfig.min_orders.label("min_orders"))
+        .where(LoyaltyTierConfig.is_active == True),
+        select(literal("plan"), SubscriptionPlanConfig.plan_name, SubscriptionPlanConfig.discount_percentage,
+               literal(0))
+        .where(SubscriptionPlanConfig.is_active == True),
+    ))
+    discounts = {"tier": {}, "plan": {}}
+    tier_min_orders = {}
+    for kind, name, discount, min_orders in rows:
+        discounts[kind][name.lower()] = Decimal(str(discount))
+        if kind == "tier":
+            tier_min_orders[name.lower()] = min_orders
+    config = PricingConfig(
+        tier_discounts=discounts["tier"], plan_discounts=discounts["plan"], tier_min_orders=tier_min_orders
+    )
+    pricing_config_cache.set("config", config, generation=generation)
+    return config
+
+
+def price_order(
+    line_totals: Iterable[Decimal],
+    discount_percentage: Decimal,
+    extra_discount: Decimal = ZERO,
+) -> OrderTotals:
+    """Apply the tier + plan percentage and any manual discount, never below zero"""
+    total = sum(line_totals, ZERO)
+    discount = to_money(total * discount_percentage / 100) + to_money(extra_discount)
+    discount = min(discount, total)
+    return OrderTotals(total_amount=total, discount_amount=discount, final_amount=total - discount)
+
+
+def line_total(quantity: int, price_per_item: Decimal) -> Tuple[Decimal, Decimal]:
+    """(price per item, line total), both rounded to cents"""
+    price = to_money(price_per_item)
+    return price, to_money(price * quantity)
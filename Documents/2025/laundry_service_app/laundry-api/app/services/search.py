@@ -0,0 +1,404 @@
+import asyncio
+import heapq
+import logging
+import re
+from array import array
+from collections import Counter
+from math import ceil
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import desc, func, literal, literal_column, or_, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import SessionLocal, async_engine
+from app.models import Customer, Order, User
+from app.schemas.search import CustomerSearchHit, OrderSearchHit, SearchResults
+
+logger = logging.getLogger(__name__)
+
+# pg_trgm's defaults for the % and %> operators; the memory index uses the same
+SIMILARITY_THRESHOLD = 0.3
+WORD_SIMILARITY_THRESHOLD = 0.6
+
+# Phones are matched on their digits. Must be the expression indexed by migration
+# 0008, with literal arguments so prepared (generic) plans still match the index.
+PHONE_DIGITS = func.regexp_replace(User.phone, literal_column("'[^0-9]'"), literal_column("''"), literal_column("'g'"))
+
+# (score, matched field) per customer or order id
+Hits = Dict[int, Tuple[float, str]]
+
+_WORD = re.compile(r"[^\W_]+")
+_NON_DIGIT = re.compile(r"\D")
+_NO_POSTINGS = array("i")
+
+
+def trigrams(text: str) -> Set[str]:
+    """Trigrams as pg_trgm extracts them: each lowercased word padded with two spaces before and one after"""
+    grams = set()
+    for word in _WORD.findall(text.lower()):
+        padded = f"  {word} "
+        grams.update([padded[i:i + 3] for i in range(len(padded) - 2)])
+    return grams
+
+
+def padded_words(text: str) -> str:
+    """Lowercased words padded as in trigrams() and joined by spaces: a trigram of
+    the kind trigrams() returns is one of text's exactly when it is a substring"""
+    return "  " + "   ".join(_WORD.findall(text.lower())) + " "
+
+
+def digits(text: Optional[str]) -> str:
+    return _NON_DIGIT.sub("", text or "")
+
+
+class TrigramField:
+    """Inverted trigram index over one text field (memory backend).
+
+    Ids are primary keys. Posting lists are arrays of ids in the order they
+    were added, so their tails are the newest rows. A query counts its
+    trigrams' postings rarest first, up to max_postings ids (the rest are
+    too common to count), and takes at most max_candidates of the ids
+    sharing the most. Those are scored against their current value best bound first
+    (from the shared count and the value's trigram count), stopping once no
+    remaining candidate can make the top `limit`. A match contains the query
+    or scores at least pg_trgm's threshold: similarity(), or with word=True
+    the share of the query's trigrams found in the value, like
+    word_similarity(). Changed values are re-added; their stale postings
+    only cost a rejected candidate until the next rebuild.
+    """
+
+    def __init__(self, word: bool = False, max_postings: int = 20000, max_candidates: int = 500):
+        self.word = word
+        self.threshold = WORD_SIMILARITY_THRESHOLD if word else SIMILARITY_THRESHOLD
+        self.max_postings = max_postings
+        self.max_candidates = max_candidates
+        self._values: Dict[int, str] = {}
+        self._sizes = bytearray()  # trigram count per id, capped at 255 (only notes get there; word scores skip it)
+        self._postings: Dict[str, array] = {}
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def add(self, doc_id: int, value: Optional[str]) -> None:
+        old = self._values.get(doc_id)
+        if not value:
+            self._values.pop(doc_id, None)
+            return
+        value = value.lower()
+        if value == old:
+            return
+        self._values[doc_id] = value
+        grams = trigrams(value)
+        if doc_id >= len(self._sizes):
+            self._sizes.extend(bytes(doc_id + 1 - len(self._sizes)))
+        self._sizes[doc_id] = min(len(grams), 255)
+        indexed = trigrams(old) if old else ()
+        for gram in grams:
+            if gram not in indexed:
+                postings = self._postings.get(gram)
+                if postings is None:
+                    postings = self._postings[gram] = array("i")
+                postings.append(doc_id)
+
+    def search(self, query: str, limit: int) -> List[Tuple[float, int]]:
+        """(score, id) of the best `limit` matches, best first; ties go to the newest"""
+        grams = trigrams(query)
+        if not grams:
+            return []
+        lists = sorted((self._postings.get(gram, _NO_POSTINGS) for gram in grams), key=len)
+        counts: Counter = Counter()
+        counted = common = 0
+        for postings in lists:
+            if counted + len(postings) > self.max_postings:
+                common += 1
+            else:
+                counted += len(postings)
+                counts.update(postings)
+
+        if counts:
+            # A value containing the query shares at least its inner trigrams (no
+            # padding); one scoring over the threshold shares threshold x of them all
+            size = len(grams)
+            inner = sum(" " not in gram for gram in grams)
+            floor = max(1, min(ceil(self.threshold * size), inner) - common)
+            # Raise it until about max_candidates ids reach it; the newest ids go first at the last level
+            levels = Counter(counts.values())
+            reaching = 0
+            for shared in sorted(levels, reverse=True):
+                reaching += levels[shared]
+                if shared <= floor or reaching >= self.max_candidates:
+                    floor = max(floor, shared)
+                    break
+            ids = [doc_id for doc_id, shared in counts.items() if shared > floor]
+            if len(ids) < self.max_candidates:
+                last = [doc_id for doc_id, shared in counts.items() if shared == floor]
+                ids += heapq.nlargest(self.max_candidates - len(ids), last)
+            # Upper bound of each score: the skipped trigrams may be shared too. Drop ids
+            # that can neither reach the threshold nor contain the query.
+            sizes = self._sizes
+            candidates = []
+            for doc_id in ids:
+                shared = min(counts[doc_id] + common, size)
+                bound = shared / size if self.word else shared / (size + max(sizes[doc_id], shared) - shared)
+                if bound >= self.threshold or shared >= inner:
+                    candidates.append((bound, doc_id))
+            candidates.sort(reverse=True)
+        else:
+            # Every trigram is common: look at the newest rows of the rarest one
+            candidates = [(1.0, doc_id) for doc_id in sorted(set(lists[0][-self.max_candidates:]), reverse=True)]
+
+        needle = query.lower()
+        hits: List[Tuple[float, int]] = []  # min-heap of the best `limit` so far
+        for candidate in candidates:
+            if len(hits) == limit and candidate < hits[0]:
+                break
+            doc_id = candidate[1]
+            value = self._values.get(doc_id)
+            if value is None:
+                continue
+            words = padded_words(value)
+            shared = sum(gram in words for gram in grams)
+            score = shared / len(grams) if self.word else shared / (len(grams) + self._sizes[doc_id] - shared)
+            if score >= self.threshold or needle in value:
+                if len(hits) < limit:
+                    heapq.heappush(hits, (score, doc_id))
+                elif (score, doc_id) > hits[0]:
+                    heapq.heapreplace(hits, (score, doc_id))
+        return sorted(hits, reverse=True)
+
+
+def _best(*fields: Tuple[str, Iterable[Tuple[float, int]]]) -> Hits:
+    """Each id's best (score, field) over the matches of several fields"""
+    hits: Hits = {}
+    for field, matches in fields:
+        for score, doc_id in matches:
+            if doc_id not in hits or score > hits[doc_id][0]:
+                hits[doc_id] = (score, field)
+    return hits
+
+
+class SearchIndex:
+    """In-process trigram index over tracking IDs, order notes and customer
+    names and phones, for databases without pg_trgm (SQLite in development).
+
+    Built from the DB at startup in a worker thread, then caught up every
+    refresh_seconds: new orders are added and customer fields reloaded.
+    Orders created in this process are added as they are created.
+    """
+
+    def __init__(self, refresh_seconds: float, session_factory=SessionLocal):
+        self.refresh_seconds = refresh_seconds
+        self.session_factory = session_factory
+        self.enabled = False
+        self.tracking = TrigramField()
+        self.notes = TrigramField(word=True)
+        self.names = TrigramField()
+        self.phones = TrigramField()
+        self._last_order_id = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def add_order(self, order_id: int, tracking_id: str, notes: Optional[str]) -> None:
+        if self.enabled:
+            self.tracking.add(order_id, tracking_id)
+            self.notes.add(order_id, notes)
+
+    def search(self, query: str, limit: int) -> Tuple[Hits, Hits]:
+        """(customer hits, order hits), at most `limit` per field"""
+        phone = digits(query)
+        customers = _best(
+            ("name", self.names.search(query, limit)),
+            ("phone", self.phones.search(phone, limit) if len(phone) >= 3 else ()),
+        )
+        orders = _best(("tracking_id", self.tracking.search(query, limit)), ("notes", self.notes.search(query, limit)))
+        return customers, orders
+
+    def refresh(self) -> None:
+        """Add orders created since the last refresh and reload customers (two queries).
+
+        Runs in a worker thread. Adds are single dict and array operations, so
+        searches on the event loop can run alongside; reloaded customer fields
+        are swapped in whole.
+        """
+        names, phones = TrigramField(), TrigramField()
+        with self.session_factory() as db:
+            orders = db.execute(
+                select(Order.id, Order.tracking_id, Order.notes)
+                .where(Order.id > self._last_order_id)
+                .order_by(Order.id)
+            ).all()
+            customers = db.execute(
+                select(Customer.id, User.name, User.phone).join(User, User.id == Customer.user_id)
+            ).all()
+        for order_id, tracking_id, notes in orders:
+            self.tracking.add(order_id, tracking_id)
+            self.notes.add(order_id, notes)
+        for customer_id, name, phone in customers:
+            names.add(customer_id, name)
+            phones.add(customer_id, digits(phone))
+        self.names, self.phones = names, phones
+        if orders:
+            self._last_order_id = orders[-1].id
+
+    async def start(self) -> None:
+        if not uses_memory_index(async_engine.dialect.name):
+            return
+        self.enabled = True
+        await asyncio.to_thread(self.refresh)
+        logger.info(f"Search index built: {len(self.tracking)} orders, {len(self.names)} customers")
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            try:
+                await asyncio.to_thread(self.refresh)
+            except Exception as e:
+                logger.warning(f"Search index refresh failed: {e}")
+
+
+def uses_memory_index(dialect_name: str) -> bool:
+    if settings.search_backend == "auto":
+        return dialect_name != "postgresql"
+    return settings.search_backend == "memory"
+
+
+def _pattern(query: str) -> str:
+    """ILIKE pattern for values containing query"""
+    return "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def _top(statement, order_by, limit: int):
+    """One ranked arm of a UNION ALL"""
+    return select(statement.order_by(desc(order_by)).limit(limit).subquery())
+
+
+def customer_matches(query: str, limit: int):
+    """Customers whose name or phone digits match, best `limit` per field (pg_trgm)"""
+    pattern = _pattern(query)
+    name_score = func.similarity(User.name, query)
+    arms = [_top(
+        select(Customer.id.label("customer_id"), name_score.label("score"), literal("name").label("matched"))
+        .join(User, User.id == Customer.user_id)
+        .where(or_(User.name.ilike(pattern, escape="\\"), User.name.op("%")(query))),
+        name_score, limit,
+    )]
+    phone = digits(query)
+    if len(phone) >= 3:
+        phone_score = func.similarity(PHONE_DIGITS, phone)
+        arms.append(_top(
+            select(Customer.id.label("customer_id"), phone_score.label("score"), literal("phone").label("matched"))
+            .join(User, User.id == Customer.user_id)
+            .where(PHONE_DIGITS.like(f"%{phone}%")),
+            phone_score, limit,
+        ))
+    return union_all(*arms).subquery()
+
+
+def order_match_arms(query: str, limit: int) -> list:
+    """Orders whose tracking ID or notes match, best `limit` per field (pg_trgm)"""
+    pattern = _pattern(query)
+    tracking_score = func.similarity(Order.tracking_id, query)
+    notes_score = func.word_similarity(query, Order.notes)
+    return [
+        _top(
+            select(Order.id.label("order_id"), tracking_score.label("score"), literal("tracking_id").label("matched"))
+            .where(or_(Order.tracking_id.ilike(pattern, escape="\\"), Order.tracking_id.op("%")(query))),
+            tracking_score, limit,
+        ),
+        _top(
+            select(Order.id.label("order_id"), notes_score.label("score"), literal("notes").label("matched"))
+            .where(or_(Order.notes.ilike(pattern, escape="\\"), Order.notes.op("%>")(query))),
+            notes_score, limit,
+        ),
+    ]
+
+
+def _given(column, label: str, hits: Hits):
+    """Ids the memory index found, shaped like a pg_trgm arm (scores filled in afterwards)"""
+    return select(column.label(label), literal(0.0).label("score"), literal("").label("matched")).where(
+        column.in_(list(hits))
+    )
+
+
+def _ranked(rows: Iterable[dict], key: str, limit: int) -> List[dict]:
+    """Best row per id, highest score first and newest first among equals"""
+    best: Dict[int, dict] = {}
+    for row in rows:
+        current = best.get(row[key])
+        if current is None or row["score"] > current["score"]:
+            best[row[key]] = row
+    return sorted(best.values(), key=lambda row: (row["score"], row[key]), reverse=True)[:limit]
+
+
+async def search(db: AsyncSession, query: str, limit: int) -> SearchResults:
+    """Customers and orders matching a partial tracking ID, name, phone or note (two statements)"""
+    query = query.strip()
+    memory = uses_memory_index(db.bind.dialect.name)
+    if memory:
+        customer_scores, order_scores = search_index.search(query, limit)
+        customer_hits = _given(Customer.id, "customer_id", customer_scores).subquery() if customer_scores else None
+        order_arms = [_given(Order.id, "order_id", order_scores)] if order_scores else []
+    else:
+        customer_scores = order_scores = None
+        customer_hits = customer_matches(query, limit)
+        order_arms = order_match_arms(query, limit)
+
+    customers = []
+    if customer_hits is not None:
+        rows = await db.execute(
+            select(Customer.id.label("customer_id"), User.name, User.phone, User.email,
+                   customer_hits.c.score, customer_hits.c.matched)
+            .join(customer_hits, customer_hits.c.customer_id == Customer.id)
+            .join(User, User.id == Customer.user_id)
+        )
+        rows = [row._asdict() for row in rows]
+        if customer_scores is not None:
+            for row in rows:
+                row["score"], row["matched"] = customer_scores[row["customer_id"]]
+        customers = _ranked(rows, "customer_id", limit)
+
+    # A matched customer brings their latest orders, ranked by how well the customer matched
+    by_customer = {customer["customer_id"]: customer for customer in customers}
+    if by_customer:
+        order_arms.append(_top(
+            select(Order.id.label("order_id"), literal(0.0).label("score"), literal("customer").label("matched"))
+            .where(Order.customer_id.in_(by_customer)),
+            Order.id, limit,
+        ))
+    orders = []
+    if order_arms:
+        hits = union_all(*order_arms).subquery()
+        rows = [row._asdict() for row in await db.execute(
+            select(Order.id.label("order_id"), Order.tracking_id, Order.status, Order.created_at, Order.customer_id,
+                   User.name.label("customer_name"), User.phone.label("customer_phone"), Order.notes,
+                   hits.c.score, hits.c.matched)
+            .join(hits, hits.c.order_id == Order.id)
+            .join(Customer, Customer.id == Order.customer_id)
+            .join(User, User.id == Customer.user_id)
+        )]
+        for row in rows:
+            if row["matched"] == "customer":
+                customer = by_customer[row["customer_id"]]
+                row["score"], row["matched"] = customer["score"], customer["matched"]
+            elif order_scores is not None:
+                row["score"], row["matched"] = order_scores[row["order_id"]]
+        orders = _ranked(rows, "order_id", limit)
+
+    return SearchResults(
+        customers=[CustomerSearchHit(**customer) for customer in customers],
+        orders=[OrderSearchHit(**order) for order in orders],
+    )
+
+
+# Global in-process index; the app lifespan builds it unless pg_trgm does the work
+search_index = SearchIndex(refresh_seconds=settings.search_refresh_seconds)
@@ -0,0 +1,145 @@
+from datetime import datetime
+from typing import Optional, Sequence, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import aliased
+
+from app.core.auth import invalidation_bus
+from app.core.cache import SingleFlight, TTLCache
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models import Order, OrderStatusHistory
+from app.schemas.order import OrderTrackingOut, TrackingEntryOut
+from app.services.order_events import OrderStatusChanged, order_events
+
+# (version, JSON body); version is the id of the latest status history row,
+# so an older snapshot can never replace a newer one. Unknown IDs are cached
+# as (0, None) for tracking_negative_ttl_seconds.
+Snapshot = Tuple[int, Optional[bytes]]
+
+
+def _value(value):
+    return getattr(value, "value", value)
+
+
+class TrackingSnapshots:
+    """Pre-serialized tracking snapshots keyed by Order.tracking_id.
+
+    Hits return cached JSON bytes without touching the DB or pydantic. A miss
+    loads the order and its latest status row in one statement, coalesced so
+    any number of concurrent clients cause a single load. Status changes
+    write the new snapshot through after commit and tell other workers to
+    drop theirs.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, negative_ttl: float):
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl, name="tracking")
+        self.negative_ttl = negative_ttl
+        self.flights = SingleFlight(name="tracking")
+
+    async def get(self, tracking_id: str) -> Optional[bytes]:
+        """Snapshot JSON for a tracking ID, or None if there is no such order"""
+        snapshot = self.cache.get(tracking_id)
+        if snapshot is None:
+            snapshot = await self.flights.do(tracking_id, lambda: self._load(tracking_id))
+        return snapshot[1]
+
+    def put(
+        self,
+        tracking_id: str,
+        status,
+        estimated_completion_time: Optional[datetime],
+        history_id: int,
+        notes: Optional[str],
+        at: Optional[datetime],
+    ) -> None:
+        """Write-through after a committed status change"""
+        body = OrderTrackingOut(
+            tracking_id=tracking_id,
+            status=_value(status),
+            estimated_completion_time=estimated_completion_time,
+            last_update=TrackingEntryOut(status=_value(status), notes=notes, at=at),
+        ).model_dump_json().encode()
+        self._store(tracking_id, (history_id, body))
+        invalidation_bus.publish("tracking", f"{tracking_id}:{history_id}")
+
+    def on_status_changed(self, event: OrderStatusChanged) -> None:
+        self.put(
+            event.tracking_id, event.status, event.estimated_completion_time,
+            history_id=event.history_id, notes=event.notes, at=event.at,
+        )
+
+    def drop(self, tracking_ids: Sequence[str]) -> None:
+        """The orders changed without a new status row (their ETA moved); reload on next read"""
+        self.forget(",".join(tracking_ids))
+        # One bus message per chunk rather than per order
+        for start in range(0, len(tracking_ids), 500):
+            invalidation_bus.publish("tracking-drop", ",".join(tracking_ids[start:start + 500]))
+
+    def forget(self, key: str) -> None:
+        """Bus handler: drop the comma-separated snapshots whatever their version"""
+        for tracking_id in key.split(","):
+            self.cache.delete(tracking_id)
+
+    def invalidate(self, key: str) -> None:
+        """Bus handler: drop a snapshot older than the published version"""
+        tracking_id, _, version = key.rpartition(":")
+        current = self.cache.peek(tracking_id)
+        if current is None or current[0] < int(version or 0):
+            self.cache.delete(tracking_id)
+
+    def _store(self, tracking_id: str, snapshot: Snapshot, generation: Optional[Tuple[int, int]] = None) -> None:
+        # Runs on the event loop with no await between peek and set
+        current = self.cache.peek(tracking_id)
+        if current is not None and current[0] > snapshot[0]:
+            return
+        ttl = self.negative_ttl if snapshot[1] is None else None
+        self.cache.set(tracking_id, snapshot, ttl=ttl, generation=generation)
+
+    async def _load(self, tracking_id: str) -> Snapshot:
+        generation = self.cache.generation_of(tracking_id)
+        history = aliased(OrderStatusHistory)
+        latest = (
+            select(func.max(history.id))
+            .where(history.order_id == Order.id)
+            .correlate(Order)
+            .scalar_subquery()
+        )
+        query = (
+            select(
+                Order.tracking_id, Order.status, Order.estimated_completion_time,
+                OrderStatusHistory.id.label("history_id"), OrderStatusHistory.status.label("history_status"),
+                OrderStatusHistory.notes, OrderStatusHistory.created_at,
+            )
+            .outerjoin(OrderStatusHistory, OrderStatusHistory.id == latest)
+            .where(Order.tracking_id == tracking_id)
+        )
+        # Own session: the load is shared by every waiting request
+        async with AsyncSessionLocal() as db:
+            row = (await db.execute(query)).first()
+
+        if row is None:
+            snapshot = (0, None)
+        else:
+            last_update = None
+            if row.history_id is not None:
+                last_update = TrackingEntryOut(status=_value(row.history_status), notes=row.notes, at=row.created_at)
+            snapshot = (row.history_id or 0, OrderTrackingOut(
+                tracking_id=row.tracking_id,
+                status=_value(row.status),
+                estimated_completion_time=row.estimated_completion_time,
+                last_update=last_update,
+            ).model_dump_json().encode())
+        self._store(tracking_id, snapshot, generation=generation)
+        return snapshot
+
+
+# Global tracking snapshot cache
+tracking_snapshots = TrackingSnapshots(
+    maxsize=settings.tracking_cache_size,
+    ttl=settings.tracking_cache_ttl_seconds,
+    negative_ttl=settings.tracking_negative_ttl_seconds,
+)
+invalidation_bus.register("tracking", tracking_snapshots.invalidate)
+invalidation_bus.register("tracking-drop", tracking_snapshots.forget)
+order_events.subscribe(OrderStatusChanged, tracking_snapshots.on_status_changed)
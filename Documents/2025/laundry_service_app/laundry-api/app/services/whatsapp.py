@@ -10,6 +10,7 @@ from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.core.database import get_db
+from app.core.profiling import aiohttp_trace_config
 from app.models.notification import (
     Notification, MessageTemplate, NotificationPreference,
     WebhookEvent, MessageStatus, NotificationType
@@ -94,7 +95,7 @@ class WhatsAppService:
             payload["template"]["components"] = components
 
         try:
-            async with aiohttp.ClientSession() as session:
+            async with aiohttp.ClientSession(trace_configs=[aiohttp_trace_config()]) as session:
                 headers = {
                     "Authorization": f"Bearer {self.access_token}",
                     "Content-Type": "application/json"
@@ -172,7 +173,7 @@ class WhatsAppService:
         }
 
         try:
-            async with aiohttp.ClientSession() as session:
+            async with aiohttp.ClientSession(trace_configs=[aiohttp_trace_config()]) as session:
                 headers = {
                     "Authorization": f"Bearer {self.access_token}",
                     "Content-Type": "application/json"
@@ -0,0 +1,110 @@
+"""Simulate a day of order intake against the worker assignment scheduler.
+
+--orders orders arrive at random over 24 hours and go to one of --workers
+workers, who each work through their orders one at a time (first come,
+first served). An order's estimated hours are quantity x the service's
+estimated_duration_hours; how long it really takes is that estimate,
+scaled so the shop runs at --utilization, times random noise
+(--estimate-error). Finishing an order releases it from the scheduler, as
+a status change to ready would. Compares least-loaded assignment
+(AssignmentScheduler) with round-robin and random assignment, and reports
+how long orders waited for their worker and the cost of assign()/release():
+
+    DATABASE_URL=sqlite:///./bench.db python benchmarks/bench_assignment.py --workers 200 --orders 50000
+"""
+import argparse
+import heapq
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.assignment import AssignmentScheduler
+
+# (estimated_duration_hours, weight): mostly wash/dry/iron, some dry cleaning
+SERVICE_MIX = ((2, 60), (3, 25), (24, 5), (1, 10))
+DAY_HOURS = 24.0
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def make_orders(count, rng):
+    durations, weights = zip(*SERVICE_MIX)
+    arrivals = sorted(rng.uniform(0, DAY_HOURS) for _ in range(count))
+    orders = []
+    for order_id, arrival in enumerate(arrivals, start=1):
+        items = rng.choices(durations, weights, k=rng.randint(1, 3))
+        estimate = float(sum(duration * rng.randint(1, 4) for duration in items))
+        orders.append((order_id, arrival, estimate))
+    return orders
+
+
+def simulate(policy, orders, workers, scale, error, seed):
+    """Returns (waits in minutes, assign+release timings in microseconds)"""
+    rng = random.Random(seed)
+    scheduler = AssignmentScheduler(refresh_seconds=60, session_factory=None)
+    scheduler.reset({user_id: user_id for user_id in range(1, workers + 1)}, ())
+    free_at = {user_id: 0.0 for user_id in range(1, workers + 1)}
+    finishing = []  # (finish time, order id)
+    waits, timings = [], []
+    next_worker = 0
+
+    for order_id, arrival, estimate in orders:
+        while finishing and finishing[0][0] <= arrival:
+            _, done = heapq.heappop(finishing)
+            started = time.perf_counter()
+            scheduler.release(done)
+            timings.append((time.perf_counter() - started) * 1e6)
+
+        started = time.perf_counter()
+        if policy == "least-loaded":
+            user_id = scheduler.assign(estimate)
+        elif policy == "round-robin":
+            next_worker = next_worker % workers + 1
+            user_id = next_worker
+        else:
+            user_id = rng.randint(1, workers)
+        scheduler.add(order_id, user_id, estimate, reserved=policy == "least-loaded")
+        timings.append((time.perf_counter() - started) * 1e6)
+
+        work = estimate * scale * rng.lognormvariate(0, error) if error else estimate * scale
+        start = max(arrival, free_at[user_id])
+        free_at[user_id] = start + work
+        waits.append((start - arrival) * 60)
+        heapq.heappush(finishing, (start + work, order_id))
+    return waits, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=200)
+    parser.add_argument("--orders", type=int, default=50000, help="Orders per day")
+    parser.add_argument("--utilization", type=float, default=0.9, help="Share of worker time spent on orders")
+    parser.add_argument("--estimate-error", type=float, default=0.3, help="Sigma of lognormal noise on real duration")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    orders = make_orders(args.orders, random.Random(args.seed))
+    estimated = sum(estimate for _, _, estimate in orders)
+    # Real hours of work per estimated hour, so the day's work fills `utilization` of the shift
+    scale = args.utilization * args.workers * DAY_HOURS / estimated
+    print(f"{args.orders} orders over {DAY_HOURS:.0f}h, {args.workers} workers, utilization {args.utilization:.0%}, "
+          f"{scale * 60:.1f} min of work per estimated hour")
+
+    for policy in ("least-loaded", "round-robin", "random"):
+        started = time.perf_counter()
+        waits, timings = simulate(policy, orders, args.workers, scale, args.estimate_error, args.seed)
+        elapsed = time.perf_counter() - started
+        print(f"{policy:>12}: wait p50 {percentile(waits, 50):7.1f} min, p99 {percentile(waits, 99):7.1f} min, "
+              f"max {max(waits):7.1f} min | assign/release p50 {percentile(timings, 50):.1f} us, "
+              f"p99 {percentile(timings, 99):.1f} us | day simulated in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Concurrent login / order latency benchmark.
+
+Fires a mix of login and order-list requests at a running API and reports
+p50/p99 latency per endpoint. Run it once against the previous revision
+(sync sessions inside async endpoints) and once against the current one
+(AsyncSession), with the same server flags, and compare the tables
+(with login throttling off, as every login uses the same account):
+
+    LOGIN_RATE_LIMIT_ENABLED=false uvicorn app.main:app --workers 1 --port 8000
+    python benchmarks/bench_async_db.py --base-url http://localhost:8000 \\
+        --concurrency 200 --requests 5000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections import defaultdict
+
+import httpx
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run(args):
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    queue = asyncio.Queue()
+    for i in range(args.requests):
+        queue.put_nowait("login" if i % 2 == 0 else "orders")
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+        login = await client.post(
+            "/api/v1/auth/login",
+            json={"email": args.email, "password": args.password},
+        )
+        login.raise_for_status()
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        async def worker():
+            while True:
+                try:
+                    kind = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                start = time.perf_counter()
+                try:
+                    if kind == "login":
+                        response = await client.post(
+                            "/api/v1/auth/login",
+                            json={"email": args.email, "password": args.password},
+                        )
+                    else:
+                        response = await client.get("/api/v1/orders/", headers=headers)
+                    failed = response.status_code >= 400
+                except httpx.HTTPError:
+                    failed = True
+                latencies[kind].append((time.perf_counter() - start) * 1000)
+                if failed:
+                    errors[kind] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}, {elapsed:.1f}s "
+          f"({args.requests / elapsed:.0f} req/s)")
+    print(f"{'endpoint':<10}{'count':>8}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}{'errors':>8}")
+    for kind, samples in sorted(latencies.items()):
+        print(f"{kind:<10}{len(samples):>8}{percentile(samples, 50):>10.1f}"
+              f"{percentile(samples, 99):>10.1f}{statistics.mean(samples):>10.1f}{errors[kind]:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--email", default="admin@laundrysystem.com")
+    parser.add_argument("--password", default="admin123")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Per-request authentication overhead: user row vs token claims.
+
+Seeds one user, then times the auth dependency alone (token decode plus
+any lookup, on a fresh async session each time like a real request) for:
+
+  * get_current_user       - loads the full User row
+  * get_current_principal  - role/ver claims, token version cache disabled
+  * get_current_principal  - role/ver claims, cached token version (no SQL)
+
+    DATABASE_URL=sqlite:///./bench_auth.db python benchmarks/bench_auth_overhead.py --requests 5000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import select
+
+from app.core.auth import auth_handler, get_current_principal, get_current_user, token_version_cache
+from app.core.database import AsyncSessionLocal, SessionLocal, async_engine
+from app.core.migrations import upgrade_to_head
+from app.core.profiling import start_profile
+from app.models import User, UserRole
+
+BENCH_EMAIL = "bench-auth@example.com"
+
+
+def seed() -> User:
+    with SessionLocal(expire_on_commit=False) as db:
+        user = db.scalar(select(User).where(User.email == BENCH_EMAIL))
+        if user is None:
+            user = User(email=BENCH_EMAIL, name="Bench", hashed_password="x", role=UserRole.ADMIN)
+            db.add(user)
+            db.commit()
+        return user
+
+
+async def run(dependency, credentials, requests):
+    samples = []
+    statements = 0
+    for _ in range(requests):
+        profile = start_profile()
+        start = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            await dependency(credentials=credentials, db=db)
+        samples.append((time.perf_counter() - start) * 1_000_000)
+        statements += profile.statements
+    samples.sort()
+    return {
+        "p50": statistics.median(samples),
+        "p99": samples[int(len(samples) * 0.99) - 1],
+        "statements": statements / requests,
+    }
+
+
+async def main_async(requests):
+    upgrade_to_head()
+    user = seed()
+    claims = HTTPAuthorizationCredentials(scheme="Bearer", credentials=auth_handler.create_user_access_token(user))
+
+    cases = []
+    cases.append(("get_current_user (full row)", await run(get_current_user, claims, requests)))
+
+    maxsize = token_version_cache.maxsize
+    token_version_cache.maxsize = 0
+    token_version_cache.clear()
+    cases.append(("principal, claims, cache off", await run(get_current_principal, claims, requests)))
+    token_version_cache.maxsize = maxsize
+    cases.append(("principal, claims, cache on", await run(get_current_principal, claims, requests)))
+
+    print(f"{'case':<30} {'p50 us':>10} {'p99 us':>10} {'SQL/req':>8}")
+    for name, result in cases:
+        print(f"{name:<30} {result['p50']:>10.1f} {result['p99']:>10.1f} {result['statements']:>8.2f}")
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""ETA recompute rate when the backlog shifts, and the cost of writing ETAs back.
+
+In memory: queues --open open orders, then repeatedly closes the order at
+the head of a random category and recomputes every open order's ETA, as a
+flush after a status change would; reports recomputes and ETAs/s, and how
+many ETAs moved far enough to be written. With
+the DB: seeds --db-orders open orders, rebuilds the engine from them,
+flushes their ETAs (the startup backfill), then closes --closes head
+orders and flushes again:
+
+    DATABASE_URL=sqlite:///./bench_eta.db python benchmarks/bench_eta.py --open 50000 --db-orders 20000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import delete, insert, select
+
+from app.core.database import SessionLocal, async_engine
+from app.core.migrations import upgrade_to_head
+from app.models import Customer, Order, OrderItem, OrderStatus, ServiceType, User, UserRole
+from app.services.eta import EtaEngine, work_by_category
+from app.utils.init_data import initialize_default_data
+
+CAPACITY = {"wash": 20.0, "dry-clean": 8.0, "iron": 12.0, "special": 4.0}
+# (category, estimated_duration_hours) like the default service catalogue
+SERVICES = (("wash", 2), ("wash", 2), ("dry-clean", 24), ("iron", 1), ("special", 4), ("special", 6))
+
+
+def engine(threshold):
+    return EtaEngine(default_capacity=10.0, category_capacity=CAPACITY, threshold_seconds=threshold,
+                     flush_interval=1.0, refresh_seconds=300.0)
+
+
+def in_memory(args, rng):
+    eta = engine(args.threshold)
+    rows = []
+    # One category per order, so each order closes as soon as its head slot is done
+    for order_id in range(1, args.open + 1):
+        category, duration = rng.choice(SERVICES)
+        work = work_by_category([(category, rng.randint(1, 4), duration)])
+        rows.extend((order_id, f"T{order_id}", None, None, category, hours, longest)
+                    for category, (hours, longest) in work.items())
+    eta.reset(rows)
+
+    started = time.perf_counter()
+    first = eta.recompute()
+    print(f"backfill: {len(first)} ETAs in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    started = time.perf_counter()
+    quotes = 10000
+    for _ in range(quotes):
+        eta.quote({"wash": (4.0, 2.0), "iron": (2.0, 1.0)})
+    print(f"quote: {(time.perf_counter() - started) / quotes * 1e6:.2f} us per new order")
+
+    # Categories work in parallel at their capacity; the next close is the
+    # head order that finishes first. Real work is the estimate times
+    # lognormal noise (--estimate-error 0: estimates are exact)
+    now = time.time()
+    done = dict.fromkeys(CAPACITY, 0.0)  # hours of work done on each category's head order
+    actual = {}
+    recomputed = moved = 0
+    started = time.perf_counter()
+    for _ in range(args.closes):
+        heads = {}
+        for category in CAPACITY:
+            if eta._queues[category]:
+                order_id, (hours, _) = next(iter(eta._queues[category].items()))
+                if order_id not in actual:
+                    actual[order_id] = hours * rng.lognormvariate(0, args.estimate_error)
+                heads[category] = order_id
+        category = min(heads, key=lambda c: (actual[heads[c]] - done[c]) / CAPACITY[c])
+        elapsed_hours = (actual[heads[category]] - done[category]) / CAPACITY[category]
+        now += elapsed_hours * 3600
+        for other in heads:
+            done[other] += elapsed_hours * CAPACITY[other]
+        done[category] = 0.0
+        eta.release(heads[category], now=now)
+        recomputed += len(eta._orders)
+        moved += len(eta.recompute(now))
+    elapsed = time.perf_counter() - started
+    print(f"{args.closes} closes with ~{args.open} open orders: {elapsed / args.closes * 1000:.1f} ms per recompute, "
+          f"{recomputed / elapsed:,.0f} ETAs recomputed/s, {moved / args.closes:.0f} per close moved by "
+          f">= {args.threshold:.0f}s (estimate error {args.estimate_error})")
+
+
+def seed(count, rng):
+    with SessionLocal() as db:
+        initialize_default_data()
+        db.execute(delete(Order).where(Order.tracking_id.like("BETA%")))
+        user = User(email=f"bench-eta-{time.time_ns()}@example.com", name="Bench ETA",
+                    hashed_password="x", role=UserRole.CUSTOMER)
+        db.add(user)
+        db.flush()
+        customer = Customer(user_id=user.id)
+        db.add(customer)
+        db.flush()
+        service_ids = [row.id for row in db.execute(select(ServiceType.id))]
+        db.execute(insert(Order), [
+            {"tracking_id": f"BETA{user.id:04d}{i:08d}", "customer_id": customer.id, "status": OrderStatus.PENDING,
+             "total_amount": 10, "discount_amount": 0, "final_amount": 10}
+            for i in range(count)
+        ])
+        order_ids = db.scalars(select(Order.id).where(Order.customer_id == customer.id)).all()
+        db.execute(insert(OrderItem), [
+            {"order_id": order_id, "service_type_id": rng.choice(service_ids), "quantity": rng.randint(1, 4),
+             "price_per_item": 5, "total_price": 10}
+            for order_id in order_ids
+        ])
+        db.commit()
+
+
+async def with_db(args, rng):
+    upgrade_to_head()
+    seed(args.db_orders, rng)
+    eta = engine(args.threshold)
+    try:
+        started = time.perf_counter()
+        await eta.refresh()
+        print(f"rebuild from {len(eta._orders)} open orders: {(time.perf_counter() - started) * 1000:.0f} ms")
+        started = time.perf_counter()
+        written = await eta.flush()
+        elapsed = time.perf_counter() - started
+        print(f"backfill flush: {written} ETAs written in {elapsed:.2f}s ({written / elapsed:,.0f}/s)")
+
+        for _ in range(args.closes):
+            queue = eta._queues[rng.choice(list(eta._queues))]
+            eta.release(next(iter(queue)))
+        started = time.perf_counter()
+        written = await eta.flush()
+        elapsed = time.perf_counter() - started
+        # No time passes between the closes here, so most ETAs move
+        print(f"flush after {args.closes} closes: {written} ETAs moved and written in {elapsed:.2f}s")
+    finally:
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--open", type=int, default=50000, help="Open orders held in memory")
+    parser.add_argument("--closes", type=int, default=200)
+    parser.add_argument("--threshold", type=float, default=300.0, help="ETA_WRITE_THRESHOLD_SECONDS")
+    parser.add_argument("--estimate-error", type=float, default=0.3, help="Sigma of lognormal noise on real work")
+    parser.add_argument("--db-orders", type=int, default=20000, help="0 skips the DB part")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    in_memory(args, rng)
+    if args.db_orders:
+        asyncio.run(with_db(args, rng))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Latency of unrelated endpoints while a login storm is running.
+
+Measures /health and the service catalog on their own, then again while
+--storm clients hammer /api/v1/auth/login. With bcrypt on the event loop
+the probes queue behind every hash (p99 of several seconds on one worker);
+with the bcrypt pool they should stay close to the baseline, and logins
+beyond the pool's queue get 503s instead (the storm clients honour
+Retry-After, like a well-behaved app would). Login throttling would turn
+most of the storm into 429s, so turn it off for this measurement:
+
+    LOGIN_RATE_LIMIT_ENABLED=false uvicorn app.main:app --workers 1 --port 8000
+    python benchmarks/bench_login_storm.py --base-url http://localhost:8000 --storm 100 --seconds 10
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter, defaultdict
+
+import httpx
+
+PROBES = [("health", "/health"), ("services", "/api/v1/services/")]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def probe(client, deadline, latencies):
+    while time.perf_counter() < deadline:
+        for name, path in PROBES:
+            start = time.perf_counter()
+            response = await client.get(path)
+            response.raise_for_status()
+            latencies[name].append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.01)
+
+
+async def login_loop(client, deadline, args, statuses):
+    while time.perf_counter() < deadline:
+        try:
+            response = await client.post(
+                "/api/v1/auth/login",
+                json={"email": args.email, "password": args.password},
+            )
+            statuses[response.status_code] += 1
+            if response.status_code == 503:
+                await asyncio.sleep(float(response.headers.get("retry-after", 1)))
+        except httpx.HTTPError:
+            statuses["error"] += 1
+
+
+async def phase(args, storm):
+    latencies = defaultdict(list)
+    statuses = Counter()
+    limits = httpx.Limits(max_connections=args.storm + 10)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60, limits=limits) as client:
+        deadline = time.perf_counter() + args.seconds
+        tasks = [probe(client, deadline, latencies)]
+        tasks += [login_loop(client, deadline, args, statuses) for _ in range(storm)]
+        await asyncio.gather(*tasks)
+    return latencies, statuses
+
+
+async def run(args):
+    print(f"{'phase':<10}{'probe':<10}{'count':>8}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for label, storm in (("baseline", 0), ("storm", args.storm)):
+        latencies, statuses = await phase(args, storm)
+        for name, _ in PROBES:
+            samples = latencies[name]
+            print(f"{label:<10}{name:<10}{len(samples):>8}{percentile(samples, 50):>10.1f}"
+                  f"{percentile(samples, 99):>10.1f}{max(samples):>10.1f}")
+        if storm:
+            summary = ", ".join(f"{code}: {count}" for code, count in sorted(statuses.items(), key=str))
+            print(f"logins during storm ({storm} clients, {args.seconds}s): {summary}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--storm", type=int, default=100, help="concurrent login clients")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--email", default="admin@laundrysystem.com")
+    parser.add_argument("--password", default="admin123")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
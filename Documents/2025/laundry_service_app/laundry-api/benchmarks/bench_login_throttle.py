@@ -0,0 +1,94 @@
+"""CPU seconds spent on a simulated credential-stuffing attack, with and without login throttling.
+
+Seeds --accounts users, then replays two attacks against /auth/login
+in-process (httpx ASGI transport, so the client IP can be set):
+
+  * stuffing - one IP cycling through every account with wrong passwords
+  * targeted - --attempts different IPs all guessing one account's password
+
+Each attack runs with the login limiter off and then on. The benchmark
+reports process CPU time, which includes the bcrypt pool threads, plus how
+many bcrypt verifies actually ran:
+
+    DATABASE_URL=sqlite:///./bench_throttle.db python benchmarks/bench_login_throttle.py --attempts 200
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx
+from sqlalchemy import func, select
+
+from app.core.auth import auth_handler, password_pool
+from app.core.database import SessionLocal, async_engine
+from app.core.migrations import upgrade_to_head
+from app.core.rate_limit import MemorySlidingWindow, login_limiter
+from app.main import app
+from app.models import User, UserRole
+
+
+def seed(accounts):
+    with SessionLocal() as db:
+        existing = db.scalar(select(func.count(User.id)).where(User.email.like("stuffing-%")))
+        if existing >= accounts:
+            return
+        hashed = auth_handler.hash_password("correct horse battery staple")
+        db.add_all([
+            User(email=f"stuffing-{i}@example.com", name=f"Victim {i}", hashed_password=hashed, role=UserRole.CUSTOMER)
+            for i in range(existing, accounts)
+        ])
+        db.commit()
+
+
+async def attack(plan):
+    statuses = Counter()
+    verifies_before = password_pool._duration_ms.snapshot()["count"]
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    for ip, email in plan:
+        transport = httpx.ASGITransport(app=app, client=(ip, 40000))
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.post("/api/v1/auth/login", json={"email": email, "password": "hunter2"})
+        statuses[response.status_code] += 1
+    return {
+        "cpu": time.process_time() - cpu_start,
+        "wall": time.perf_counter() - wall_start,
+        "verifies": password_pool._duration_ms.snapshot()["count"] - verifies_before,
+        "statuses": statuses,
+    }
+
+
+async def main_async(args):
+    upgrade_to_head()
+    seed(args.accounts)
+    plans = {
+        "stuffing": [("203.0.113.7", f"stuffing-{i % args.accounts}@example.com") for i in range(args.attempts)],
+        "targeted": [(f"198.51.{i // 250}.{i % 250}", "stuffing-0@example.com") for i in range(args.attempts)],
+    }
+
+    print(f"{'attack':<10}{'limiter':<9}{'CPU s':>8}{'wall s':>8}{'bcrypt':>8}  statuses")
+    for name, plan in plans.items():
+        for enabled in (False, True):
+            login_limiter.enabled = enabled
+            login_limiter.backend = MemorySlidingWindow()
+            result = await attack(plan)
+            statuses = ", ".join(f"{code}: {count}" for code, count in sorted(result["statuses"].items()))
+            print(f"{name:<10}{'on' if enabled else 'off':<9}{result['cpu']:>8.2f}{result['wall']:>8.2f}"
+                  f"{result['verifies']:>8}  {statuses}")
+    password_pool.shutdown()
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--attempts", type=int, default=200)
+    parser.add_argument("--accounts", type=int, default=50)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
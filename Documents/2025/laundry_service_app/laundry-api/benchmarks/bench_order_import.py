@@ -0,0 +1,158 @@
+"""Streaming order import throughput for CSV and NDJSON files.
+
+Generates --orders orders (1-3 items each, about --bad-rate of them invalid:
+unknown customer, unknown service or quantity 0) and streams them to
+/api/v1/orders/import in-process (httpx ASGI transport) in 64 KiB chunks,
+once as CSV and once as NDJSON. Reports orders/s, how many were rejected
+and the SQL statements per batch, which should stay flat (about 7 per
+BULK_BATCH_SIZE orders) however large the file:
+
+    DATABASE_URL=sqlite:///./bench_import.db python benchmarks/bench_order_import.py --orders 100000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.auth import auth_handler, password_pool
+from app.core.config import settings
+from app.core.database import SessionLocal, async_engine
+from app.core.ids import tracking_ids
+from app.core.migrations import upgrade_to_head
+from app.main import app
+from app.models import Customer, ServiceType, User, UserRole
+from app.utils.init_data import initialize_default_data
+
+CHUNK = 1 << 16
+STATUSES = ("pending", "pending", "in-progress", "completed")
+
+
+def seed():
+    """An admin to import with and a customer to import for"""
+    initialize_default_data()
+    with SessionLocal() as db:
+        admin = db.query(User).filter(User.email == "bench-import-admin@example.com").first()
+        if admin is None:
+            admin = User(email="bench-import-admin@example.com", name="Bench Admin",
+                         hashed_password="x", role=UserRole.ADMIN)
+            customer_user = User(email="bench-import-customer@example.com", name="Bench Customer",
+                                 hashed_password="x", role=UserRole.CUSTOMER)
+            db.add_all([admin, customer_user])
+            db.flush()
+            db.add(Customer(user_id=customer_user.id))
+            db.commit()
+        customer_user = db.query(User).filter(User.email == "bench-import-customer@example.com").one()
+        customer_id = db.query(Customer.id).filter(Customer.user_id == customer_user.id).scalar()
+        services = [(row.id, row.name) for row in db.query(ServiceType.id, ServiceType.name)
+                    .filter(ServiceType.is_active == True)]
+        return auth_handler.create_user_access_token(admin), customer_id, services
+
+
+def make_orders(count, customer_id, services, bad_rate, rng):
+    """Orders as dicts; a bad_rate share of them is invalid in one of three ways"""
+    orders, bad = [], 0
+    for _ in range(count):
+        status = rng.choice(STATUSES)
+        order = {"customer_id": customer_id, "status": status, "items": []}
+        if status == "completed":
+            order["created_at"] = "2025-06-01T09:00:00"
+            order["completed_at"] = "2025-06-02T17:00:00"
+        for _ in range(rng.randint(1, 3)):
+            service_id, name = rng.choice(services)
+            # Paper tickets name the service; spreadsheets tend to carry the id
+            key = ("service", name) if rng.random() < 0.5 else ("service_type_id", service_id)
+            order["items"].append({key[0]: key[1], "quantity": rng.randint(1, 5)})
+        if rng.random() < bad_rate:
+            bad += 1
+            kind = rng.randrange(3)
+            if kind == 0:
+                order["customer_id"] = 10 ** 9
+            elif kind == 1:
+                order["items"][0] = {"service_type_id": 10 ** 9, "quantity": 1}
+            else:
+                order["items"][0]["quantity"] = 0
+        orders.append(order)
+    return orders, bad
+
+
+def as_csv(orders):
+    columns = ("order_ref", "customer_id", "status", "created_at", "completed_at",
+               "service_type_id", "service", "quantity")
+    lines = [",".join(columns)]
+    for ref, order in enumerate(orders):
+        for item in order["items"]:
+            values = {**order, **item, "order_ref": ref}
+            lines.append(",".join(str(values.get(column, "")) for column in columns))
+    return ("\n".join(lines) + "\n").encode()
+
+
+def as_ndjson(orders):
+    return b"".join(json.dumps(order, separators=(",", ":")).encode() + b"\n" for order in orders)
+
+
+async def chunks(body):
+    for start in range(0, len(body), CHUNK):
+        yield body[start:start + CHUNK]
+
+
+async def run(client, headers, name, content_type, body, orders):
+    statements = 0
+
+    def count_statement(*_):
+        nonlocal statements
+        statements += 1
+
+    event.listen(Engine, "before_cursor_execute", count_statement)
+    started = time.perf_counter()
+    try:
+        response = await client.post(
+            "/api/v1/orders/import", content=chunks(body), headers={**headers, "Content-Type": content_type}
+        )
+    finally:
+        event.remove(Engine, "before_cursor_execute", count_statement)
+    elapsed = time.perf_counter() - started
+    result = response.json()
+    batches = -(-orders // settings.bulk_batch_size)
+    print(f"{name:>7}: {len(body) / 2 ** 20:6.1f} MiB, {result['created']} imported, {result['rejected']} rejected "
+          f"in {elapsed:.1f}s ({orders / elapsed:,.0f} orders/s), {statements / batches:.1f} SQL per batch")
+
+
+async def main_async(args):
+    upgrade_to_head()
+    token, customer_id, services = seed()
+    headers = {"Authorization": f"Bearer {token}"}
+    orders, bad = make_orders(args.orders, customer_id, services, args.bad_rate, random.Random(args.seed))
+    print(f"{args.orders} orders, {sum(len(order['items']) for order in orders)} items, {bad} invalid")
+
+    await tracking_ids.start()
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+            await run(client, headers, "CSV", "text/csv", as_csv(orders), args.orders)
+            await run(client, headers, "NDJSON", "application/x-ndjson", as_ndjson(orders), args.orders)
+    finally:
+        await tracking_ids.stop()
+        password_pool.shutdown()
+        # A live aiosqlite connection thread would keep the process from exiting
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=100000)
+    parser.add_argument("--bad-rate", type=float, default=0.01, help="Share of orders that should be rejected")
+    parser.add_argument("--seed", type=int, default=1)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Order intake throughput for orders with 1, 10 and 50 items.
+
+Posts orders to /api/v1/orders in-process (httpx ASGI transport) from
+--concurrency clients and reports orders/s, items/s, p50/p99 latency and the
+SQL statements each order ran. Statements per order should stay flat as the
+item count grows; if it climbs with the items, something went back to
+row-at-a-time:
+
+    DATABASE_URL=sqlite:///./bench_orders.db python benchmarks/bench_order_intake.py --orders 500
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.auth import auth_handler, password_pool
+from app.core.database import SessionLocal, async_engine
+from app.core.migrations import upgrade_to_head
+from app.main import app
+from app.models import Customer, ServiceType, User, UserRole
+from app.utils.init_data import initialize_default_data
+
+ITEM_COUNTS = (1, 10, 50)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def seed():
+    """An admin to place orders and a customer to place them for"""
+    initialize_default_data()
+    with SessionLocal() as db:
+        admin = db.query(User).filter(User.email == "bench-orders-admin@example.com").first()
+        if admin is None:
+            admin = User(email="bench-orders-admin@example.com", name="Bench Admin",
+                         hashed_password="x", role=UserRole.ADMIN)
+            customer_user = User(email="bench-orders-customer@example.com", name="Bench Customer",
+                                 hashed_password="x", role=UserRole.CUSTOMER)
+            db.add_all([admin, customer_user])
+            db.flush()
+            db.add(Customer(user_id=customer_user.id))
+            db.commit()
+        customer_user = db.query(User).filter(User.email == "bench-orders-customer@example.com").one()
+        customer_id = db.query(Customer.id).filter(Customer.user_id == customer_user.id).scalar()
+        service_ids = [row.id for row in db.query(ServiceType.id).filter(ServiceType.is_active == True)]
+        return auth_handler.create_user_access_token(admin), customer_id, service_ids
+
+
+async def run(client, headers, body, orders, concurrency):
+    latencies, errors = [], 0
+    remaining = iter(range(orders))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await client.post("/api/v1/orders/", json=body, headers=headers)
+            latencies.append((time.perf_counter() - start) * 1000)
+            errors += response.status_code != 201
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+async def report(client, headers, customer_id, service_ids, args):
+    statements = 0
+
+    def count_statement(*_):
+        nonlocal statements
+        statements += 1
+
+    print(f"{'items':>5}{'orders/s':>10}{'items/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'SQL/order':>11}{'errors':>8}")
+    for item_count in ITEM_COUNTS:
+        body = {
+            "customer_id": customer_id,
+            "items": [{"service_type_id": service_ids[i % len(service_ids)], "quantity": 1 + i % 3}
+                      for i in range(item_count)],
+        }
+        # Warm the auth and pricing caches so every order costs the same
+        await client.post("/api/v1/orders/", json=body, headers=headers)
+
+        statements = 0
+        event.listen(Engine, "before_cursor_execute", count_statement)
+        try:
+            latencies, errors, elapsed = await run(client, headers, body, args.orders, args.concurrency)
+        finally:
+            event.remove(Engine, "before_cursor_execute", count_statement)
+        print(f"{item_count:>5}{args.orders / elapsed:>10.0f}{args.orders * item_count / elapsed:>10.0f}"
+              f"{percentile(latencies, 50):>9.1f}{percentile(latencies, 99):>9.1f}"
+              f"{statements / args.orders:>11.1f}{errors:>8}")
+
+
+async def main_async(args):
+    upgrade_to_head()
+    token, customer_id, service_ids = seed()
+    headers = {"Authorization": f"Bearer {token}"}
+
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            await report(client, headers, customer_id, service_ids, args)
+    finally:
+        password_pool.shutdown()
+        # A live aiosqlite connection thread would keep the process from exiting
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=500, help="Orders per item count")
+    parser.add_argument("--concurrency", type=int, default=10)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
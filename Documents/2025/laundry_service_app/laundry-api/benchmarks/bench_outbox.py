@@ -0,0 +1,137 @@
+"""Status change latency with a slow event consumer, and outbox drain throughput.
+
+Registers a consumer that takes --handler-ms per event (a stand-in for the
+WhatsApp call), moves --orders orders to in-progress through
+PATCH /orders/{id}/status and reports request latency: it should not
+include the consumer's time. Then runs --dispatchers dispatchers side by
+side until the outbox is empty and reports events/s and how many events
+were delivered more than once or not at all (both should be 0):
+
+    DATABASE_URL=sqlite:///./bench_outbox.db python benchmarks/bench_outbox.py --orders 2000 --dispatchers 4
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx
+from sqlalchemy import delete, func, select
+
+from app.core.auth import auth_handler, password_pool
+from app.core.database import AsyncSessionLocal, SessionLocal, async_engine
+from app.core.migrations import upgrade_to_head
+from app.main import app
+from app.models import Customer, Order, OrderStatus, OutboxEvent, User, UserRole
+from app.services.order_events import OrderStatusChanged
+from app.services.outbox import Outbox, outbox
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def seed(orders):
+    with SessionLocal() as db:
+        db.execute(delete(OutboxEvent))
+        admin = User(email=f"bench-outbox-{time.time_ns()}@example.com", name="Bench Outbox",
+                     hashed_password="x", role=UserRole.ADMIN)
+        db.add(admin)
+        db.flush()
+        customer = Customer(user_id=admin.id)
+        db.add(customer)
+        db.flush()
+        rows = [
+            Order(tracking_id=f"BOX{admin.id:04d}{i:08d}", customer_id=customer.id, status=OrderStatus.PENDING,
+                  total_amount=100, discount_amount=0, final_amount=100)
+            for i in range(orders)
+        ]
+        db.add_all(rows)
+        db.commit()
+        return auth_handler.create_user_access_token(admin), [row.id for row in rows]
+
+
+async def change_statuses(client, headers, order_ids, concurrency):
+    latencies = []
+    remaining = iter(order_ids)
+
+    async def worker():
+        for order_id in remaining:
+            start = time.perf_counter()
+            response = await client.patch(f"/api/v1/orders/{order_id}/status",
+                                          json={"status": "in-progress"}, headers=headers)
+            latencies.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+async def drain(dispatchers):
+    async def dispatcher(instance):
+        while await instance.dispatch_batch():
+            pass
+
+    started = time.perf_counter()
+    await asyncio.gather(*(dispatcher(instance) for instance in dispatchers))
+    return time.perf_counter() - started
+
+
+async def main_async(args):
+    upgrade_to_head()
+    token, order_ids = seed(args.orders)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    delivered = Counter()
+
+    async def slow_consumer(event, db):
+        await asyncio.sleep(args.handler_ms / 1000)
+        delivered[event.order_id] += 1
+
+    outbox.register("bench", OrderStatusChanged, slow_consumer)
+    dispatchers = [
+        Outbox(batch_size=args.batch_size, concurrency=args.concurrency, poll_interval=0.1,
+               lease_seconds=60, max_attempts=3)
+        for _ in range(args.dispatchers)
+    ]
+    for instance in dispatchers:
+        instance.register("bench", OrderStatusChanged, slow_consumer)
+
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            latencies = await change_statuses(client, headers, order_ids, args.clients)
+        print(f"PATCH status x{len(latencies)}: p50 {percentile(latencies, 50):.1f} ms, "
+              f"p99 {percentile(latencies, 99):.1f} ms (consumer takes {args.handler_ms:.0f} ms per event)")
+
+        async with AsyncSessionLocal() as db:
+            queued = await db.scalar(select(func.count()).select_from(OutboxEvent)
+                                     .where(OutboxEvent.consumer == "bench"))
+        elapsed = await drain(dispatchers)
+        duplicates = sum(count - 1 for count in delivered.values() if count > 1)
+        missing = len(set(order_ids) - delivered.keys())
+        print(f"drained {queued} events with {args.dispatchers} dispatcher(s) in {elapsed:.2f}s: "
+              f"{queued / elapsed:.0f} events/s, {duplicates} duplicate(s), {missing} missing")
+    finally:
+        password_pool.shutdown()
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--clients", type=int, default=10, help="Concurrent PATCH requests")
+    parser.add_argument("--handler-ms", type=float, default=200)
+    parser.add_argument("--dispatchers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=50, help="Events in flight per dispatcher")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Offset vs cursor pagination latency for deep pages.
+
+Seeds a points-transaction table and times fetching page 1, 10, 100 and
+1000 (50 rows per page) through app.core.pagination.paginate, once with
+the legacy offset and once with a keyset cursor:
+
+    python benchmarks/bench_pagination.py --database-url sqlite:///./bench.db --rows 200000
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.core.pagination import encode_cursor, paginate
+from app.models import Customer, PointsTransaction, TransactionType, User, UserRole
+
+
+def seed(session, rows):
+    existing = session.scalar(select(func.count(PointsTransaction.id)))
+    if existing >= rows:
+        return
+    user = User(email="bench@example.com", name="Bench", hashed_password="x", role=UserRole.CUSTOMER)
+    session.add(user)
+    session.flush()
+    customer = Customer(user_id=user.id)
+    session.add(customer)
+    session.flush()
+    batch = 10000
+    for start in range(existing, rows, batch):
+        session.execute(insert(PointsTransaction), [
+            {
+                "customer_id": customer.id,
+                "transaction_type": TransactionType.BONUS,
+                "points": 1,
+                "description": f"bench {i}",
+            }
+            for i in range(start, min(start + batch, rows))
+        ])
+    session.commit()
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default="sqlite:///./bench_pagination.db")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    with Session() as session:
+        seed(session, args.rows)
+        ids = session.scalars(select(PointsTransaction.id).order_by(PointsTransaction.id)).all()
+
+    print(f"{'page':>6}{'offset ms':>12}{'cursor ms':>12}")
+    for page in (1, 10, 100, 1000):
+        offset = (page - 1) * args.limit
+        if offset >= len(ids):
+            break
+        cursor = encode_cursor(ids[offset - 1]) if offset else None
+        with Session() as session:
+            query = session.query(PointsTransaction)
+            by_offset = timed(lambda: paginate(query, PointsTransaction.id, args.limit, offset=offset), args.repeat)
+            by_cursor = timed(lambda: paginate(query, PointsTransaction.id, args.limit, cursor=cursor), args.repeat)
+        print(f"{page:>6}{by_offset:>12.2f}{by_cursor:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Counter search latency on the in-process trigram index.
+
+Fills a SearchIndex with --orders synthetic orders (tracking IDs like the
+generator's, a note on about one in five) and --customers customers, then
+times --queries searches of each kind the counter types: a fragment of a
+tracking ID, a whole one, a misspelt customer name, a fragment of a phone
+number and a word from a note. Reports p50/p99 per kind; p99 should stay
+under 20 ms at 1M orders. The PostgreSQL backend is covered by the pg_trgm
+indexes; tests/test_query_plans.py checks their plans:
+
+    DATABASE_URL=sqlite:///./bench_search.db python benchmarks/bench_search.py --orders 1000000
+"""
+import argparse
+import gc
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.ids import encode_base32
+from app.services.search import SearchIndex, digits
+
+FIRST = ["Amina", "Jonathan", "Grace", "Kwame", "Fatima", "Daniel", "Esther", "Ibrahim", "Mary", "Samuel",
+         "Joyce", "Peter", "Halima", "David", "Ruth", "Emmanuel", "Zainab", "Michael", "Blessing", "Yusuf"]
+LAST = ["Okafor", "Smithers", "Mensah", "Abubakar", "Adeyemi", "Mwangi", "Banda", "Osei", "Nkosi", "Diallo",
+        "Kamau", "Ochieng", "Boateng", "Eze", "Traore", "Moyo", "Phiri", "Juma", "Owusu", "Sesay"]
+NOTES = ["collar stain", "no starch", "rush before friday", "delicate silk, hand wash", "missing button",
+         "wine stain on sleeve", "fold, do not hang", "customer brings hangers", "fragrance free detergent"]
+NOTE_WORDS = sorted({word for note in NOTES for word in note.replace(",", "").split() if len(word) >= 3})
+TARGET_MS = 20
+
+
+def build(orders, customers, rng):
+    index = SearchIndex(refresh_seconds=0)
+    index.enabled = True
+    tracking_ids = []
+    for order_id in range(1, orders + 1):
+        tracking_id = "LP" + encode_base32(rng.getrandbits(60))
+        tracking_ids.append(tracking_id)
+        index.add_order(order_id, tracking_id, rng.choice(NOTES) if rng.random() < 0.2 else None)
+    people = []
+    for customer_id in range(1, customers + 1):
+        name = f"{rng.choice(FIRST)} {rng.choice(LAST)} {rng.choice(FIRST)[:3]}{rng.randrange(1000)}"
+        phone = f"+1 555 {rng.randrange(10 ** 7):07d}"
+        people.append((name, phone))
+        index.names.add(customer_id, name)
+        index.phones.add(customer_id, digits(phone))
+    return index, tracking_ids, people
+
+
+def misspell(text, rng):
+    """Swap two neighbouring letters"""
+    position = rng.randrange(1, len(text) - 1)
+    while " " in text[position:position + 2]:
+        position = rng.randrange(1, len(text) - 1)
+    return text[:position] + text[position + 1] + text[position] + text[position + 2:]
+
+
+def queries(kind, tracking_ids, people, rng):
+    if kind == "tracking fragment":
+        tracking_id = rng.choice(tracking_ids)
+        start = rng.randrange(2, len(tracking_id) - 6)
+        return tracking_id[start:start + 6]
+    if kind == "tracking id":
+        return rng.choice(tracking_ids)
+    if kind == "name typo":
+        return misspell(rng.choice(people)[0].rsplit(" ", 1)[0], rng)
+    if kind == "phone fragment":
+        phone = digits(rng.choice(people)[1])
+        return phone[-7:-4] + "-" + phone[-4:]
+    return rng.choice(NOTE_WORDS)  # the endpoint takes 3 characters or more
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=1000000)
+    parser.add_argument("--customers", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    started = time.perf_counter()
+    index, tracking_ids, people = build(args.orders, args.customers, rng)
+    print(f"Indexed {args.orders} orders and {args.customers} customers in {time.perf_counter() - started:.1f}s")
+    # The index holds no GC-tracked objects, but the generated lists here would be rescanned on every collection
+    gc.freeze()
+
+    slowest = 0.0
+    for kind in ("tracking fragment", "tracking id", "name typo", "phone fragment", "note word"):
+        timings, found = [], 0
+        for _ in range(args.queries):
+            query = queries(kind, tracking_ids, people, rng)
+            started = time.perf_counter()
+            customer_hits, order_hits = index.search(query, args.limit)
+            timings.append((time.perf_counter() - started) * 1000)
+            found += bool(customer_hits or order_hits)
+        p99 = statistics.quantiles(timings, n=100)[98]
+        slowest = max(slowest, p99)
+        print(f"{kind:>17}: p50 {statistics.median(timings):6.2f} ms  p99 {p99:6.2f} ms  "
+              f"{found}/{args.queries} with hits")
+    print(f"{'ok' if slowest < TARGET_MS else 'SLOW'}: p99 {slowest:.2f} ms (target {TARGET_MS} ms)")
+
+
+if __name__ == "__main__":
+    main()
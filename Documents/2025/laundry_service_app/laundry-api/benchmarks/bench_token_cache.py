@@ -0,0 +1,33 @@
+"""Cost of authenticating one access token: full jwt.decode vs the verified-token cache.
+
+    python benchmarks/bench_token_cache.py --iterations 100000
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.auth import auth_handler, token_cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50000)
+    args = parser.parse_args()
+
+    token = auth_handler.create_access_token({"sub": "42"})
+    cases = [
+        ("jwt.decode (uncached)", lambda: auth_handler.decode_token(token)),
+        ("get_current_user_id, cache miss", lambda: (token_cache.clear(), auth_handler.get_current_user_id(token))),
+        ("get_current_user_id, cache hit", lambda: auth_handler.get_current_user_id(token)),
+    ]
+    print(f"{'case':<34} {'us/op':>8}")
+    for name, fn in cases:
+        best = min(timeit.repeat(fn, number=args.iterations, repeat=3))
+        print(f"{name:<34} {best / args.iterations * 1_000_000:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Order tracking lookup latency: cached snapshot vs DB load, and a miss stampede.
+
+Seeds --orders orders, then measures /orders/track/{tracking_id}:
+
+  * snapshot hit - tracking_snapshots.get() on a warm cache (the part the
+    cache controls; target well under a millisecond)
+  * endpoint hit / endpoint miss - the full endpoint in-process (httpx ASGI
+    transport), with a warm cache and with the cache disabled
+  * stampede - --clients concurrent requests for one order right after its
+    snapshot is dropped; counts the DB statements they caused (should be 1)
+
+    DATABASE_URL=sqlite:///./bench_tracking.db python benchmarks/bench_tracking.py --lookups 5000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx
+from sqlalchemy import func, select
+
+from app.core.auth import password_pool
+from app.core.database import SessionLocal, async_engine
+from app.core.migrations import upgrade_to_head
+from app.core.query_guard import assert_max_statements
+from app.main import app
+from app.models import Customer, Order, OrderStatus, OrderStatusHistory, User, UserRole
+from app.services.tracking import tracking_snapshots
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def seed(orders):
+    with SessionLocal() as db:
+        existing = db.scalar(select(func.count(Order.id)))
+        if existing < orders:
+            user = User(email=f"bench-tracking-{existing}@example.com", name="Bench Tracking",
+                        hashed_password="x", role=UserRole.CUSTOMER)
+            db.add(user)
+            db.flush()
+            customer = Customer(user_id=user.id)
+            db.add(customer)
+            db.flush()
+            for i in range(existing, orders):
+                order = Order(tracking_id=f"BENCH{i:08d}", customer_id=customer.id, status=OrderStatus.PENDING,
+                              total_amount=100, discount_amount=0, final_amount=100)
+                db.add(order)
+                db.flush()
+                db.add(OrderStatusHistory(order_id=order.id, status=OrderStatus.PENDING, notes="Order created"))
+            db.commit()
+        return [row.tracking_id for row in db.query(Order.tracking_id).limit(orders)]
+
+
+async def timed(call, keys, lookups):
+    samples = []
+    for i in range(lookups):
+        start = time.perf_counter()
+        await call(keys[i % len(keys)])
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+def row(name, samples):
+    print(f"{name:<16}{len(samples):>8}{percentile(samples, 50):>10.1f}{percentile(samples, 99):>10.1f}")
+
+
+async def report(client, keys, args):
+    async def endpoint(key):
+        response = await client.get(f"/api/v1/orders/track/{key}")
+        response.raise_for_status()
+
+    for key in keys:
+        await tracking_snapshots.get(key)
+
+    print(f"{'lookup':<16}{'count':>8}{'p50 us':>10}{'p99 us':>10}")
+    row("snapshot hit", await timed(tracking_snapshots.get, keys, args.lookups))
+    row("endpoint hit", await timed(endpoint, keys, args.lookups))
+
+    maxsize = tracking_snapshots.cache.maxsize
+    tracking_snapshots.cache.maxsize = 0
+    try:
+        row("endpoint miss", await timed(endpoint, keys, min(args.lookups, 2000)))
+    finally:
+        tracking_snapshots.cache.maxsize = maxsize
+
+    tracking_snapshots.cache.delete(keys[0])
+    with assert_max_statements(10 ** 6) as statements:
+        await asyncio.gather(*(endpoint(keys[0]) for _ in range(args.clients)))
+    print(f"\nstampede: {args.clients} concurrent misses for one order -> {len(statements)} DB statement(s)")
+
+
+async def main_async(args):
+    upgrade_to_head()
+    keys = seed(args.orders)
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await report(client, keys, args)
+    finally:
+        password_pool.shutdown()
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=1000)
+    parser.add_argument("--lookups", type=int, default=5000)
+    parser.add_argument("--clients", type=int, default=500)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Tracking ID generation rate and collisions: old random-suffix IDs vs the generator.
+
+Generates --count IDs with each scheme from --threads threads and reports
+IDs/s and how many came out duplicated. The old scheme (last 6 digits of
+the timestamp plus 4 hex chars of a uuid4) has only 65536 codes per second,
+so a burst collides within a few hundred IDs; the generator must report 0:
+
+    DATABASE_URL=sqlite:///./bench_ids.db python benchmarks/bench_tracking_ids.py --count 1000000
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.ids import TrackingIdGenerator
+
+
+def old_tracking_id():
+    timestamp = str(int(time.time()))[-6:]
+    random_part = str(uuid.uuid4())[:4].upper()
+    return f"LP{timestamp}{random_part}"
+
+
+def run(generate, count, threads):
+    per_thread = count // threads
+
+    def batch(_):
+        return [generate() for _ in range(per_thread)]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        batches = list(pool.map(batch, range(threads)))
+    elapsed = time.perf_counter() - started
+    codes = [code for codes in batches for code in codes]
+    return len(codes) / elapsed, len(codes) - len(set(codes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8])
+    args = parser.parse_args()
+
+    # A fixed node keeps the database out of the measurement; the wide drift budget lets bursts run ahead
+    generator = TrackingIdGenerator("LP", b"bench-tracking-ids", lease_seconds=60, max_drift_seconds=60, node_id=1)
+    print(f"{'scheme':<12}{'threads':>8}{'IDs/s':>12}{'duplicates':>12}")
+    for threads in args.threads:
+        for name, generate in (("old", old_tracking_id), ("generator", generator.next)):
+            rate, duplicates = run(generate, args.count, threads)
+            print(f"{name:<12}{threads:>8}{rate:>12.0f}{duplicates:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import os
+import sys
+import tempfile
+import uuid
+
+# Settings are read at import time: point the app at a throwaway database first
+os.environ["DATABASE_URL"] = os.environ.get("DATABASE_URL_TEST") or (
+    f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='laundry-tests-'), 'test.db')}"
+)
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["LOGIN_RATE_LIMIT_ENABLED"] = "false"
+os.environ["CACHE_INVALIDATION_REDIS"] = "false"
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.auth import auth_handler
+from app.core.database import SessionLocal
+from app.core.migrations import upgrade_to_head
+from app.main import app
+from app.models import Customer, User, UserRole, Worker
+from app.utils.init_data import DEFAULT_ADMIN, DEFAULT_ADMIN_PASSWORD, initialize_default_data
+
+PASSWORD = "test-secret"
+
+
+@pytest.fixture(scope="session")
+def client():
+    upgrade_to_head()
+    initialize_default_data()
+    # One lifespan per session: shutdown closes the bcrypt pool for good
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def login(client, email, password=PASSWORD):
+    response = client.post("/api/v1/auth/login", json={"email": email, "password": password})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture(scope="session")
+def admin_headers(client):
+    return bearer(login(client, DEFAULT_ADMIN["email"], DEFAULT_ADMIN_PASSWORD)["access_token"])
+
+
+@pytest.fixture
+def make_user(client):
+    """Create an active user of a role (with its customer or worker row); returns the User"""
+    def make(role=UserRole.CUSTOMER, **fields):
+        with SessionLocal() as db:
+            user = User(
+                email=f"{role.value}-{uuid.uuid4().hex[:8]}@example.com", name=fields.pop("name", role.value.title()),
+                role=role, hashed_password=auth_handler.hash_password(PASSWORD), **fields,
+            )
+            db.add(user)
+            db.flush()
+            if role == UserRole.CUSTOMER:
+                db.add(Customer(user_id=user.id))
+            elif role == UserRole.WORKER:
+                db.add(Worker(user_id=user.id, employee_id=f"T{user.id}"))
+            db.commit()
+            db.refresh(user)
+            db.expunge(user)
+            return user
+    return make
@@ -0,0 +1,86 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from app.core.database import SessionLocal
+from app.models import OrderStatus, UserRole, Worker
+from app.services.assignment import AssignmentScheduler
+from app.services.order_events import OrderStatusChanged
+
+
+def scheduler(loads):
+    """A scheduler over workers 1..n (Worker.id 10x user id) with one open order of loads[i] hours each"""
+    scheduler = AssignmentScheduler(refresh_seconds=60)
+    scheduler.reset(
+        {user_id: user_id * 10 for user_id in range(1, len(loads) + 1)},
+        [(100 + user_id, user_id, hours) for user_id, hours in enumerate(loads, start=1)],
+    )
+    return scheduler
+
+
+def load_of(scheduler, user_id):
+    row = next(row for row in scheduler.snapshot() if row["user_id"] == user_id)
+    return row["remaining_hours"], row["open_orders"]
+
+
+def status_changed(order_id, status):
+    return OrderStatusChanged(
+        order_id=order_id, tracking_id="LPTEST", customer_id=1, assigned_to_id=None, status=status,
+        final_amount=Decimal("10.00"), estimated_completion_time=None, completed_at=None, history_id=1,
+        notes=None, changed_by_id=None, at=datetime.utcnow(),
+    )
+
+
+def test_assign_picks_the_least_loaded_worker():
+    workers = scheduler([5.0, 1.0, 3.0])
+    assert workers.assign(2.0) == 2
+    # 2 and 3 now both carry 3h; fewer open orders wins
+    assert workers.assign(2.0) == 3
+    assert load_of(workers, 2) == (3.0, 2) and load_of(workers, 3) == (5.0, 2)
+    assert workers.assign(0.5) == 2
+
+
+@pytest.mark.parametrize("status", [OrderStatus.READY, OrderStatus.COMPLETED, OrderStatus.CANCELLED])
+def test_leaving_the_queue_frees_the_load(status):
+    workers = scheduler([4.0, 1.0])
+    workers.add(200, 1, 2.0)
+    assert load_of(workers, 1) == (6.0, 2)
+    workers.on_status_changed(status_changed(200, status))
+    assert load_of(workers, 1) == (4.0, 1)
+    workers.on_status_changed(status_changed(200, status))  # released once only
+    assert load_of(workers, 1) == (4.0, 1)
+
+
+def test_in_progress_keeps_the_load():
+    workers = scheduler([4.0])
+    workers.on_status_changed(status_changed(101, OrderStatus.IN_PROGRESS))
+    assert load_of(workers, 1) == (4.0, 1)
+
+
+def test_unreserve_restores_the_snapshot():
+    workers = scheduler([5.0, 1.0, 3.0])
+    before = workers.snapshot()
+    user_id = workers.assign(4.0)
+    assert workers.snapshot() != before
+    workers.unreserve(user_id, 4.0)
+    assert workers.snapshot() == before
+    assert workers.assign(4.0) == user_id
+
+
+def test_inactive_workers_are_never_picked(client, make_user):
+    active = make_user(UserRole.WORKER)
+    inactive_user = make_user(UserRole.WORKER, is_active=False)
+    inactive_worker = make_user(UserRole.WORKER)
+    with SessionLocal() as db:
+        db.query(Worker).filter(Worker.user_id == inactive_worker.id).update({"is_active": False})
+        db.commit()
+
+    workers = AssignmentScheduler(refresh_seconds=60)
+    workers.refresh()
+    listed = {row["user_id"] for row in workers.snapshot()}
+    assert active.id in listed
+    assert not listed & {inactive_user.id, inactive_worker.id}
+    # Idle inactive workers would otherwise be the least loaded of all
+    picked = {workers.assign(1.0) for _ in range(3 * len(listed))}
+    assert active.id in picked and not picked & {inactive_user.id, inactive_worker.id}
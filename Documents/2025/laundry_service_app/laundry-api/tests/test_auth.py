@@ -0,0 +1,48 @@
+import pytest
+
+from app.core.auth import auth_handler
+from app.models import UserRole
+from tests.conftest import bearer, login
+
+PROTECTED = ["/api/v1/auth/me", "/api/v1/orders/", "/api/v1/admin/metrics"]
+
+
+@pytest.mark.parametrize("path", PROTECTED)
+def test_refresh_token_is_not_an_access_token(client, make_user, path):
+    user = make_user(UserRole.ADMIN)
+    tokens = login(client, user.email)
+    assert client.get(path, headers=bearer(tokens["access_token"])).status_code == 200
+    assert client.get(path, headers=bearer(tokens["refresh_token"])).status_code == 401
+
+
+def test_rotated_and_logged_out_refresh_tokens_are_not_access_tokens(client, make_user):
+    user = make_user(UserRole.ADMIN)
+    tokens = login(client, user.email)
+    rotated = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert rotated.status_code == 200
+    assert client.get("/api/v1/auth/me", headers=bearer(tokens["refresh_token"])).status_code == 401
+
+    current = rotated.json()
+    response = client.post("/api/v1/auth/logout", json={"refresh_token": current["refresh_token"]},
+                           headers=bearer(current["access_token"]))
+    assert response.status_code == 200
+    assert client.get("/api/v1/auth/me", headers=bearer(current["refresh_token"])).status_code == 401
+
+
+def test_token_without_role_and_version_claims_is_refused(client, make_user):
+    user = make_user(UserRole.ADMIN)
+    token = auth_handler.create_access_token({"sub": str(user.id)})
+    assert client.get("/api/v1/orders/", headers=bearer(token)).status_code == 401
+    assert client.get("/api/v1/auth/me", headers=bearer(token)).status_code == 401
+
+
+def test_token_with_an_old_version_is_refused(client, admin_headers, make_user):
+    user = make_user(UserRole.WORKER)
+    headers = bearer(login(client, user.email)["access_token"])
+    assert client.get("/api/v1/orders/", headers=headers).status_code == 200
+    # Deactivating and reactivating bumps token_version twice
+    for active in (False, True):
+        response = client.put(f"/api/v1/users/{user.id}", json={"is_active": active}, headers=admin_headers)
+        assert response.status_code == 200
+    assert client.get("/api/v1/orders/", headers=headers).status_code == 401
+    assert client.get("/api/v1/orders/", headers=bearer(login(client, user.email)["access_token"])).status_code == 200
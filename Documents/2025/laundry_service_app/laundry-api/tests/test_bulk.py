@@ -0,0 +1,114 @@
+import json
+import uuid
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import Customer, ServiceType
+
+
+def customer_with_points(make_user, points):
+    user = make_user()
+    with SessionLocal() as db:
+        customer = db.query(Customer).filter(Customer.user_id == user.id).one()
+        customer.loyalty_points = points
+        db.commit()
+        return customer.id
+
+
+def balance(customer_id):
+    with SessionLocal() as db:
+        return db.get(Customer, customer_id).loyalty_points
+
+
+def txn(customer_id, transaction_type, points):
+    return {"customer_id": customer_id, "transaction_type": transaction_type, "points": points,
+            "description": "bulk test"}
+
+
+def service(name, price=5.0):
+    return {"name": name, "category": "wash", "base_price": price}
+
+
+def ndjson(rows):
+    return "\n".join(json.dumps(row) for row in rows) + "\n"
+
+
+def test_points_bulk_rejects_rows_by_index(client, admin_headers, make_user):
+    customer_id = customer_with_points(make_user, 0)
+    response = client.post("/api/v1/loyalty/points/bulk", headers=admin_headers, json=[
+        txn(customer_id, "earned", 10),
+        txn(customer_id, "earned", "lots"),
+        txn(999999999, "earned", 10),
+        txn(customer_id, "bonus", 5),
+    ])
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert (body["created"], body["rejected"]) == (2, 2)
+    assert [(row["index"], row["status"]) for row in body["results"]] == [
+        (0, "created"), (1, "rejected"), (2, "rejected"), (3, "created"),
+    ]
+    assert "points" in body["results"][1]["error"]
+    assert body["results"][2]["error"] == "Customer not found"
+    assert balance(customer_id) == 15
+
+
+def test_points_bulk_clamps_the_balance_at_zero(client, admin_headers, make_user):
+    customer_id = customer_with_points(make_user, 30)
+    response = client.post("/api/v1/loyalty/points/bulk", headers=admin_headers, json=[
+        txn(customer_id, "redeemed", 50),
+        txn(customer_id, "earned", 5),
+    ])
+    assert response.json()["created"] == 2
+    # -50 + 5 on 30 is applied as one delta per batch, then clamped
+    assert balance(customer_id) == 0
+
+
+def test_services_bulk_upserts_and_rejects_duplicate_names(client, admin_headers):
+    name = f"Bulk service {uuid.uuid4().hex[:8]}"
+    response = client.post("/api/v1/services/bulk", headers=admin_headers, json=[
+        service(name, 5.0), service(name, 7.0), service(f"{name} B"),
+    ])
+    body = response.json()
+    assert (body["upserted"], body["rejected"]) == (2, 1)
+    assert body["results"][1] == {"index": 1, "status": "rejected", "id": None,
+                                  "error": "Duplicate name in request (first at row 0)"}
+
+    # A second request updates the existing row by name
+    again = client.post("/api/v1/services/bulk", headers=admin_headers, json=[service(name, 9.0)]).json()
+    assert again["results"][0]["id"] == body["results"][0]["id"]
+    with SessionLocal() as db:
+        assert db.query(ServiceType).filter(ServiceType.name == name).one().base_price == 9.0
+
+
+def test_bulk_accepts_ndjson_like_a_json_array(client, admin_headers):
+    name = f"Bulk ndjson {uuid.uuid4().hex[:8]}"
+    rows = [service(f"{name} A"), {"name": f"{name} B"}]
+    as_json = client.post("/api/v1/services/bulk", headers=admin_headers, json=rows).json()
+    as_ndjson = client.post("/api/v1/services/bulk", content=ndjson(rows),
+                            headers={**admin_headers, "Content-Type": "application/x-ndjson"}).json()
+    assert [(row["index"], row["status"]) for row in as_ndjson["results"]] == [(0, "upserted"), (1, "rejected")]
+    assert as_ndjson["results"] == as_json["results"]
+
+
+def test_bulk_empty_bodies(client, admin_headers):
+    url = "/api/v1/services/bulk"
+    empty = {"created": 0, "upserted": 0, "rejected": 0, "results": []}
+    assert client.post(url, headers=admin_headers, json=[]).json() == empty
+    assert client.post(url, content=b"", headers={**admin_headers, "Content-Type": "application/x-ndjson"}).json() \
+        == empty
+    assert client.post(url, content=b"", headers={**admin_headers, "Content-Type": "application/json"}) \
+        .status_code == 400
+    assert client.post(url, headers=admin_headers, json={"name": "not an array"}).status_code == 422
+
+
+def test_bulk_max_rows(client, admin_headers, monkeypatch):
+    monkeypatch.setattr(settings, "bulk_max_rows", 2)
+    name = f"Bulk limit {uuid.uuid4().hex[:8]}"
+    rows = [service(f"{name} {i}") for i in range(3)]
+    response = client.post("/api/v1/services/bulk", content=ndjson(rows),
+                           headers={**admin_headers, "Content-Type": "application/x-ndjson"})
+    assert response.status_code == 413
+    assert response.json()["detail"] == "Too many rows (max 2)"
+    assert client.post("/api/v1/services/bulk", headers=admin_headers, json=rows[:2]).json()["upserted"] == 2
+    with SessionLocal() as db:
+        assert db.query(ServiceType).filter(ServiceType.name == f"{name} 2").count() == 0
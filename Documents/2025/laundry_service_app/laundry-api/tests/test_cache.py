@@ -0,0 +1,59 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core.cache import InvalidationBus
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.mark.asyncio
+async def test_invalidation_publish_queues_and_reaches_subscribers(monkeypatch):
+    import redis.asyncio as aioredis
+
+    server = fakeredis.FakeServer()
+    publish_threads = []
+
+    class RecordingRedis(fakeredis.aioredis.FakeRedis):
+        async def publish(self, channel, message):
+            publish_threads.append(threading.get_ident())
+            return await super().publish(channel, message)
+
+    monkeypatch.setattr(aioredis, "from_url", lambda url, **kwargs: RecordingRedis(server=server))
+    bus = InvalidationBus("redis://test")
+    received = asyncio.Queue()
+    bus.register("token_version", received.put_nowait)
+    await bus.start()
+    try:
+        await asyncio.sleep(0.05)  # let the listener subscribe
+        bus.publish("token_version", 7)
+        # Publishing from the threadpool (sync endpoints, services) goes through the same queue
+        await asyncio.to_thread(bus.publish, "token_version", 8)
+        assert {await asyncio.wait_for(received.get(), 2), await asyncio.wait_for(received.get(), 2)} == {"7", "8"}
+        assert set(publish_threads) == {threading.get_ident()}
+    finally:
+        await bus.stop()
+    bus.publish("token_version", 9)  # stopped: a no-op, not an error
+
+
+@pytest.mark.asyncio
+async def test_invalidation_publish_never_blocks_on_redis(monkeypatch):
+    import redis.asyncio as aioredis
+
+    class UnreachableRedis(fakeredis.aioredis.FakeRedis):
+        async def publish(self, channel, message):
+            await asyncio.sleep(10)
+
+    monkeypatch.setattr(aioredis, "from_url", lambda url, **kwargs: UnreachableRedis())
+    bus = InvalidationBus("redis://test", max_pending=1)
+    await bus.start()
+    try:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for key in range(5):
+            bus.publish("pricing_config", key)
+        await asyncio.sleep(0.05)
+        assert loop.time() - started < 1
+    finally:
+        await bus.stop()
@@ -0,0 +1,102 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+
+from app.services.eta import EtaEngine
+
+NOW = 1_700_000_000.0
+HOUR = 3600.0
+
+
+def engine(threshold_seconds=600):
+    # Washing runs one hour of work per hour, ironing two
+    return EtaEngine(default_capacity=1.0, category_capacity={"iron": 2.0}, threshold_seconds=threshold_seconds,
+                     flush_interval=60, refresh_seconds=300, session_factory=None)
+
+
+def at(seconds):
+    return datetime.fromtimestamp(seconds, timezone.utc)
+
+
+def queue(eta, orders, now=NOW):
+    """Quote and add (order id, work) in arrival order; returns the quotes"""
+    quotes = {}
+    for order_id, work in orders:
+        quotes[order_id] = eta.quote(work, now=now)
+        eta.add(order_id, f"LP{order_id}", work, quotes[order_id], arrival=now)
+    return quotes
+
+
+def test_quotes_grow_with_the_backlog_of_each_category():
+    eta = engine()
+    quotes = queue(eta, [(1, {"wash": (2.0, 1.0)}), (2, {"wash": (2.0, 1.0)}), (3, {"iron": (4.0, 1.0)})])
+    assert quotes == {1: at(NOW + 2 * HOUR), 2: at(NOW + 4 * HOUR), 3: at(NOW + 2 * HOUR)}
+
+    # Each category only counts its own queue; an order needing both waits for the slower one
+    assert eta.quote({"wash": (1.0, 1.0)}, now=NOW) == at(NOW + 5 * HOUR)
+    assert eta.quote({"iron": (1.0, 1.0)}, now=NOW) == at(NOW + 2.5 * HOUR)
+    assert eta.quote({"wash": (1.0, 1.0), "iron": (1.0, 1.0)}, now=NOW) == at(NOW + 5 * HOUR)
+    # Never sooner than the longest item, however empty the queue
+    assert eta.quote({"dry-clean": (1.0, 3.0)}, now=NOW) == at(NOW + 3 * HOUR)
+
+
+def test_head_release_moves_the_anchor():
+    eta = engine()
+    queue(eta, [(1, {"wash": (2.0, 1.0)}), (2, {"wash": (2.0, 1.0)}), (3, {"wash": (2.0, 1.0)})])
+
+    # The head finished an hour early: the rest of the queue now starts from then
+    eta.release(1, now=NOW + HOUR)
+    assert eta.quote({"wash": (2.0, 1.0)}, now=NOW + HOUR) == at(NOW + 7 * HOUR)
+    assert eta.recompute(now=NOW + HOUR) == [(2, "LP2", NOW + 3 * HOUR), (3, "LP3", NOW + 5 * HOUR)]
+
+    # Leaving from the middle only takes its own work out; the anchor stays
+    eta.release(3, now=NOW + 2 * HOUR)
+    assert eta.quote({"wash": (2.0, 1.0)}, now=NOW + 2 * HOUR) == at(NOW + 5 * HOUR)
+
+
+def test_only_etas_that_moved_past_the_threshold_are_written():
+    eta = engine(threshold_seconds=600)
+    queue(eta, [(1, {"wash": (2.0, 1.0)}), (2, {"wash": (2.0, 1.0)}), (3, {"wash": (2.0, 1.0)}),
+                (4, {"iron": (8.0, 1.0)})])
+    assert eta.recompute(now=NOW) == []  # nothing left the queues
+
+    # Five minutes early: the wash orders move by less than the threshold, ironing not at all
+    eta.release(1, now=NOW + 2 * HOUR - 300)
+    assert eta.recompute(now=NOW + 2 * HOUR - 300) == []
+
+    # Order 2 is done 1h25m early: order 3 moves by 1h30m against what was last written
+    eta.release(2, now=NOW + 2.5 * HOUR)
+    assert eta.recompute(now=NOW + 2.5 * HOUR) == [(3, "LP3", NOW + 4.5 * HOUR)]
+
+
+class RecordingSession:
+    """Async session stand-in that keeps what flush() writes"""
+
+    def __init__(self, written):
+        self.written = written
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement, params):
+        self.written.extend((row["order_id"], row["eta"]) for row in params)
+
+    async def commit(self):
+        pass
+
+
+def test_flush_writes_only_the_moved_etas():
+    written = []
+    eta = engine()
+    eta.session_factory = lambda: RecordingSession(written)
+    now = time.time()
+    queue(eta, [(1, {"wash": (2.0, 1.0)}), (2, {"wash": (2.0, 1.0)}), (3, {"iron": (2.0, 1.0)})], now=now)
+
+    eta.release(1)  # two hours early: order 2 moves, ironing does not
+    assert asyncio.run(eta.flush()) == 1
+    assert [order_id for order_id, _ in written] == [2]
+    assert abs(written[0][1].timestamp() - (now + 2 * HOUR)) < 60
+    assert asyncio.run(eta.flush()) == 0
@@ -0,0 +1,169 @@
+import threading
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from app.core.database import SessionLocal
+from app.models import Customer, Notification, NotificationPreference, OutboxEvent, TransactionType, UserRole
+from app.services.notification_service import NotificationNotSent, notification_service
+from app.services.order_events import OrderCreated, PointsChanged
+from app.services.outbox import Outbox, outbox
+
+
+def customer_of(user):
+    with SessionLocal() as db:
+        return db.query(Customer.id).filter(Customer.user_id == user.id).scalar()
+
+
+def order_created(customer_id):
+    return OrderCreated(order_id=1, tracking_id="LPTEST", customer_id=customer_id,
+                        final_amount=Decimal("10.00"), at=datetime.utcnow())
+
+
+def test_outbox_consumers_keep_sync_db_work_off_the_event_loop(client, make_user, monkeypatch):
+    user = make_user(UserRole.CUSTOMER, phone="+15550001")
+    with SessionLocal() as db:
+        customer_id = db.query(Customer.id).filter(Customer.user_id == user.id).scalar()
+
+    threads = []
+    store = notification_service._store_notification
+
+    def recording_store(db, request):
+        threads.append(threading.get_ident())
+        return store(db, request)
+
+    monkeypatch.setattr(notification_service, "_store_notification", recording_store)
+
+    async def deliver():
+        loop_thread = threading.get_ident()
+        errors = []
+        for handler, event in (
+            (notification_service.on_order_created, order_created(customer_id)),
+            (notification_service.on_points_changed,
+             PointsChanged(customer_id=customer_id, transaction_id=1, transaction_type=TransactionType.EARNED,
+                           points=10, order_id=None)),
+        ):
+            try:
+                await handler(event, None)
+            except NotificationNotSent as e:
+                errors.append(str(e))
+        return loop_thread, errors
+
+    loop_thread, errors = client.portal.call(deliver)
+    assert len(threads) == 2 and loop_thread not in threads
+    # No approved templates in the test database: raised for the outbox to retry
+    assert errors == ["Template not found or not approved"] * 2
+
+
+def test_notifications_router_mounted(client):
+    paths = {route.path for route in client.app.routes}
+    assert "/api/v1/notifications/" in paths
+    assert "/api/v1/notifications/templates" in paths
+    assert not any(path.startswith("/api/v1/notificaions") for path in paths)
+
+
+def test_templates_paginate(client, admin_headers):
+    for number in range(3):
+        created = client.post("/api/v1/notifications/templates", headers=admin_headers, json={
+            "name": f"page-test-{number}", "notification_type": "custom",
+            "template_name": f"page_test_{number}", "body_text": "Hello {{1}}",
+        })
+        assert created.status_code == 201, created.text
+    first = client.get("/api/v1/notifications/templates", params={"limit": 2}, headers=admin_headers)
+    assert first.status_code == 200
+    rest = client.get("/api/v1/notifications/templates", params={"cursor": first.headers["X-Next-Cursor"]},
+                      headers=admin_headers)
+    ids = [row["id"] for row in first.json() + rest.json()]
+    assert len(ids) == len(set(ids)) >= 3
+
+
+def test_notification_metadata_round_trips(client, admin_headers, make_user):
+    user = make_user(UserRole.CUSTOMER)
+    with SessionLocal() as db:
+        customer_id = db.query(Customer.id).filter(Customer.user_id == user.id).scalar()
+    created = client.post("/api/v1/notifications/", headers=admin_headers, json={
+        "customer_id": customer_id, "notification_type": "custom", "recipient_phone": "+15550002",
+        "message_text": "Your order is in", "metadata": {"source": "counter"},
+    })
+    assert created.status_code == 201, created.text
+    assert created.json()["metadata"] == {"source": "counter"}
+    listed = client.get("/api/v1/notifications/", params={"limit": 200}, headers=admin_headers).json()
+    assert created.json()["id"] in [row["id"] for row in listed]
+
+
+@pytest.fixture
+def notifications_outbox(client):
+    """An outbox with only the notification consumer; the app's dispatcher is paused meanwhile"""
+    client.portal.call(outbox.stop)
+    test_outbox = Outbox(batch_size=10, concurrency=1, poll_interval=1, lease_seconds=30, max_attempts=5)
+    test_outbox.register("notifications", OrderCreated, notification_service.on_order_created)
+    yield test_outbox
+    with SessionLocal() as db:
+        db.query(OutboxEvent).filter(OutboxEvent.consumer == "notifications").delete()
+        db.commit()
+    client.portal.call(outbox.start)
+
+
+def queue(test_outbox, event):
+    with SessionLocal() as db:
+        test_outbox.add(db, [event])
+        db.commit()
+        return db.query(OutboxEvent.id).order_by(OutboxEvent.id.desc()).first()[0]
+
+
+def stored_with_approved_template(db, request):
+    notification = Notification(customer_id=request.customer_id, notification_type=request.notification_type,
+                                recipient_phone="+15550003", template_name=request.template_name,
+                                message_text="Your order is in")
+    db.add(notification)
+    db.commit()
+    db.refresh(notification)
+    return notification
+
+
+def test_failed_send_stays_queued_for_retry(client, make_user, notifications_outbox, monkeypatch):
+    customer_id = customer_of(make_user(UserRole.CUSTOMER, phone="+15550003"))
+
+    async def whatsapp_down(notification):
+        return {"success": False, "error": "WhatsApp unavailable"}
+
+    monkeypatch.setattr(notification_service, "_store_notification", stored_with_approved_template)
+    monkeypatch.setattr(notification_service, "_send_whatsapp_notification", whatsapp_down)
+    row_id = queue(notifications_outbox, order_created(customer_id))
+
+    assert client.portal.call(notifications_outbox.dispatch_batch) == 1
+    with SessionLocal() as db:
+        row = db.get(OutboxEvent, row_id)
+        assert row is not None
+        assert row.attempts == 1
+        assert row.last_error == "WhatsApp unavailable"
+
+
+def test_store_error_stays_queued_for_retry(client, make_user, notifications_outbox, monkeypatch):
+    customer_id = customer_of(make_user(UserRole.CUSTOMER, phone="+15550004"))
+
+    def database_down(db, request):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(notification_service, "_store_notification", database_down)
+    row_id = queue(notifications_outbox, order_created(customer_id))
+
+    client.portal.call(notifications_outbox.dispatch_batch)
+    with SessionLocal() as db:
+        row = db.get(OutboxEvent, row_id)
+        assert row is not None and row.attempts == 1
+        assert row.last_error == "database is locked"
+
+
+def test_opted_out_customer_acks_the_event(client, make_user, notifications_outbox):
+    customer_id = customer_of(make_user(UserRole.CUSTOMER, phone="+15550005"))
+    with SessionLocal() as db:
+        db.add(NotificationPreference(customer_id=customer_id, whatsapp_opted_in=False))
+        db.commit()
+    row_id = queue(notifications_outbox, order_created(customer_id))
+
+    client.portal.call(notifications_outbox.dispatch_batch)
+    with SessionLocal() as db:
+        assert db.get(OutboxEvent, row_id) is None
+
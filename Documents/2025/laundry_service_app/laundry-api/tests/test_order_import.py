@@ -0,0 +1,40 @@
+from app.models import UserRole
+from app.services.assignment import assignment_scheduler
+from app.services.order_import import OrderImporter
+from tests.test_orders import customer_id_of
+
+
+def import_orders(client, headers, orders):
+    response = client.post("/api/v1/orders/import", json=orders, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()["results"]
+
+
+def test_only_active_workers_can_be_assigned(client, admin_headers, make_user):
+    customer = make_user()
+    worker, inactive = make_user(UserRole.WORKER), make_user(UserRole.WORKER, is_active=False)
+    order = {"customer_id": customer_id_of(customer), "items": [{"service": "Shirt Wash", "quantity": 1}]}
+
+    results = import_orders(client, admin_headers, [
+        {**order, "assigned_to_id": worker.id},
+        {**order, "assigned_to_id": customer.id},
+        {**order, "assigned_to_id": inactive.id},
+        {**order, "captured_by_id": customer.id},
+    ])
+    assert [result["status"] for result in results] == ["created", "rejected", "rejected", "rejected"]
+    assert "not an active worker" in results[1]["error"] and "not active staff" in results[3]["error"]
+
+
+def test_failed_batch_releases_reserved_workers(client, admin_headers, make_user, monkeypatch):
+    make_user(UserRole.WORKER)
+    assignment_scheduler.refresh()
+    load = assignment_scheduler.snapshot()
+
+    async def failing_write(self, prepared):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(OrderImporter, "_write", failing_write)
+    order = {"customer_id": customer_id_of(make_user()), "items": [{"service": "Shirt Wash", "quantity": 3}]}
+    results = import_orders(client, admin_headers, [order, order])
+    assert all(result["status"] == "rejected" and "disk full" in result["error"] for result in results)
+    assert assignment_scheduler.snapshot() == load
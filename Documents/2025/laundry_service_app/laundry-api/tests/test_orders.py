@@ -0,0 +1,162 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import SessionLocal
+from app.core.query_guard import assert_max_statements
+from app.models import Customer, Order, OrderStatusHistory, ServiceType, UserRole
+from app.services.assignment import assignment_scheduler
+from app.services.eta import eta_engine
+from app.services.order_events import OrderStatusChanged, order_events
+from app.services.search import search_index
+from tests.conftest import bearer, login
+
+
+def customer_id_of(user):
+    with SessionLocal() as db:
+        return db.query(Customer.id).filter(Customer.user_id == user.id).scalar()
+
+
+def create_order(client, headers, customer_id, **fields):
+    with SessionLocal() as db:
+        service_id = db.query(ServiceType.id).filter(ServiceType.is_active == True).order_by(ServiceType.id).first()[0]
+    body = {"customer_id": customer_id, "items": [{"service_type_id": service_id, "quantity": 2}], **fields}
+    response = client.post("/api/v1/orders/", json=body, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def test_status_change_is_recorded_under_the_caller(client, make_user):
+    worker, other = make_user(UserRole.WORKER), make_user(UserRole.WORKER)
+    headers = bearer(login(client, worker.email)["access_token"])
+    order = create_order(client, headers, customer_id_of(make_user()))
+
+    response = client.patch(f"/api/v1/orders/{order['id']}/status",
+                            json={"status": "in-progress", "updated_by_id": other.id}, headers=headers)
+    assert response.status_code == 200
+    response = client.patch("/api/v1/orders/status",
+                            json={"order_ids": [order["id"]], "status": "ready", "updated_by_id": other.id},
+                            headers=headers)
+    assert response.json()["updated"] == [order["id"]]
+
+    with SessionLocal() as db:
+        rows = db.query(OrderStatusHistory.status, OrderStatusHistory.updated_by_id).filter(
+            OrderStatusHistory.order_id == order["id"]
+        )
+        recorded = {status.value: updated_by_id for status, updated_by_id in rows}
+    assert recorded["in-progress"] == worker.id and recorded["ready"] == worker.id
+
+
+def test_failed_commit_leaves_no_phantom_order_in_memory(client, admin_headers, make_user, monkeypatch):
+    make_user(UserRole.WORKER)
+    assignment_scheduler.refresh()
+    customer_id = customer_id_of(make_user())
+    load = assignment_scheduler.snapshot()
+    queued, indexed = len(eta_engine._orders), len(search_index.tracking)
+
+    async def failing_commit(self):
+        raise RuntimeError("commit failed")
+
+    monkeypatch.setattr(AsyncSession, "commit", failing_commit)
+    with pytest.raises(RuntimeError):
+        create_order(client, admin_headers, customer_id)
+    monkeypatch.undo()
+
+    assert assignment_scheduler.snapshot() == load
+    assert len(eta_engine._orders) == queued and len(search_index.tracking) == indexed
+
+    order = create_order(client, admin_headers, customer_id)
+    assert order["assigned_to_id"] is not None
+    assert order["id"] in eta_engine._orders and order["id"] in search_index.tracking._values
+    assert assignment_scheduler.snapshot() != load
+
+
+def move(client, headers, order_id, status):
+    return client.patch(f"/api/v1/orders/{order_id}/status", json={"status": status}, headers=headers)
+
+
+def completed_order(client, headers, customer_id):
+    order = create_order(client, headers, customer_id)
+    for status in ("in-progress", "ready", "completed"):
+        assert move(client, headers, order["id"], status).status_code == 200
+    return order
+
+
+@pytest.fixture
+def status_events():
+    """OrderStatusChanged events as published, with the order's status another connection saw then"""
+    seen = []
+
+    def record(event):
+        with SessionLocal() as db:
+            seen.append((event.order_id, event.status.value, db.get(Order, event.order_id).status.value))
+
+    order_events.subscribe(OrderStatusChanged, record)
+    yield seen
+    order_events._handlers[OrderStatusChanged].remove(record)
+
+
+def test_illegal_moves_conflict(client, admin_headers, make_user):
+    customer_id = customer_id_of(make_user())
+    pending = create_order(client, admin_headers, customer_id)
+    response = move(client, admin_headers, pending["id"], "ready")
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Cannot move an order from pending to ready"
+
+    completed = completed_order(client, admin_headers, customer_id)
+    response = move(client, admin_headers, completed["id"], "cancelled")
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Cannot move an order from completed to cancelled"
+    assert move(client, admin_headers, 999999999, "ready").status_code == 404
+
+
+def test_completion_times_set_by_the_status_update(client, admin_headers, make_user):
+    order = create_order(client, admin_headers, customer_id_of(make_user()))
+    for status in ("in-progress", "ready"):
+        move(client, admin_headers, order["id"], status)
+    with assert_max_statements(100, requests_only=True) as statements:
+        response = move(client, admin_headers, order["id"], "completed")
+    assert response.status_code == 200
+
+    updates = [sql for sql in statements if sql.lstrip().upper().startswith("UPDATE ORDERS")]
+    assert len(updates) == 1
+    assert "completed_at" in updates[0] and "actual_completion_time" in updates[0]
+    with SessionLocal() as db:
+        row = db.get(Order, order["id"])
+        assert row.completed_at is not None and row.completed_at == row.actual_completion_time
+
+
+def test_bulk_status_change_reports_each_order(client, admin_headers, make_user, status_events):
+    customer_id = customer_id_of(make_user())
+    movable = create_order(client, admin_headers, customer_id)
+    stuck = completed_order(client, admin_headers, customer_id)
+    status_events.clear()
+
+    response = client.patch("/api/v1/orders/status", headers=admin_headers, json={
+        "order_ids": [movable["id"], stuck["id"], 999999999], "status": "in-progress",
+    })
+    assert response.status_code == 200
+    assert response.json() == {
+        "updated": [movable["id"]],
+        "rejected": [
+            {"order_id": stuck["id"], "error": "Cannot move an order from completed to in-progress"},
+            {"order_id": 999999999, "error": "Order not found"},
+        ],
+    }
+    assert status_events == [(movable["id"], "in-progress", "in-progress")]
+
+
+def test_status_event_published_only_after_commit(client, admin_headers, make_user, status_events, monkeypatch):
+    order = create_order(client, admin_headers, customer_id_of(make_user()))
+
+    # Another connection already sees the new status when the event arrives
+    assert move(client, admin_headers, order["id"], "in-progress").status_code == 200
+    assert status_events == [(order["id"], "in-progress", "in-progress")]
+
+    async def failing_commit(self):
+        raise RuntimeError("commit failed")
+
+    monkeypatch.setattr(AsyncSession, "commit", failing_commit)
+    with pytest.raises(RuntimeError):
+        move(client, admin_headers, order["id"], "ready")
+    monkeypatch.undo()
+    assert len(status_events) == 1
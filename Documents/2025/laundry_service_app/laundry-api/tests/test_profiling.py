@@ -0,0 +1,53 @@
+import re
+
+from sqlalchemy import text
+
+from app.core.database import AsyncSessionLocal
+from app.core.profiling import current_profile
+from app.models import UserRole
+from app.services.order_events import OrderStatusChanged, order_events
+from tests.test_orders import create_order, customer_id_of
+
+_ENTRY = re.compile(r'(\w+);dur=([\d.]+)(?:;desc="(\d+) queries")?')
+
+
+def server_timing(response):
+    """{metric: duration ms} plus the reported query count"""
+    entries = _ENTRY.findall(response.headers["Server-Timing"])
+    durations = {name: float(duration) for name, duration, _ in entries}
+    queries = next(int(count) for name, _, count in entries if name == "db")
+    return durations, queries
+
+
+def test_server_timing_breakdown_adds_up(client, admin_headers):
+    response = client.get("/api/v1/customers/", params={"limit": 5}, headers=admin_headers)
+    durations, queries = server_timing(response)
+    assert list(durations) == ["db", "external", "app", "total"]
+    assert queries >= 1 and durations["db"] > 0
+    # Each part is rounded to 0.1ms on its own
+    assert durations["db"] + durations["external"] + durations["app"] <= durations["total"] + 0.2
+
+
+def test_background_handler_queries_are_not_charged_to_the_request(client, admin_headers, make_user):
+    customer_id = customer_id_of(make_user(UserRole.CUSTOMER))
+    quiet, busy = (create_order(client, admin_headers, customer_id) for _ in range(2))
+    baseline = client.patch(f"/api/v1/orders/{quiet['id']}/status", json={"status": "in-progress"},
+                            headers=admin_headers)
+
+    profiles = []
+
+    async def busy_handler(event):
+        profiles.append(current_profile())
+        async with AsyncSessionLocal() as db:
+            for _ in range(10):
+                await db.execute(text("SELECT 1"))
+
+    order_events.subscribe(OrderStatusChanged, busy_handler)
+    try:
+        response = client.patch(f"/api/v1/orders/{busy['id']}/status", json={"status": "in-progress"},
+                                headers=admin_headers)
+        client.portal.call(order_events.drain)
+    finally:
+        order_events._handlers[OrderStatusChanged].remove(busy_handler)
+    assert profiles == [None]
+    assert server_timing(response)[1] == server_timing(baseline)[1]
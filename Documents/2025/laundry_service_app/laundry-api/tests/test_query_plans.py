@@ -0,0 +1,173 @@
+"""EXPLAIN the hot queries on a seeded database and fail on any full table scan.
+
+Runs on a scratch SQLite database by default. Set PLAN_CHECK_DATABASE_URL to a
+throwaway PostgreSQL database to check its plans, including the counter search
+statements that need the pg_trgm indexes; the seed writes directly to the tables.
+"""
+import json
+import os
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, func, insert, select, text, union_all
+
+from app.core.migrations import upgrade_to_head
+from app.models import (
+    Customer, MessageStatus, Notification, NotificationType, Order, OrderItem,
+    OrderStatus, OrderStatusHistory, PointsTransaction, ServiceCategory, ServiceType,
+    TransactionType, User, UserRole,
+)
+from app.services.search import customer_matches, order_match_arms
+
+ROWS = int(os.environ.get("PLAN_CHECK_ROWS", "20000"))
+
+NOW = datetime.utcnow()
+SINCE = NOW - timedelta(days=30)
+
+# (name, statement) pairs mirroring the queries the endpoints and services run
+HOT_QUERIES = [
+    ("customer orders page",
+     select(Order).where(Order.customer_id == 7).order_by(Order.id).limit(51)),
+    ("customer points page",
+     select(PointsTransaction).where(PointsTransaction.customer_id == 7).order_by(PointsTransaction.id).limit(51)),
+    ("orders by status",
+     select(Order).where(Order.status == OrderStatus.PENDING).order_by(Order.created_at).limit(50)),
+    ("worker queue",
+     select(Order).where(Order.assigned_to_id == 3, Order.status == OrderStatus.IN_PROGRESS)),
+    ("recent orders",
+     select(func.count(Order.id)).where(Order.created_at >= SINCE)),
+    ("order items",
+     select(OrderItem).where(OrderItem.order_id == 42)),
+    ("order status history",
+     select(OrderStatusHistory).where(OrderStatusHistory.order_id == 42).order_by(OrderStatusHistory.created_at)),
+    ("notification stats",
+     select(func.count(Notification.id)).where(
+         Notification.status == MessageStatus.DELIVERED, Notification.created_at >= SINCE)),
+    ("notification stats per customer",
+     select(func.count(Notification.id)).where(
+         Notification.customer_id == 7, Notification.created_at >= SINCE)),
+    ("notifications sent since",
+     select(func.count(Notification.id)).where(Notification.created_at >= NOW - timedelta(hours=24))),
+    ("failed notifications to retry",
+     select(Notification).where(Notification.status == MessageStatus.FAILED, Notification.retry_count < 3)),
+]
+
+# Trigram searches; SQLite has no such index and searches in process instead
+POSTGRES_QUERIES = [
+    ("search tracking ids and notes", union_all(*order_match_arms("0001234", 20))),
+    ("search customer names and phones", select(customer_matches("Plan 123", 20))),
+]
+
+
+def seed(conn, rows):
+    if conn.scalar(select(func.count(Order.id))) >= rows:
+        return
+    rng = random.Random(0)
+    customers, workers = max(rows // 100, 10), 20
+
+    def ago():
+        return NOW - timedelta(days=rng.random() * 365)
+
+    conn.execute(insert(User), [
+        {"email": f"plan{i}@example.com", "name": f"Plan {i}", "hashed_password": "x",
+         "role": UserRole.CUSTOMER if i < customers else UserRole.WORKER}
+        for i in range(customers + workers)
+    ])
+    user_ids = conn.scalars(select(User.id).where(User.email.like("plan%")).order_by(User.id)).all()
+    worker_ids = user_ids[customers:]
+    conn.execute(insert(Customer), [{"user_id": user_id} for user_id in user_ids[:customers]])
+    customer_ids = conn.scalars(select(Customer.id)).all()
+    conn.execute(insert(ServiceType), [{
+        "name": "Plan check wash", "category": ServiceCategory.WASH, "base_price": 10,
+    }])
+    service_id = conn.scalar(select(ServiceType.id))
+
+    statuses, message_statuses = list(OrderStatus), list(MessageStatus)
+    batch = 5000
+    for start in range(0, rows, batch):
+        count = min(batch, rows - start)
+        conn.execute(insert(Order), [{
+            "tracking_id": f"PLAN{start + i:09d}",
+            "customer_id": rng.choice(customer_ids),
+            "status": rng.choice(statuses),
+            "assigned_to_id": rng.choice(worker_ids),
+            "total_amount": 10, "final_amount": 10,
+            "created_at": ago(),
+        } for i in range(count)])
+        conn.execute(insert(Notification), [{
+            "customer_id": rng.choice(customer_ids),
+            "notification_type": NotificationType.STATUS_UPDATE,
+            "recipient_phone": "+27000000000",
+            "message_text": "plan check",
+            "status": rng.choice(message_statuses),
+            "retry_count": rng.randrange(5),
+            "created_at": ago(),
+        } for _ in range(count)])
+        conn.execute(insert(PointsTransaction), [{
+            "customer_id": rng.choice(customer_ids),
+            "transaction_type": TransactionType.EARNED,
+            "points": 10,
+            "description": "plan check",
+        } for _ in range(count)])
+
+    order_ids = conn.scalars(select(Order.id)).all()
+    for start in range(0, len(order_ids), batch):
+        chunk = order_ids[start:start + batch]
+        conn.execute(insert(OrderItem), [{
+            "order_id": order_id, "service_type_id": service_id,
+            "quantity": 1, "price_per_item": 10, "total_price": 10,
+        } for order_id in chunk])
+        conn.execute(insert(OrderStatusHistory), [{
+            "order_id": order_id, "status": OrderStatus.PENDING, "created_at": ago(),
+        } for order_id in chunk])
+
+
+def explain(conn, sql):
+    """Return (plan lines, full-scan lines) for one statement"""
+    if conn.dialect.name == "sqlite":
+        lines = [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+        scans = [line for line in lines if line.startswith("SCAN ") and " INDEX " not in line]
+        return lines, scans
+
+    if conn.dialect.name == "postgresql":
+        plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar()
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        lines, scans, stack = [], [], [plan[0]["Plan"]]
+        while stack:
+            node = stack.pop()
+            line = f"{node['Node Type']} {node.get('Relation Name', '')} {node.get('Index Name', '')}".strip()
+            lines.append(line)
+            if node["Node Type"] == "Seq Scan":
+                scans.append(line)
+            stack.extend(node.get("Plans", []))
+        return lines, scans
+
+    pytest.skip(f"No plan check for {conn.dialect.name}")
+
+
+@pytest.fixture(scope="module")
+def plan_engine(tmp_path_factory):
+    database_url = os.environ.get("PLAN_CHECK_DATABASE_URL") or (
+        f"sqlite:///{tmp_path_factory.mktemp('plans') / 'plans.db'}"
+    )
+    upgrade_to_head(database_url)
+    engine = create_engine(database_url)
+    with engine.begin() as conn:
+        seed(conn, ROWS)
+        # Fresh statistics so the planner sees the seeded row counts
+        conn.execute(text("ANALYZE"))
+    yield engine
+    engine.dispose()
+
+
+@pytest.mark.parametrize("name, statement", HOT_QUERIES + POSTGRES_QUERIES, ids=[
+    name for name, _ in HOT_QUERIES + POSTGRES_QUERIES
+])
+def test_hot_query_uses_an_index(plan_engine, name, statement):
+    if name in dict(POSTGRES_QUERIES) and plan_engine.dialect.name != "postgresql":
+        pytest.skip("trigram indexes are PostgreSQL only")
+    sql = str(statement.compile(dialect=plan_engine.dialect, compile_kwargs={"literal_binds": True}))
+    with plan_engine.connect() as conn:
+        lines, scans = explain(conn, sql)
+    assert not scans, f"{name}: full table scan\n" + "\n".join(lines)
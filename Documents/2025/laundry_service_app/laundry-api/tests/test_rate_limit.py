@@ -0,0 +1,44 @@
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.core import rate_limit
+from app.core.rate_limit import LoginRateLimiter, MemorySlidingWindow, client_ip
+
+
+def make_request(peer, *forwarded_for):
+    headers = [(b"x-forwarded-for", value.encode()) for value in forwarded_for]
+    return Request({"type": "http", "headers": headers, "client": (peer, 40000)})
+
+
+@pytest.fixture
+def trusted(monkeypatch):
+    monkeypatch.setattr(rate_limit, "_trusted_proxies", rate_limit._networks(["10.0.0.0/8", "192.168.1.1"]))
+
+
+def test_forwarded_for_ignored_from_untrusted_peer(trusted):
+    assert client_ip(make_request("203.0.113.9", "198.51.100.1")) == "203.0.113.9"
+
+
+def test_client_ip_taken_through_trusted_proxies(trusted):
+    request = make_request("10.0.0.5", "1.2.3.4, 198.51.100.7, 192.168.1.1")
+    # 1.2.3.4 was supplied by the client and could be forged; 198.51.100.7 is the first untrusted hop
+    assert client_ip(request) == "198.51.100.7"
+    assert client_ip(make_request("10.0.0.5", "198.51.100.7", "10.1.1.1")) == "198.51.100.7"
+    assert client_ip(make_request("10.0.0.5")) == "10.0.0.5"
+
+
+def test_no_trusted_proxies_uses_peer(monkeypatch):
+    monkeypatch.setattr(rate_limit, "_trusted_proxies", [])
+    assert client_ip(make_request("10.0.0.5", "198.51.100.7")) == "10.0.0.5"
+
+
+@pytest.mark.asyncio
+async def test_clients_behind_one_proxy_throttled_separately(trusted):
+    limiter = LoginRateLimiter(MemorySlidingWindow(), per_ip=2, per_email=100, window=60)
+    for attempt in range(2):
+        await limiter.check(client_ip(make_request("10.0.0.5", "198.51.100.1")), f"a{attempt}@example.com")
+    with pytest.raises(HTTPException) as raised:
+        await limiter.check(client_ip(make_request("10.0.0.5", "198.51.100.1")), "a3@example.com")
+    assert raised.value.status_code == 429
+    await limiter.check(client_ip(make_request("10.0.0.5", "198.51.100.2")), "b@example.com")
@@ -0,0 +1,106 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from jose import jwt
+from sqlalchemy import func
+
+from app.core.bloom import BloomFilter
+from app.core.database import AsyncSessionLocal, SessionLocal
+from app.core.query_guard import assert_max_statements
+from app.core.revocation import RevocationStore, family_key, revocation_store
+from app.models import RevokedToken
+from tests.conftest import bearer, login
+
+
+def refresh(client, token):
+    return client.post("/api/v1/auth/refresh", json={"refresh_token": token})
+
+
+def checks_total(result):
+    return revocation_store._checks[result].snapshot()["value"]
+
+
+def test_refresh_rotates_within_the_family(client, make_user):
+    user = make_user()
+    first = login(client, user.email)["refresh_token"]
+    claims = jwt.get_unverified_claims(first)
+    assert claims.get("jti") and claims.get("fam")
+
+    response = refresh(client, first)
+    assert response.status_code == 200
+    second = response.json()["refresh_token"]
+    assert second != first
+    assert jwt.get_unverified_claims(second)["fam"] == claims["fam"]
+
+
+def test_unrevoked_token_checked_without_sql(client, make_user):
+    claims = jwt.get_unverified_claims(login(client, make_user().email)["refresh_token"])
+
+    async def revoked():
+        async with AsyncSessionLocal() as db:
+            with assert_max_statements(0):
+                return await revocation_store.revoked(db, [claims["jti"], family_key(claims["fam"])])
+
+    assert client.portal.call(revoked) == set()
+
+
+def test_reuse_of_a_rotated_token_ends_the_session(client, make_user):
+    user = make_user()
+    first = login(client, user.email)["refresh_token"]
+    second = refresh(client, first).json()["refresh_token"]
+
+    # An attacker replays the rotated-out token: it fails, and so does the current one
+    assert refresh(client, first).status_code == 401
+    assert refresh(client, second).status_code == 401
+    assert refresh(client, login(client, user.email)["refresh_token"]).status_code == 200
+
+
+def test_logout_revokes_the_refresh_token(client, make_user):
+    session = login(client, make_user().email)
+    response = client.post("/api/v1/auth/logout", json={"refresh_token": session["refresh_token"]},
+                           headers=bearer(session["access_token"]))
+    assert response.status_code == 200
+    assert refresh(client, session["refresh_token"]).status_code == 401
+
+
+def test_bloom_false_positive_falls_back_to_the_table(client, make_user):
+    token = login(client, make_user().email)["refresh_token"]
+    # The filter says "maybe revoked", the table says no
+    revocation_store.add(jwt.get_unverified_claims(token)["jti"])
+    before = checks_total("false_positive")
+    assert refresh(client, token).status_code == 200
+    assert checks_total("false_positive") == before + 1
+
+
+def test_bloom_false_positive_rate_at_capacity():
+    bloom = BloomFilter(10000, 0.01)
+    for _ in range(10000):
+        bloom.add(uuid.uuid4().hex)
+    rate = sum(uuid.uuid4().hex in bloom for _ in range(100000)) / 100000
+    assert rate <= 0.02
+
+
+def test_incremental_sync_picks_up_a_late_commit(client):
+    store = RevocationStore(capacity=1000, error_rate=0.01, sync_seconds=30)
+    client.portal.call(store.sync, True)
+    expires_at = datetime.now(timezone.utc) + timedelta(days=1)
+
+    def revoke(row_id):
+        key = f"late-commit-{uuid.uuid4().hex}"
+        with SessionLocal() as db:
+            db.add(RevokedToken(id=row_id, jti=key, expires_at=expires_at))
+            db.commit()
+        return key
+
+    with SessionLocal() as db:
+        top = db.query(func.max(RevokedToken.id)).scalar() or 0
+    early = revoke(top + 20)
+    client.portal.call(store.sync)
+    # Inserted before the row above but committed after the sync saw it
+    late = revoke(top + 10)
+    client.portal.call(store.sync)
+    assert early in store.filter and late in store.filter
+    # Re-reading the overlap does not count known keys again
+    count = store.filter.count
+    client.portal.call(store.sync)
+    assert store.filter.count == count
@@ -0,0 +1,90 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import text, update
+
+from app.core import database, replicas
+from app.core.database import SessionLocal, engine
+from app.core.replicas import ReplicaRouter
+from app.models import ServiceType, UserRole
+from tests.conftest import bearer, login
+
+REPLICA_ONLY = "Replica-only service"
+
+
+@pytest.fixture
+def replica(client, tmp_path, monkeypatch):
+    """A router over a copy of the test database that also has a REPLICA_ONLY service"""
+    if engine.dialect.name != "sqlite":
+        pytest.skip("the replica is a copy of the SQLite test database")
+    path = tmp_path / "replica.db"
+    source, copy = sqlite3.connect(engine.url.database), sqlite3.connect(path)
+    source.backup(copy)
+    copy.execute("INSERT INTO service_types (name, category, base_price, is_active) VALUES (?, 'WASH', 1, 1)",
+                 (REPLICA_ONLY,))
+    copy.commit()
+    source.close()
+    copy.close()
+
+    router = ReplicaRouter([f"sqlite:///{path}"], health_check_seconds=60, sticky_seconds=60)
+    monkeypatch.setattr(database, "replica_router", router)
+    yield router
+    for state in router.replicas:
+        state.engine.dispose()
+
+
+def served_by_replica(client, headers):
+    response = client.get("/api/v1/services/", headers=headers)
+    assert response.status_code == 200, response.text
+    return REPLICA_ONLY in {service["name"] for service in response.json()}
+
+
+def test_list_reads_go_to_the_replica(client, admin_headers, replica):
+    assert served_by_replica(client, admin_headers)
+
+
+def test_writer_reads_its_writes_from_the_primary(client, admin_headers, make_user, replica):
+    reader = bearer(login(client, make_user(UserRole.WORKER).email)["access_token"])
+    response = client.post("/api/v1/services/", headers=admin_headers,
+                           json={"name": "Primary-only service", "category": "wash", "base_price": 2})
+    assert response.status_code == 201
+    assert not served_by_replica(client, admin_headers)
+    assert served_by_replica(client, reader)  # other clients still use the replica
+
+
+def test_core_bulk_write_pins_the_writer(client, admin_headers, replica):
+    response = client.post("/api/v1/services/bulk", headers=admin_headers,
+                           json=[{"name": "Bulk primary service", "category": "wash", "base_price": 2}])
+    assert response.json()["upserted"] == 1
+    assert not served_by_replica(client, admin_headers)
+
+
+def test_core_update_marks_the_session_as_written(replica):
+    with SessionLocal() as db:
+        db.info["client_key"] = "core-writer"
+        db.execute(update(ServiceType).where(ServiceType.id == -1).values(base_price=1))
+        db.commit()
+    assert replica.is_sticky("core-writer")
+
+    with SessionLocal() as db:
+        db.info["client_key"] = "plain-reader"
+        db.execute(text("SELECT 1"))
+        db.commit()
+    assert not replica.is_sticky("plain-reader")
+
+
+def test_unreachable_replica_falls_back_to_the_primary(client, admin_headers, tmp_path, monkeypatch):
+    router = ReplicaRouter([f"sqlite:///{tmp_path / 'missing' / 'replica.db'}"], health_check_seconds=60)
+    monkeypatch.setattr(database, "replica_router", router)
+    assert not served_by_replica(client, admin_headers)
+    assert router.status()[0]["healthy"] is False
+
+
+def test_lagging_replica_falls_back_to_the_primary(client, admin_headers, replica, monkeypatch):
+    state = replica.replicas[0]
+    # Check the replica as PostgreSQL would report 30s of lag
+    monkeypatch.setattr(state.engine.dialect, "name", "postgresql")
+    monkeypatch.setattr(replicas, "POSTGRES_LAG_QUERY", text("SELECT 30"))
+    state.checked_at = 0.0
+    assert not served_by_replica(client, admin_headers)
+    assert replica.status()[0]["lag_seconds"] == 30.0 and replica.status()[0]["healthy"] is False
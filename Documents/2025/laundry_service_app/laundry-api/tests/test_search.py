@@ -0,0 +1,89 @@
+import pytest
+
+from app.models import UserRole
+from app.services.search import SearchIndex, TrigramField, _pattern, search_index
+from tests.test_orders import create_order, customer_id_of
+
+
+def field(values, **kwargs):
+    index = TrigramField(**kwargs)
+    for doc_id, value in enumerate(values, start=1):
+        index.add(doc_id, value)
+    return index
+
+
+def ids(matches):
+    return [doc_id for _, doc_id in matches]
+
+
+def test_partial_tracking_id():
+    tracking = field(["LP0Q8ZK3VN7D2M", "LP7H2MXR4QWE9A", "LP3NB6TY1KD0PZ"])
+    assert ids(tracking.search("zk3vn", 10)) == [1]
+    assert ids(tracking.search("LP7H2M", 10)) == [2]
+
+
+def test_typo_in_a_name():
+    names = field(["Margaret Thompson", "Peter Johnson", "Maggie Thomas"])
+    assert ids(names.search("Margret Tomson", 10))[0] == 1
+    assert names.search("Xavier Quinn", 10) == []
+
+
+def test_phone_digits_whatever_the_formatting():
+    index = SearchIndex(refresh_seconds=60)
+    index.names = field(["Ada Obi", "Ben Cole"])
+    index.phones = field(["15550102233", "447700900123"])
+    customers, _ = index.search("555-010", 10)
+    assert customers == {1: (customers[1][0], "phone")}
+    customers, _ = index.search("+44 7700 900", 10)
+    assert list(customers) == [2]
+
+
+def test_a_word_of_the_notes():
+    notes = field(["Please use a gentle cycle for the silk blouse", "Starch the collars", None], word=True)
+    assert ids(notes.search("silk", 10)) == [1]
+    assert ids(notes.search("colars", 10)) == [2]  # one letter off, still most of its trigrams
+    assert notes.search("cotton", 10) == []
+
+
+@pytest.mark.parametrize("query", ["%", "_", "%%%", "___", "%_%"])
+def test_like_metacharacters_match_nothing(query):
+    names = field(["Margaret Thompson", "50% off_season"])
+    assert names.search(query, 10) == []
+
+
+def test_like_pattern_escapes_metacharacters():
+    # The pg_trgm backend matches with ILIKE ... ESCAPE '\\'
+    assert _pattern("50%_off") == "%50\\%\\_off%"
+    assert _pattern("a\\b") == "%a\\\\b%"
+
+
+def test_ranking_best_match_first_and_newest_among_equals():
+    names = field(["Anna Smith", "Anna Smithson", "Hanna Smyth", "Anna Smith"])
+    ranked = names.search("Anna Smith", 10)
+    assert ids(ranked)[:2] == [4, 1]  # exact matches, the newest first
+    assert ranked[0][0] == 1.0 and ranked[2][0] < 1.0
+    assert ids(ranked)[2] == 2
+    assert ids(names.search("Anna Smith", 1)) == [4]
+
+
+def test_counter_search_end_to_end(client, admin_headers, make_user):
+    if not search_index.enabled:
+        pytest.skip("search runs on pg_trgm here")
+    user = make_user(name="Zephyrine Quillfeather", phone="+1 (555) 013-7788")
+    order = create_order(client, admin_headers, customer_id_of(user), notes="Delicate cashmere sweater")
+    search_index.refresh()
+
+    def found(q):
+        response = client.get("/api/v1/search/", params={"q": q}, headers=admin_headers)
+        assert response.status_code == 200, response.text
+        body = response.json()
+        return ({hit["customer_id"]: hit["matched"] for hit in body["customers"]},
+                {hit["order_id"]: hit["matched"] for hit in body["orders"]})
+
+    customer_id = customer_id_of(user)
+    assert found(order["tracking_id"][3:10])[1][order["id"]] == "tracking_id"
+    assert found("Zefyrine Quilfeather")[0] == {customer_id: "name"}
+    customers, orders = found("555 013 77")
+    assert customers == {customer_id: "phone"} and orders[order["id"]] == "phone"
+    assert found("cashmere")[1][order["id"]] == "notes"
+    assert found("%%%") == ({}, {}) and found("___") == ({}, {})
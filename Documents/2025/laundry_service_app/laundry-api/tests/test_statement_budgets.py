@@ -0,0 +1,129 @@
+"""Endpoints stay within their @statement_budget; an N+1 shows up as "201 statements executed, budget is 1"."""
+import contextvars
+import threading
+
+import pytest
+from sqlalchemy import text
+
+from app.core.auth import token_version_cache
+from app.core.database import SessionLocal
+from app.core.profiling import start_profile
+from app.core.query_guard import StatementBudgetExceeded, assert_endpoint_budget, assert_max_statements
+from app.core.revocation import revocation_store
+from app.models import Customer, ServiceType, User, UserRole, Worker
+from app.services.assignment import assignment_scheduler
+from app.services.eta import eta_engine
+from app.services.outbox import outbox
+from app.services.search import search_index
+
+SEED_ROWS = 200
+
+READS = [
+    ("/api/v1/customers/", "/api/v1/customers/?limit=200"),
+    ("/api/v1/customers/{customer_id}", "/api/v1/customers/{customer_id}"),
+    ("/api/v1/workers/", "/api/v1/workers/?limit=200"),
+    ("/api/v1/workers/load", "/api/v1/workers/load"),
+    ("/api/v1/workers/{worker_id}", "/api/v1/workers/{worker_id}"),
+    ("/api/v1/orders/", "/api/v1/orders/?limit=200"),
+    ("/api/v1/orders/{order_id}", "/api/v1/orders/{order_id}"),
+    ("/api/v1/orders/track/{tracking_id}", "/api/v1/orders/track/{tracking_id}"),
+    # Matches every seeded customer, each bringing their orders
+    ("/api/v1/search/", "/api/v1/search/?q=Customer 1"),
+]
+
+
+@pytest.fixture(scope="module")
+def quiet(client, admin_headers):
+    """Stop the background loops so the measured requests see a steady database.
+
+    Their statements are not charged to the request either way; tracking_ids
+    keeps running since order creation needs its lease. The caller's token
+    version stays cached for the whole module, so an entry expiring between
+    two requests does not add an auth lookup to whichever runs next.
+    """
+    services = (eta_engine, assignment_scheduler, search_index, outbox, revocation_store)
+    for service in services:
+        client.portal.call(service.stop)
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(token_version_cache, "ttl", 3600.0)
+        token_version_cache.clear()
+        assert client.get("/api/v1/workers/load", headers=admin_headers).status_code == 200
+        yield
+    for service in services:
+        client.portal.call(service.start)
+
+
+@pytest.fixture(scope="module")
+def seeded(client, quiet):
+    with SessionLocal() as db:
+        for i in range(SEED_ROWS):
+            customer_user = User(email=f"budget-c{i}@example.com", name=f"Customer {i}",
+                                 hashed_password="x", role=UserRole.CUSTOMER)
+            worker_user = User(email=f"budget-w{i}@example.com", name=f"Worker {i}",
+                               hashed_password="x", role=UserRole.WORKER)
+            db.add_all([customer_user, worker_user])
+            db.flush()
+            db.add(Customer(user_id=customer_user.id))
+            db.add(Worker(user_id=worker_user.id, employee_id=f"BUDGET-{i}"))
+        db.commit()
+        service_ids = [row.id for row in db.query(ServiceType.id).filter(ServiceType.is_active == True)]
+        ids = {"customer_id": db.query(Customer.id).first()[0], "worker_id": db.query(Worker.id).first()[0]}
+    if search_index.enabled:
+        search_index.refresh()
+    return ids, service_ids
+
+
+def order_body(seeded, item_count):
+    ids, service_ids = seeded
+    items = [{"service_type_id": service_ids[i % len(service_ids)], "quantity": 1} for i in range(item_count)]
+    return {"customer_id": ids["customer_id"], "items": items}
+
+
+@pytest.fixture(scope="module")
+def order(client, admin_headers, seeded):
+    response = client.post("/api/v1/orders/", json=order_body(seeded, 2), headers=admin_headers)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+@pytest.mark.parametrize("item_count", [1, 50])
+def test_order_creation_costs_the_same_whatever_the_items(client, admin_headers, seeded, item_count):
+    response = assert_endpoint_budget(client, client.app, "POST", "/api/v1/orders/",
+                                      json=order_body(seeded, item_count), headers=admin_headers)
+    assert response.status_code == 201, response.text
+
+
+@pytest.mark.parametrize("path, url", READS, ids=[path for path, _ in READS])
+def test_read_within_budget(client, admin_headers, seeded, order, path, url):
+    ids = dict(seeded[0], order_id=order["id"], tracking_id=order["tracking_id"])
+    response = assert_endpoint_budget(client, client.app, "GET", path, url=url.format(**ids), headers=admin_headers)
+    assert response.status_code == 200, response.text
+
+
+def test_status_change_within_budget(client, admin_headers, order):
+    path = "/api/v1/orders/{order_id}/status"
+    response = assert_endpoint_budget(client, client.app, "PATCH", path, url=path.format(order_id=order["id"]),
+                                      json={"status": "in-progress"}, headers=admin_headers)
+    assert response.status_code == 200, response.text
+
+
+def select_one():
+    with SessionLocal() as db:
+        db.execute(text("SELECT 1"))
+
+
+def test_background_statements_are_not_charged_to_the_request():
+    with assert_max_statements(0, requests_only=True) as statements:
+        # A background loop: its own thread, no request profile
+        loop = threading.Thread(target=select_one)
+        loop.start()
+        loop.join()
+    assert statements == []
+
+    def request():
+        start_profile()
+        select_one()
+
+    with pytest.raises(StatementBudgetExceeded, match="1 statements executed"):
+        with assert_max_statements(0, requests_only=True):
+            contextvars.Context().run(request)
@@ -0,0 +1,67 @@
+import base64
+import hashlib
+import json
+import time
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+from jose import jwt
+
+from app.core.auth import auth_handler, token_cache
+
+
+def b64(data: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b"=").decode()
+
+
+def rejected(token: str) -> bool:
+    try:
+        auth_handler.get_current_user_id(token)
+    except HTTPException as e:
+        return e.status_code == 401
+    return False
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    token_cache.clear()
+    yield
+    token_cache.clear()
+
+
+def tampered_variants(token):
+    header, payload, signature = token.split(".")
+    flipped = signature[:-2] + ("A" if signature[-2] != "A" else "B") + signature[-1]
+    return {
+        # Same claims with sub swapped, original signature
+        "payload tampered": f"{header}.{b64(dict(jwt.get_unverified_claims(token), sub='1'))}.{signature}",
+        "signature tampered": f"{header}.{payload}.{flipped}",
+        "trailing garbage": token + "x",
+        "signed with another key": jwt.encode(jwt.get_unverified_claims(token), "not-the-secret",
+                                              algorithm=auth_handler.algorithm),
+        "alg=none": f"{b64({'alg': 'none', 'typ': 'JWT'})}.{payload}.",
+    }
+
+
+def test_valid_token_cached_and_variants_rejected():
+    token = auth_handler.create_access_token({"sub": "42"})
+    assert auth_handler.get_current_user_id(token) == "42"
+    assert len(token_cache) == 1
+    for name, variant in tampered_variants(token).items():
+        assert rejected(variant), name
+    assert len(token_cache) == 1
+
+
+def test_expired_token_rejected_after_being_cached():
+    short = auth_handler.create_access_token({"sub": "42"}, expires_delta=timedelta(seconds=1))
+    assert auth_handler.get_current_user_id(short) == "42"
+    time.sleep(2)
+    assert rejected(short)
+
+
+def test_stale_cache_entry_past_exp_ignored():
+    expired = auth_handler.create_access_token({"sub": "42"}, expires_delta=timedelta(seconds=-5))
+    # An entry that outlives exp (e.g. clock adjustment) must still be refused
+    token_cache.set(hashlib.sha256(expired.encode()).digest(), jwt.get_unverified_claims(expired), ttl=3600)
+    assert rejected(expired)
@@ -0,0 +1,52 @@
+from sqlalchemy import event
+
+from app.core.cache import TTLCache
+from app.core.database import async_engine
+from app.services.tracking import tracking_snapshots
+
+
+def test_deleting_another_key_keeps_an_in_flight_load():
+    cache = TTLCache(maxsize=10, ttl=60)
+    generation = cache.generation_of("a")
+    cache.delete("b")
+    cache.set("a", 1, generation=generation)
+    assert cache.get("a") == 1
+
+    generation = cache.generation_of("a")
+    cache.delete("a")
+    cache.set("a", 2, generation=generation)
+    assert cache.get("a") is None
+
+
+def test_delete_keeps_the_generation_map_bounded():
+    cache = TTLCache(maxsize=2, ttl=60)
+    generation = cache.generation_of("a")
+    for key in range(10):
+        cache.delete(key)
+    assert len(cache._key_generations) <= 2
+    # Restarting the map invalidates every pending load, never none
+    cache.set("a", 1, generation=generation)
+    assert cache.get("a") is None
+
+
+def load_while(client, tracking_id, dropped):
+    """Load a snapshot, dropping the dropped tracking IDs while its query runs"""
+    def drop(conn, cursor, statement, parameters, context, executemany):
+        if "tracking_id" in statement:
+            tracking_snapshots.drop(dropped)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", drop)
+    try:
+        return client.portal.call(tracking_snapshots.get, tracking_id)
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", drop)
+
+
+def test_unrelated_drop_does_not_prevent_caching(client):
+    assert load_while(client, "LPNOSUCHORDER1", ["LPSOMEOTHER01"]) is None
+    assert tracking_snapshots.cache.peek("LPNOSUCHORDER1") == (0, None)
+
+
+def test_drop_of_the_loading_id_prevents_caching(client):
+    assert load_while(client, "LPNOSUCHORDER2", ["LPNOSUCHORDER2"]) is None
+    assert tracking_snapshots.cache.peek("LPNOSUCHORDER2") is None
@@ -0,0 +1,150 @@
+import multiprocessing
+import os
+import time
+from array import array
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, insert, update
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import SessionLocal
+from app.core.ids import (
+    CODE_LENGTH, EPOCH, MAX_NODES, MAX_SEQUENCE, TrackingIdExhausted, TrackingIdGenerator, decode_base32,
+    tracking_ids,
+)
+from app.core.query_guard import assert_max_statements
+from app.models import Customer, ServiceType, TrackingIdNode
+
+
+def generator(**kwargs):
+    kwargs.setdefault("lease_seconds", 30)
+    kwargs.setdefault("max_drift_seconds", 2)
+    kwargs.setdefault("session_factory", SessionLocal)
+    return TrackingIdGenerator("LP", b"test-tracking-ids", **kwargs)
+
+
+def scratch_nodes(tmp_path, free_nodes):
+    """URL of a scratch node table where only the first free_nodes node ids are leasable"""
+    database_url = f"sqlite:///{tmp_path / 'nodes.db'}"
+    engine = create_engine(database_url)
+    TrackingIdNode.__table__.create(engine)
+    with engine.begin() as conn:
+        far = datetime.now(timezone.utc) + timedelta(days=1)
+        conn.execute(insert(TrackingIdNode), [
+            {"node_id": node, "owner": "placeholder", "expires_at": far, "issued_until": 0}
+            for node in range(free_nodes, MAX_NODES)
+        ])
+    engine.dispose()
+    return database_url
+
+
+def test_next_without_a_lease_raises_instead_of_claiming(client):
+    ids = generator()
+    with assert_max_statements(0):
+        with pytest.raises(TrackingIdExhausted):
+            ids.next()
+    ids.maintain()  # what the lifespan task runs in a thread
+    assert ids.node_id is not None
+    with assert_max_statements(0):
+        code = ids.next()
+    assert ids.parse(code)[1] == ids.node_id
+    ids.renew(release=True)
+
+
+def test_drift_budget_exhausted_raises_instead_of_sleeping():
+    ids = generator(node_id=5)
+    ids._second = int(time.time()) - EPOCH + ids.max_drift_seconds
+    ids._sequence = MAX_SEQUENCE
+    started = time.monotonic()
+    with pytest.raises(TrackingIdExhausted):
+        ids.next()
+    assert time.monotonic() - started < 0.5
+
+
+def test_lost_lease_reclaimed_by_maintain(client):
+    ids = generator()
+    ids.maintain()
+    lost = ids.node_id
+    ids.owner = "someone-else"  # another process took the node over
+    ids.maintain()
+    assert ids.node_id is not None and ids.node_id != lost
+    ids.renew(release=True)
+
+
+def test_order_creation_sheds_load_without_a_lease(client, admin_headers, make_user, monkeypatch):
+    user = make_user()
+    with SessionLocal() as db:
+        customer_id = db.query(Customer.id).filter(Customer.user_id == user.id).scalar()
+        service_id = db.query(ServiceType.id).filter(ServiceType.is_active == True).first()[0]
+    monkeypatch.setattr(tracking_ids, "_lease_deadline", 0.0)
+    response = client.post("/api/v1/orders/", headers=admin_headers, json={
+        "customer_id": customer_id, "items": [{"service_type_id": service_id, "quantity": 1}],
+    })
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_back_to_back_takeovers_start_past_each_other(tmp_path):
+    sessions = sessionmaker(bind=create_engine(scratch_nodes(tmp_path, free_nodes=1)))
+    issued = []
+    for _ in range(3):
+        ids = generator(session_factory=sessions)
+        ids.maintain()
+        assert ids.node_id == 0
+        issued.append(ids.parse(ids.next())[0])
+        # The holder crashes without releasing and its lease lapses; the next one takes the node over
+        with sessions.begin() as db:
+            lapsed = datetime.now(timezone.utc) - timedelta(seconds=1)
+            db.execute(update(TrackingIdNode).where(TrackingIdNode.node_id == 0).values(expires_at=lapsed))
+    assert issued == sorted(set(issued))
+
+
+def crashing_worker(args):
+    """Issue per_process IDs, dropping the generator without releasing its lease every restart_every"""
+    database_url, per_process, restart_every, lease_seconds = args
+    # A fresh engine per process: pooled connections must not cross processes
+    sessions = sessionmaker(bind=create_engine(database_url, connect_args={"timeout": 30}))
+    values, nodes = array("Q"), set()
+    ids, restart = None, True
+    while len(values) < per_process:
+        if restart:
+            ids = generator(lease_seconds=lease_seconds, session_factory=sessions)
+            restart = False
+        try:
+            code = ids.next()
+        except TrackingIdExhausted:
+            try:
+                ids.maintain()  # the lifespan task's job in the app
+            except TrackingIdExhausted:
+                time.sleep(lease_seconds / 4)  # wait for a crashed worker's lease to expire
+            continue
+        assert len(code) == 2 + CODE_LENGTH and code.startswith("LP"), code
+        assert ids.parse(code)[1:] == (ids.node_id, ids._sequence), code
+        values.append(decode_base32(code[2:]))
+        nodes.add(ids.node_id)
+        restart = len(values) % restart_every == 0
+    return values, nodes
+
+
+@pytest.mark.parametrize("processes, per_process, restart_every, lease_seconds, free_nodes", [
+    (4, 6000, 2000, 0.5, 3),
+    # A million IDs (about 40s): TRACKING_ID_CHECK_MILLION=1 pytest tests/test_tracking_ids.py
+    pytest.param(8, 125000, 25000, 1.0, 6, id="million", marks=pytest.mark.skipif(
+        not os.environ.get("TRACKING_ID_CHECK_MILLION"), reason="set TRACKING_ID_CHECK_MILLION=1 to run",
+    )),
+])
+def test_unique_across_processes_crashes_and_lease_takeover(
+    tmp_path, processes, per_process, restart_every, lease_seconds, free_nodes
+):
+    """More processes than node ids, so restarted ones must take over crashed leases"""
+    database_url = scratch_nodes(tmp_path, free_nodes=free_nodes)
+    with multiprocessing.get_context("spawn").Pool(processes) as pool:
+        results = pool.map(crashing_worker, [(database_url, per_process, restart_every, lease_seconds)] * processes)
+
+    seen, nodes = set(), set()
+    for values, worker_nodes in results:
+        seen.update(values)
+        nodes |= worker_nodes
+    assert len(seen) == processes * per_process
+    assert nodes <= set(range(free_nodes))